@@ -0,0 +1,239 @@
+# -*- encoding: utf-8 -*-
+"""Index of the Bugzilla and Redmine bugs referenced by the test modules.
+
+Test modules are parsed, not imported, looking for:
+
+* ``skip_if_bug_open('bugzilla', 1234)`` and
+  ``skip_if_bug_open('redmine', 1234)`` decorators,
+* ``bz_bug_is_open(1234)`` and ``rm_bug_is_open(1234)`` calls,
+* ``generate_strings_list(bug_id=1234)`` calls.
+
+Only bug IDs written as literals are indexed. The index is stored as a
+compact JSON file and updated incrementally: a module is parsed again only
+when its size and modification time changed and its content hash differs.
+This allows to know the bugs a test run depends on, to fetch them up front or
+to fill the bug cache before an offline run, see
+:func:`robottelo.decorators.prefetch_bugs`.
+
+"""
+import ast
+import hashlib
+import json
+import logging
+import os
+
+from collections import namedtuple
+
+LOGGER = logging.getLogger(__name__)
+
+#: Version of the index file format, indexes of other versions are rebuilt.
+INDEX_VERSION = 1
+
+#: A bug referenced by a test module. ``path`` is the module path, ``line``
+#: the line of the reference and ``scope`` the dotted name of the class and
+#: function it is in, empty at module level.
+BugReference = namedtuple(
+    'BugReference', ('tracker', 'bug_id', 'path', 'line', 'scope'))
+
+# Names of the bug helpers mapped to their tracker, None when the tracker is
+# their first argument, and the position of their bug_id argument
+_CALLS = {
+    'bz_bug_is_open': ('bugzilla', 0),
+    'generate_strings_list': ('bugzilla', 2),
+    'rm_bug_is_open': ('redmine', 0),
+    'skip_if_bug_open': (None, 1),
+}
+
+
+def _literal(node):
+    """Return the value of a literal ``node``, ``None`` if it is not one."""
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _argument(call, position, keyword):
+    """Return the literal value of an argument of ``call``."""
+    for item in call.keywords:
+        if item.arg == keyword:
+            return _literal(item.value)
+    if len(call.args) > position:
+        return _literal(call.args[position])
+    return None
+
+
+class _ReferenceFinder(ast.NodeVisitor):
+    """Collect the bug references of a module syntax tree."""
+    def __init__(self):
+        self.references = []
+        self._scope = []
+
+    def _visit_scope(self, node):
+        """Visit a class or function body keeping track of its name."""
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    # pylint:disable=invalid-name
+    visit_ClassDef = visit_FunctionDef = _visit_scope
+
+    def visit_Call(self, node):  # pylint:disable=invalid-name
+        """Record the call if it references a bug."""
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(
+            func, 'id', None)
+        if name in _CALLS:
+            tracker, position = _CALLS[name]
+            if tracker is None:
+                tracker = _argument(node, 0, 'bug_type')
+            try:
+                bug_id = int(_argument(node, position, 'bug_id'))
+            except (TypeError, ValueError):
+                bug_id = None
+            if tracker in ('bugzilla', 'redmine') and bug_id is not None:
+                self.references.append(
+                    (tracker, bug_id, node.lineno, '.'.join(self._scope)))
+        self.generic_visit(node)
+
+
+def find_references(source, filename='<unknown>'):
+    """Return the bug references of a module source.
+
+    :param source: The module source code.
+    :param str filename: The module path, used in syntax errors.
+    :return: ``(tracker, bug_id, line, scope)`` tuples sorted by line, see
+        :class:`BugReference`.
+    :raises SyntaxError: If the source can't be parsed.
+
+    """
+    finder = _ReferenceFinder()
+    finder.visit(ast.parse(source, filename))
+    return sorted(finder.references, key=lambda reference: reference[2])
+
+
+class BugIndex(object):
+    """The bugs referenced by the test modules of a directory tree.
+
+    :param str path: Path of the JSON index file. The index is kept in memory
+        only if not given.
+
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.root = None
+        self.files = {}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """Read the index file, starting a new index if it is not valid."""
+        try:
+            with open(self.path) as index_file:
+                data = json.load(index_file)
+        except ValueError:
+            LOGGER.warning('Bug index %s is not valid, rebuilding it.',
+                           self.path)
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.root = data['root']
+            self.files = data['files']
+
+    def save(self):
+        """Write the index file, if the index has a path."""
+        if self.path is None:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'root': self.root,
+            'files': self.files,
+        }
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        # Write the new index next to the old one, so concurrent readers
+        # never see a partial index
+        temporary = u'{0}.{1}'.format(self.path, os.getpid())
+        with open(temporary, 'w') as index_file:
+            json.dump(data, index_file, separators=(',', ':'), sort_keys=True)
+        os.rename(temporary, self.path)
+
+    def update(self, root):
+        """Index the Python modules under ``root``.
+
+        Modules whose size, modification time or content did not change are
+        not parsed again, deleted modules are removed from the index.
+
+        :param str root: Directory of the test modules, for example
+            ``tests/foreman``.
+        :return: The number of modules parsed.
+        :rtype: int
+
+        """
+        root = os.path.abspath(root)
+        if root != self.root:
+            self.root = root
+            self.files = {}
+        files = {}
+        parsed = 0
+        for directory, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if not filename.endswith('.py'):
+                    continue
+                path = os.path.join(directory, filename)
+                relpath = os.path.relpath(path, root)
+                entry = self.files.get(relpath)
+                stat = os.stat(path)
+                if (entry is not None and entry['size'] == stat.st_size and
+                        entry['mtime'] == stat.st_mtime):
+                    files[relpath] = entry
+                    continue
+                with open(path, 'rb') as module:
+                    source = module.read()
+                digest = hashlib.sha1(source).hexdigest()
+                if entry is None or entry['sha1'] != digest:
+                    parsed += 1
+                    try:
+                        references = find_references(source, path)
+                    except SyntaxError as err:
+                        LOGGER.warning('Could not parse %s: %s', path, err)
+                        references = []
+                    entry = {'sha1': digest, 'references': references}
+                entry.update({'size': stat.st_size, 'mtime': stat.st_mtime})
+                files[relpath] = entry
+        self.files = files
+        LOGGER.debug('Bug index of %s: %d modules, %d parsed',
+                     root, len(files), parsed)
+        return parsed
+
+    def references(self, tracker=None, paths=None):
+        """Return the indexed bug references.
+
+        :param str tracker: Only return the references to ``bugzilla`` or
+            ``redmine`` bugs.
+        :param paths: Only return the references made by these modules.
+        :rtype: list of BugReference
+
+        """
+        if paths is not None:
+            paths = set(os.path.abspath(path) for path in paths)
+        result = []
+        for relpath in sorted(self.files):
+            path = os.path.join(self.root, relpath)
+            if paths is not None and path not in paths:
+                continue
+            for ref_tracker, bug_id, line, scope in (
+                    self.files[relpath]['references']):
+                if tracker is None or ref_tracker == tracker:
+                    result.append(
+                        BugReference(ref_tracker, bug_id, path, line, scope))
+        return result
+
+    def bug_ids(self, tracker, paths=None):
+        """Return the IDs of the ``tracker`` bugs referenced, see
+        :meth:`references`.
+
+        :rtype: set
+
+        """
+        return set(ref.bug_id for ref in self.references(tracker, paths))
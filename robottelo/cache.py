@@ -0,0 +1,429 @@
+# -*- encoding: utf-8 -*-
+"""Storage of the objects created by the :func:`robottelo.decorators.cacheable`
+factories.
+
+Two backends are available, selected by ``[cache] backend``:
+
+* :class:`MemoryCache` keeps the objects in :data:`OBJECT_CACHE`, in the
+  test process only.
+* :class:`SQLiteCache` keeps the objects in a SQLite database on the local
+  disk, shared by all the test processes, for example the pytest-xdist
+  workers, and by consecutive runs. A lock file per key makes sure only one
+  process creates a given object.
+
+Objects are keyed by factory and options, see :func:`make_key`, expire
+after ``[cache] ttl`` seconds, and the least recently used ones are evicted
+when there are more than ``[cache] max_size``. When ``[cache] validate`` is
+enabled, objects read from the cache are checked with the validator
+registered for their factory, see :func:`register_validator`, and recreated
+if they are not valid anymore. Hits and misses are counted in :data:`STATS`
+and logged when the process exits.
+
+"""
+import atexit
+import errno
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import six
+
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from robottelo.config import settings
+
+LOGGER = logging.getLogger(__name__)
+
+#: Objects stored by :class:`MemoryCache`, by key.
+OBJECT_CACHE = {}
+
+_validators = {}
+
+
+def _canonical(value):
+    """Return ``value`` as hammer receives it on the command line.
+
+    Scalars become text, so ``1`` and ``u'1'`` are the same option value,
+    and lists are joined with commas. Flags and unset options are kept
+    apart.
+
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (list, tuple)):
+        return u','.join(six.text_type(item) for item in value)
+    if isinstance(value, dict):
+        return dict(
+            (six.text_type(key), _canonical(item))
+            for key, item in value.items()
+        )
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return six.text_type(value)
+
+
+def make_key(name, options=None):
+    """Return the cache key of the object ``name`` created with ``options``.
+
+    Objects created without options keep the factory name as key. Otherwise
+    a hash of the canonical options is appended, see :func:`_canonical`, so
+    options which make hammer run the same command give the same key.
+
+    """
+    if not options:
+        return name
+    digest = hashlib.sha1(json.dumps(
+        _canonical(options), sort_keys=True).encode('utf-8'))
+    return u'{0}:{1}'.format(name, digest.hexdigest())
+
+
+class CacheStats(object):
+    """Counters of the cache usage, shared by all the threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalid = 0
+        self.evictions = 0
+
+    def increment(self, counter, amount=1):
+        """Add ``amount`` to ``counter``."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self):
+        """Return the counters and the hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalid': self.invalid,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / float(lookups) if lookups else 0.0,
+            }
+
+
+#: Usage of the cache in the current process.
+STATS = CacheStats()
+
+
+@atexit.register
+def report_stats():
+    """Log the cache usage of the current process, if it was used."""
+    stats = STATS.as_dict()
+    if stats['hits'] or stats['misses']:
+        LOGGER.info(
+            'Object cache: %d hits, %d misses (%.0f%% hit ratio), '
+            '%d invalid objects, %d evictions',
+            stats['hits'],
+            stats['misses'],
+            100 * stats['hit_ratio'],
+            stats['invalid'],
+            stats['evictions'],
+        )
+
+
+def register_validator(name, validator):
+    """Register the function telling whether a cached object ``name`` still
+    exists.
+
+    :param str name: Name of the object, the factory name without ``make_``.
+    :param validator: Callable receiving a cached object and returning
+        whether it is still valid.
+
+    """
+    _validators[name] = validator
+
+
+def get_validator(name):
+    """Return the validator registered for the object ``name``, if any."""
+    return _validators.get(name)
+
+
+class MemoryCache(object):
+    """Keep cached objects in a dictionary of the current process.
+
+    :param dict store: The dictionary holding the objects.
+    :param int ttl: Seconds an object is kept, 0 or ``None`` to keep it
+        forever.
+    :param int max_size: Number of objects kept, the least recently used
+        ones are evicted first. 0 or ``None`` for no limit.
+
+    """
+    def __init__(self, store, ttl=None, max_size=None):
+        self.store = store
+        self.ttl = ttl
+        self.max_size = max_size
+        self._created = {}
+        # Keys by least recent use
+        self._used = OrderedDict()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @contextmanager
+    def lock(self, key):
+        """Prevent other threads from creating the object ``key``."""
+        with self._locks_lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            yield
+
+    def get(self, key):
+        """Return the object ``key`` or ``None`` if it is not cached."""
+        created = self._created.get(key)
+        if (self.ttl and created is not None and
+                time.time() - created > self.ttl):
+            self.delete(key)
+        if key in self.store:
+            self._touch(key)
+        return self.store.get(key)
+
+    def set(self, key, value):
+        """Cache ``value`` as the object ``key``, evicting the least recently
+        used objects if the cache is full.
+        """
+        self.store[key] = value
+        self._created[key] = time.time()
+        self._touch(key)
+        while self.max_size and len(self.store) > self.max_size:
+            # Objects added directly to the store are not tracked
+            untracked = [
+                item for item in self.store if item not in self._used]
+            self.delete(untracked[0] if untracked else next(iter(self._used)))
+            STATS.increment('evictions')
+
+    def _touch(self, key):
+        """Mark the object ``key`` as the most recently used."""
+        self._used.pop(key, None)
+        self._used[key] = True
+
+    def delete(self, key):
+        """Remove the object ``key`` from the cache."""
+        self.store.pop(key, None)
+        self._created.pop(key, None)
+        self._used.pop(key, None)
+
+    def keys(self):
+        """Return the keys of all the cached objects."""
+        return list(self.store)
+
+    def clear(self):
+        """Remove all the cached objects."""
+        self.store.clear()
+        self._created.clear()
+        self._used.clear()
+
+
+class SQLiteCache(object):
+    """Keep cached objects in a SQLite database shared between processes.
+
+    Objects are stored as JSON.
+
+    :param str path: Path of the database file.
+    :param int ttl: Seconds an object is kept, 0 or ``None`` to keep it
+        forever.
+    :param int max_size: Number of objects kept, the least recently used
+        ones are evicted first. 0 or ``None`` for no limit.
+
+    """
+    def __init__(self, path, ttl=None, max_size=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock_dir = u'{0}.locks'.format(path)
+        try:
+            os.makedirs(self.lock_dir)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS objects ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                    'created REAL NOT NULL, used REAL NOT NULL DEFAULT 0)'
+                )
+                columns = [
+                    row[1] for row in
+                    connection.execute('PRAGMA table_info(objects)')
+                ]
+                # Databases created before objects were evicted
+                if 'used' not in columns:
+                    connection.execute(
+                        'ALTER TABLE objects '
+                        'ADD COLUMN used REAL NOT NULL DEFAULT 0'
+                    )
+
+    def _connect(self):
+        """Open a connection to the database.
+
+        Connections are not shared as a connection can only be used by the
+        thread which opened it.
+
+        """
+        return sqlite3.connect(self.path, timeout=60)
+
+    @contextmanager
+    def lock(self, key):
+        """Prevent other threads and processes from creating the object
+        ``key``.
+        """
+        path = os.path.join(
+            self.lock_dir, hashlib.sha1(key.encode('utf-8')).hexdigest())
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """Return the object ``key`` or ``None`` if it is not cached."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT value, created FROM objects WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self.ttl and time.time() - created > self.ttl:
+            self.delete(key)
+            return None
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(
+                    'UPDATE objects SET used = ? WHERE key = ?',
+                    (time.time(), key),
+                )
+        return json.loads(value)
+
+    def set(self, key, value):
+        """Cache ``value`` as the object ``key``, evicting the least recently
+        used objects if the cache is full.
+        """
+        now = time.time()
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), now, now),
+                )
+                if self.max_size:
+                    evicted = connection.execute(
+                        'DELETE FROM objects WHERE key NOT IN ('
+                        'SELECT key FROM objects ORDER BY used DESC LIMIT ?)',
+                        (self.max_size,)
+                    ).rowcount
+                    if evicted > 0:
+                        STATS.increment('evictions', evicted)
+
+    def delete(self, key):
+        """Remove the object ``key`` from the cache."""
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(
+                    'DELETE FROM objects WHERE key = ?', (key,))
+
+    def keys(self):
+        """Return the keys of all the cached objects."""
+        with closing(self._connect()) as connection:
+            return [
+                row[0] for row in connection.execute(
+                    'SELECT key FROM objects')
+            ]
+
+    def clear(self):
+        """Remove all the cached objects."""
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute('DELETE FROM objects')
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the cache backend configured by the ``[cache]`` section,
+    creating it the first time.
+    """
+    global _backend  # pylint:disable=global-statement
+    with _backend_lock:
+        if _backend is None:
+            if settings.cache.backend == 'sqlite':
+                _backend = SQLiteCache(
+                    settings.cache.path,
+                    settings.cache.ttl,
+                    settings.cache.max_size,
+                )
+            else:
+                _backend = MemoryCache(
+                    OBJECT_CACHE, settings.cache.ttl, settings.cache.max_size)
+        return _backend
+
+
+def set_backend(backend):
+    """Use ``backend`` instead of the configured one, ``None`` to go back to
+    the configured one.
+    """
+    global _backend  # pylint:disable=global-statement
+    with _backend_lock:
+        _backend = backend
+
+
+def get_or_create(name, options, create):
+    """Return the cached object ``name`` for ``options``, creating it with
+    ``create`` if it is not cached or not valid anymore.
+
+    :param str name: Name of the object, the factory name without ``make_``.
+    :param dict options: Options the object is created with.
+    :param create: Callable creating the object.
+
+    """
+    backend = get_backend()
+    key = make_key(name, options)
+    with backend.lock(key):
+        value = backend.get(key)
+        validator = get_validator(name)
+        if (value is not None and validator is not None and
+                settings.cache.validate_objects and not validator(value)):
+            LOGGER.info('Cached object %s is not valid anymore', key)
+            STATS.increment('invalid')
+            backend.delete(key)
+            value = None
+        if value is None:
+            STATS.increment('misses')
+            value = create()
+            backend.set(key, value)
+        else:
+            STATS.increment('hits')
+    return value
+
+
+def invalidate(name=None, options=None):
+    """Remove objects from the cache.
+
+    :param str name: Name of the objects to remove, the factory name with or
+        without ``make_``. All the objects are removed if not given.
+    :param dict options: Only remove the object created with these options.
+        All the objects named ``name`` are removed if not given.
+
+    """
+    backend = get_backend()
+    if name is None:
+        backend.clear()
+        return
+    if name.startswith('make_'):
+        name = name.replace('make_', '', 1)
+    if options is not None:
+        backend.delete(make_key(name, options))
+        return
+    for key in backend.keys():
+        if key == name or key.startswith(u'{0}:'.format(name)):
+            backend.delete(key)
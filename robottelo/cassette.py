@@ -0,0 +1,334 @@
+# -*- encoding: utf-8 -*-
+"""Record and replay of the SSH commands and file downloads.
+
+A cassette is a compact JSON file holding, for every command run with
+:func:`robottelo.ssh.command` or :func:`robottelo.ssh.command_many`, the
+host, the command with the hammer credentials masked, its ``stdout``,
+``stderr``, exit status and how long it took, and the content of the files
+downloaded with :func:`robottelo.ssh.download_file`.
+
+In ``record`` mode commands run on the server as usual and their outputs are
+written to the cassette when it is closed. In ``replay`` mode the recorded
+outputs are returned without connecting to any server, optionally waiting
+for the recorded duration multiplied by ``latency_factor``. Uploads are not
+recorded and do nothing on replay. This allows running the Python side of
+the CLI tests, factories and performance harnesses deterministically without
+a Satellite, for example to profile them.
+
+Outputs streamed by :func:`robottelo.ssh.command_stream` and the commands of
+the hammer shell backend, see :mod:`robottelo.cli.shell`, are not recorded:
+they raise :class:`CassetteError` on replay.
+
+Commands are first looked up as they were recorded, then by their pattern,
+where the values of the ``--option="value"`` options and the hammer
+credentials are masked, see :func:`command_pattern`, so commands using
+random names are still found. When a command was recorded several times its
+outputs are replayed in the recorded order, the last one being repeated.
+
+The cassette is configured by the ``[cassette]`` section of the settings, or
+set for a block of code with :func:`use_cassette`::
+
+    with use_cassette('tests/cassettes/org.json', mode='once'):
+        make_org()
+
+"""
+import atexit
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from robottelo.config import settings
+
+LOGGER = logging.getLogger(__name__)
+
+#: Version of the cassette file format.
+CASSETTE_VERSION = 1
+
+#: Valid values for the cassette mode.
+MODES = ('record', 'replay', 'once')
+
+_CREDENTIALS_REGEX = re.compile(r'(\s-u)\s+\S+(\s+-p)\s+\S+')
+_OPTION_VALUE_REGEX = re.compile(r'(--[\w-]+=)(?:"[^"]*"|\'[^\']*\'|\S+)')
+
+
+class CassetteError(Exception):
+    """Indicates a command or file is not recorded in the cassette."""
+
+
+def _text(value):
+    """Return ``value`` as text, decoding it if needed."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def mask_credentials(cmd):
+    """Return ``cmd`` with the hammer credentials masked, as it is stored in
+    cassettes.
+
+    >>> mask_credentials('hammer -u admin -p changeme org info --id="1"')
+    u'hammer -u * -p * org info --id="1"'
+
+    """
+    return _CREDENTIALS_REGEX.sub(u'\\1 *\\2 *', _text(cmd))
+
+
+def command_pattern(cmd):
+    """Return ``cmd`` with the option values and credentials masked.
+
+    >>> command_pattern('hammer -u admin -p changeme org info --id="1"')
+    u'hammer -u * -p * org info --id=*'
+
+    """
+    return _OPTION_VALUE_REGEX.sub(u'\\1*', mask_credentials(cmd))
+
+
+def _encode(data, name):
+    """Return the JSON fields storing the ``data`` bytes, as text when they
+    are UTF-8 and base64 encoded otherwise.
+    """
+    try:
+        return {name: data.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {name + '_base64': base64.b64encode(data).decode('ascii')}
+
+
+def _decode(entry, name):
+    """Return the bytes stored by :func:`_encode` in ``entry``."""
+    if name + '_base64' in entry:
+        return base64.b64decode(entry[name + '_base64'])
+    return entry[name].encode('utf-8')
+
+
+class Cassette(object):
+    """The recorded outputs of the SSH commands and file downloads.
+
+    :param str path: Path of the cassette file.
+    :param str mode: ``record``, ``replay`` or ``once`` to record only when
+        the file does not exist.
+    :param float latency_factor: On replay, the recorded duration of every
+        command is multiplied by this factor and waited for.
+    :raises CassetteError: If ``mode`` is not valid or the cassette to
+        replay can't be read.
+
+    """
+    def __init__(self, path, mode='replay', latency_factor=0):
+        if mode not in MODES:
+            raise CassetteError(
+                'Cassette mode should be one of {0}.'.format(', '.join(MODES)))
+        if mode == 'once':
+            mode = 'replay' if os.path.exists(path) else 'record'
+        self.path = path
+        self.mode = mode
+        self.latency_factor = latency_factor
+        self.interactions = []
+        self.files = []
+        self._lock = threading.Lock()
+        self._commands = {}
+        self._patterns = {}
+        self._downloads = {}
+        self._cursors = {}
+        if mode == 'replay':
+            self.load()
+
+    @property
+    def recording(self):
+        """Whether the commands run on the server and are recorded."""
+        return self.mode == 'record'
+
+    def load(self):
+        """Read the cassette file and index its interactions."""
+        try:
+            with open(self.path) as cassette_file:
+                data = json.load(cassette_file)
+        except (IOError, ValueError) as err:
+            raise CassetteError(
+                'Could not read cassette {0}: {1}'.format(self.path, err))
+        if data.get('version') != CASSETTE_VERSION:
+            raise CassetteError(
+                'Cassette {0} version is not {1}, record it again.'
+                .format(self.path, CASSETTE_VERSION))
+        self.interactions = data['interactions']
+        self.files = data['files']
+        for position, entry in enumerate(self.interactions):
+            # Cassettes recorded before the credentials were masked
+            self._commands.setdefault(
+                (entry['host'], mask_credentials(entry['command'])), []
+            ).append(position)
+            self._patterns.setdefault(
+                (entry['host'], command_pattern(entry['command'])), []
+            ).append(position)
+        for position, entry in enumerate(self.files):
+            self._downloads.setdefault(
+                (entry['host'], entry['remote_file']), []).append(position)
+
+    def save(self):
+        """Write the cassette file."""
+        data = {
+            'version': CASSETTE_VERSION,
+            'interactions': self.interactions,
+            'files': self.files,
+        }
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temporary = u'{0}.{1}'.format(self.path, os.getpid())
+        with open(temporary, 'w') as cassette_file:
+            json.dump(data, cassette_file, separators=(',', ':'))
+        os.rename(temporary, self.path)
+        LOGGER.debug('Cassette %s saved: %d commands, %d files',
+                     self.path, len(self.interactions), len(self.files))
+
+    def close(self):
+        """Save the cassette if it was recording."""
+        if self.recording:
+            self.save()
+
+    def _next(self, index, key):
+        """Return the position of the next interaction recorded under
+        ``key`` in ``index``, ``None`` if there is none.
+        """
+        positions = index.get(key)
+        if not positions:
+            return None
+        cursor = self._cursors.get((id(index), key), 0)
+        self._cursors[(id(index), key)] = cursor + 1
+        return positions[min(cursor, len(positions) - 1)]
+
+    def _wait(self, latency):
+        """Simulate the recorded ``latency``."""
+        if self.latency_factor and latency:
+            time.sleep(latency * self.latency_factor)
+
+    def execute(self, hostname, cmd, run):
+        """Return the output of ``cmd`` run on ``hostname``.
+
+        :param run: Called without arguments to run the command when
+            recording, should return the same as :meth:`replay`.
+        :return: A ``(stdout, stderr, return_code)`` tuple, with ``stdout``
+            and ``stderr`` as bytes.
+
+        """
+        if not self.recording:
+            return self.replay(hostname, cmd)
+        start = time.time()
+        stdout, stderr, return_code = run()
+        self.record(
+            hostname, cmd, stdout, stderr, return_code, time.time() - start)
+        return stdout, stderr, return_code
+
+    def record(self, hostname, cmd, stdout, stderr, return_code, latency):
+        """Add the output of a command to the cassette, with the hammer
+        credentials masked.
+        """
+        entry = {
+            'host': hostname,
+            'command': mask_credentials(cmd),
+            'rc': return_code,
+            'latency': round(latency, 6),
+        }
+        entry.update(_encode(stdout, 'stdout'))
+        entry.update(_encode(stderr, 'stderr'))
+        with self._lock:
+            self.interactions.append(entry)
+
+    def replay(self, hostname, cmd):
+        """Return the recorded output of ``cmd`` run on ``hostname``.
+
+        :raises CassetteError: If the command was not recorded.
+
+        """
+        cmd = _text(cmd)
+        with self._lock:
+            position = self._next(
+                self._commands, (hostname, mask_credentials(cmd)))
+            if position is None:
+                position = self._next(
+                    self._patterns, (hostname, command_pattern(cmd)))
+        if position is None:
+            raise CassetteError(
+                'Command not recorded in cassette {0}: [{1}] {2}'
+                .format(self.path, hostname, cmd))
+        entry = self.interactions[position]
+        self._wait(entry['latency'])
+        return (
+            _decode(entry, 'stdout'), _decode(entry, 'stderr'), entry['rc'])
+
+    def download(self, hostname, remote_file, local_file, run):
+        """Download ``remote_file`` from ``hostname`` to ``local_file``.
+
+        :param run: Called without arguments to download the file when
+            recording.
+        :raises CassetteError: On replay, if the file was not recorded.
+
+        """
+        if self.recording:
+            run()
+            with open(local_file, 'rb') as handler:
+                entry = {'host': hostname, 'remote_file': remote_file}
+                entry.update(_encode(handler.read(), 'content'))
+            with self._lock:
+                self.files.append(entry)
+            return
+        with self._lock:
+            position = self._next(self._downloads, (hostname, remote_file))
+        if position is None:
+            raise CassetteError(
+                'File not recorded in cassette {0}: [{1}] {2}'
+                .format(self.path, hostname, remote_file))
+        with open(local_file, 'wb') as handler:
+            handler.write(_decode(self.files[position], 'content'))
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+_configured = False
+
+
+def get_cassette():
+    """Return the cassette in use, ``None`` if commands should run on the
+    server.
+
+    The cassette configured by the ``[cassette]`` section is created the
+    first time and saved when the process exits.
+
+    """
+    global _cassette, _configured  # pylint:disable=global-statement
+    if not _configured:
+        with _cassette_lock:
+            if not _configured and settings.cassette.path:
+                _cassette = Cassette(
+                    settings.cassette.path,
+                    settings.cassette.mode,
+                    settings.cassette.latency_factor,
+                )
+                atexit.register(_cassette.close)
+            _configured = settings.configured
+    return _cassette
+
+
+@contextmanager
+def use_cassette(path, mode='replay', latency_factor=0):
+    """Record or replay the SSH commands run in the block with the cassette
+    at ``path``, instead of the configured one.
+
+    The arguments are the ones of :class:`Cassette`, which is yielded and
+    saved at the end of the block when recording.
+
+    """
+    global _cassette, _configured  # pylint:disable=global-statement
+    cassette = Cassette(path, mode, latency_factor)
+    with _cassette_lock:
+        previous = _cassette, _configured
+        _cassette, _configured = cassette, True
+    try:
+        yield cassette
+    finally:
+        with _cassette_lock:
+            _cassette, _configured = previous
+        cassette.close()
@@ -29,3 +29,4 @@ class Architecture(Base):
     """
 
     command_base = 'architecture'
+    create_fields = ('id', 'name')
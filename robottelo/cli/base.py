@@ -1,9 +1,13 @@
 # -*- encoding: utf-8 -*-
 """Generic base class for cli hammer commands."""
 import logging
+import six
+import threading
+import weakref
 
-from robottelo import ssh
-from robottelo.cli import hammer
+from multiprocessing.pool import ThreadPool
+from robottelo import metrics, ssh
+from robottelo.cli import hammer, rest, shell
 from robottelo.config import settings
 
 
@@ -29,6 +33,58 @@ class CLIReturnCodeError(Exception):
         return self.msg
 
 
+_command_state = threading.local()
+
+
+class _ThreadAttribute(object):
+    """A class attribute whose assignments only affect the current thread.
+
+    Values assigned to a class by a thread are seen by that class and its
+    subclasses in that thread only, the other threads keep seeing the value
+    defined in the class body.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    @staticmethod
+    def _classes():
+        """Return the values assigned by the current thread per class."""
+        classes = getattr(_command_state, 'classes', None)
+        if classes is None:
+            classes = _command_state.classes = weakref.WeakKeyDictionary()
+        return classes
+
+    def __get__(self, cls, metaclass=None):
+        if cls is None:
+            return self
+        classes = self._classes()
+        for klass in cls.__mro__:
+            values = classes.get(klass, {})
+            if self.name in values:
+                return values[self.name]
+            if self.name in vars(klass):
+                return vars(klass)[self.name]
+        raise AttributeError(self.name)
+
+    def __set__(self, cls, value):
+        self._classes().setdefault(cls, {})[self.name] = value
+
+
+class _CommandMeta(type):
+    """Keep the command state of the :class:`Base` classes per thread.
+
+    The commands store their subcommand in the class before building and
+    running it, so commands of the same class can be run concurrently, for
+    example by :func:`robottelo.cli.factory.make_many`.
+
+    """
+    command_sub = _ThreadAttribute('command_sub')
+    command_requires_org = _ThreadAttribute('command_requires_org')
+
+
+@six.add_metaclass(_CommandMeta)
 class Base(object):
     """
     @param command_base: base command of hammer.
@@ -92,8 +148,13 @@ class Base(object):
     @since: 27.Nov.2013
     """
     command_base = None  # each inherited instance should define this
+    # The values assigned to these two by the commands are kept per thread
     command_sub = None  # specific to instance, like: create, update, etc
     command_requires_org = False  # True when command requires organization-id
+    # Fields of the create output. When set and [cli] skip_create_info is
+    # enabled, create does not fetch the new object with info unless it is
+    # created with other options.
+    create_fields = None
 
     logger = logging.getLogger('robottelo')
 
@@ -131,6 +192,63 @@ class Base(object):
             )
         return response.stdout
 
+    @classmethod
+    def _use_api(cls, options=None):
+        """Tell whether the current command should be run by the API backend.
+
+        See :mod:`robottelo.cli.rest`.
+
+        """
+        return rest.is_enabled() and rest.supports(
+            cls.command_base, cls.command_sub, options)
+
+    @classmethod
+    def _execute_api(cls, options=None):
+        """Run the current command through the API backend.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If an API call fails,
+            as if the hammer command had failed.
+
+        """
+        user, password = cls._get_username_password()
+        try:
+            with metrics.command(cls.command_base, cls.command_sub):
+                metrics.describe(cls._construct_command(options))
+                return rest.call(
+                    cls.command_base, cls.command_sub, options, user,
+                    password
+                )
+        except rest.APIError as err:
+            raise CLIReturnCodeError(
+                rest.ERROR_RETURN_CODE,
+                err.message,
+                u'Command "{0} {1}" failed through the API:\n{2}'
+                .format(cls.command_base, cls.command_sub, err.message)
+            )
+
+    @classmethod
+    def _json_output(cls):
+        """Tell whether ``list``, ``create`` and ``info`` request JSON output,
+        see ``[cli] output_format``.
+        """
+        return settings.cli.output_format == 'json'
+
+    @classmethod
+    def _execute_json(cls, command):
+        """Run ``command`` with JSON output.
+
+        :return: the output normalized by
+            :func:`robottelo.cli.hammer.parse_json`, so it has the same keys
+            as the CSV output.
+
+        """
+        with metrics.command(cls.command_base, cls.command_sub):
+            result = cls.execute(command, output_format='json')
+            if result is None:
+                return []
+            with metrics.phase('parse'):
+                return hammer.parse_json(result)
+
     @classmethod
     def add_operating_system(cls, options=None):
         """
@@ -147,6 +265,12 @@ class Base(object):
     def create(cls, options=None):
         """
         Creates a new record using the arguments passed via dictionary.
+
+        The new record is fetched with ``info``, unless ``[cli]
+        skip_create_info`` is enabled, the class declares in
+        ``create_fields`` the fields the create output provides and the
+        options only set those fields. In that case the create output is
+        returned.
         """
 
         cls.command_sub = 'create'
@@ -154,8 +278,34 @@ class Base(object):
         if options is None:
             options = {}
 
-        result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+        if cls._use_api(options):
+            return cls._execute_api(options)
+
+        # Other fields are only shown by info, like the vendor class of a
+        # model or the organizations of an environment
+        skip_info = (
+            cls.create_fields is not None and
+            settings.cli.skip_create_info and
+            all(key in cls.create_fields
+                for key, value in options.items()
+                if value is not None and value is not False)
+        )
+        if skip_info or cls._json_output():
+            result = cls._execute_json(cls._construct_command(options))
+            if isinstance(result, dict):
+                result = [result]
+        else:
+            result = cls.execute(
+                cls._construct_command(options), output_format='csv')
+
+        if skip_info:
+            if len(result) > 0 and all(
+                    field in result[0] for field in cls.create_fields):
+                return result[0]
+            cls.logger.debug(
+                u'%s create output lacks some of %s, fetching info',
+                cls.__name__, cls.create_fields,
+            )
 
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -183,6 +333,8 @@ class Base(object):
     def delete(cls, options=None):
         """Deletes existing record."""
         cls.command_sub = 'delete'
+        if cls._use_api(options):
+            return cls._execute_api(options)
         return cls.execute(
             cls._construct_command(options),
             ignore_stderr=True,
@@ -241,26 +393,46 @@ class Base(object):
     @classmethod
     def execute(cls, command, user=None, password=None, output_format=None,
                 timeout=None, ignore_stderr=None, return_raw_response=None):
-        """Executes the cli ``command`` on the server via ssh"""
+        """Executes the cli ``command`` on the server via ssh
+
+        When ``[cli] backend`` is ``shell`` the command is sent to a
+        persistent hammer shell session instead, see
+        :mod:`robottelo.cli.shell`. Hammer is not timed in that case.
+
+        The command duration is recorded by :mod:`robottelo.metrics`.
+
+        """
         user, password = cls._get_username_password(user, password)
-        time_hammer = False
-        if settings.performance:
-            time_hammer = settings.performance.time_hammer
-
-        # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v -u {2} -p {3} {4} {5}'.format(
-            settings.locale,
-            u'time -p' if time_hammer else '',
-            user,
-            password,
-            u'--output={0}'.format(output_format) if output_format else u'',
-            command,
-        )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            output_format=output_format,
-            timeout=timeout,
-        )
+        with metrics.command(cls.command_base, cls.command_sub):
+            metrics.describe(command)
+            if settings.cli.backend == 'shell':
+                response = shell.execute(
+                    command,
+                    user,
+                    password,
+                    output_format=output_format,
+                    timeout=timeout,
+                )
+            else:
+                time_hammer = False
+                if settings.performance:
+                    time_hammer = settings.performance.time_hammer
+
+                # add time to measure hammer performance
+                cmd = u'LANG={0} {1} hammer -v -u {2} -p {3} {4} {5}'.format(
+                    settings.locale,
+                    u'time -p' if time_hammer else '',
+                    user,
+                    password,
+                    u'--output={0}'.format(output_format)
+                    if output_format else u'',
+                    command,
+                )
+                response = ssh.command(
+                    cmd.encode('utf-8'),
+                    output_format=output_format,
+                    timeout=timeout,
+                )
         if return_raw_response:
             return response
         else:
@@ -309,12 +481,20 @@ class Base(object):
                 .format(cls.__name__)
             )
 
-        result = cls.execute(
-            command=cls._construct_command(options),
-            output_format=output_format
-        )
-        if output_format != 'json':
-            result = hammer.parse_info(result)
+        if output_format is None and cls._use_api(options):
+            return cls._execute_api(options)
+
+        if output_format is None and cls._json_output():
+            return cls._execute_json(cls._construct_command(options))
+
+        with metrics.command(cls.command_base, cls.command_sub):
+            result = cls.execute(
+                command=cls._construct_command(options),
+                output_format=output_format
+            )
+            if output_format != 'json':
+                with metrics.phase('parse'):
+                    result = hammer.parse_info(result)
         return result
 
     @classmethod
@@ -338,11 +518,65 @@ class Base(object):
                 .format(cls.__name__)
             )
 
+        if cls._use_api(options):
+            return cls._execute_api(options)
+
+        if cls._json_output():
+            return cls._execute_json(cls._construct_command(options))
+
         result = cls.execute(
             cls._construct_command(options), output_format='csv')
 
         return result
 
+    @classmethod
+    def iter_list(cls, options=None, page_size=1000, prefetch=False):
+        """Iterate over the listed entities page by page.
+
+        Unlike :meth:`list`, which requests all the entities at once, each
+        page is requested when the previous one is consumed, so the callers
+        can stop early and big lists do not hit the command timeout. The
+        iteration ends on the first empty page, as the server may return
+        less than ``page_size`` entities per page.
+
+        :param dict options: The ``list`` options, without the ``page`` and
+            ``per-page`` ones.
+        :param int page_size: Number of entities requested per page.
+        :param bool prefetch: Whether to request the next page, from another
+            thread, while the current one is consumed.
+        :return: A generator yielding the entities, as :meth:`list` returns
+            them.
+
+        """
+        options = dict(options or {})
+        options[u'per-page'] = page_size
+        # The API backend state is per thread
+        use_api = rest.is_enabled()
+
+        def fetch(page):
+            """Return the entities of ``page``."""
+            with rest.enabled(use_api):
+                return cls.list(dict(options, page=page))
+
+        pool = ThreadPool(1) if prefetch else None
+        try:
+            page = 1
+            pending = pool.apply_async(fetch, (page,)) if prefetch else None
+            while True:
+                result = pending.get() if prefetch else fetch(page)
+                if not result:
+                    return
+                page += 1
+                if prefetch:
+                    pending = pool.apply_async(fetch, (page,))
+                for entity in result:
+                    yield entity
+        finally:
+            if pool is not None:
+                # Wait for the page being fetched when the iteration stops
+                pool.close()
+                pool.join()
+
     @classmethod
     def puppetclasses(cls, options=None):
         """
@@ -401,6 +635,9 @@ class Base(object):
 
         cls.command_sub = 'update'
 
+        if cls._use_api(options):
+            return cls._execute_api(options)
+
         result = cls.execute(
             cls._construct_command(options), output_format='csv')
 
@@ -26,6 +26,7 @@ class Environment(Base):
     """Manipulates Foreman's environments."""
 
     command_base = 'environment'
+    create_fields = ('id', 'name')
 
     @classmethod
     def sc_params(cls, options=None):
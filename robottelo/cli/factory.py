@@ -8,7 +8,9 @@ import json
 import logging
 import os
 import random
+import time
 
+from contextlib import closing
 from fauxfactory import (
     gen_alphanumeric,
     gen_integer,
@@ -17,8 +19,10 @@ from fauxfactory import (
     gen_netmask,
     gen_string,
 )
+from multiprocessing.pool import ThreadPool
 from os import chmod
-from robottelo import manifests, ssh
+from robottelo import cache, manifests, ssh
+from robottelo.cli import rest
 from robottelo.cli.activationkey import ActivationKey
 from robottelo.cli.architecture import Architecture
 from robottelo.cli.base import CLIReturnCodeError
@@ -50,6 +54,7 @@ from robottelo.cli.syncplan import SyncPlan
 from robottelo.cli.template import Template
 from robottelo.cli.user import User
 from robottelo.cli.usergroup import UserGroup, UserGroupExternal
+from robottelo.config import settings
 from robottelo.constants import (
     DEFAULT_SUBSCRIPTION_NAME,
     DOCKER_0_EXTERNAL_REGISTRY,
@@ -61,6 +66,7 @@ from robottelo.constants import (
 )
 from robottelo.decorators import cacheable
 from robottelo.helpers import update_dictionary
+from robottelo.plan import Plan
 from robottelo.ssh import upload_file
 from tempfile import mkstemp
 
@@ -75,10 +81,43 @@ class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
 
 
+class CLIFactoryBulkError(CLIFactoryError):
+    """Indicates some entities of a bulk creation could not be created.
+
+    :param str message: explanation of the error.
+    :param results: A :class:`BulkResult` with ``None`` in place of the
+        entities which could not be created.
+    :param dict errors: Maps the index of each entity which could not be
+        created to the exception raised.
+
+    """
+    def __init__(self, message, results, errors):
+        super(CLIFactoryBulkError, self).__init__(message)
+        self.results = results
+        self.errors = errors
+
+
+class BulkResult(list):
+    """The entities created by :func:`make_many`, in creation order.
+
+    :ivar float elapsed: Seconds taken to create all the entities.
+    :ivar float throughput: Entities created per second.
+
+    """
+    def __init__(self, entities, elapsed):
+        super(BulkResult, self).__init__(entities)
+        self.elapsed = elapsed
+        created = len([entity for entity in entities if entity is not None])
+        self.throughput = created / elapsed if elapsed > 0 else 0.0
+
+
 def create_object(cli_object, options, values):
     """
     Creates <object> with dictionary of arguments.
 
+    When ``[cli] factory_backend`` is ``api`` the object is created through
+    the API when possible, see :mod:`robottelo.cli.rest`.
+
     :param cli_object: A valid CLI object.
     :param dict options: The default options accepted by the cli_object
         create
@@ -90,8 +129,10 @@ def create_object(cli_object, options, values):
 
     """
     update_dictionary(options, values)
+    use_api = rest.is_enabled() or settings.cli.factory_backend == 'api'
     try:
-        result = cli_object.create(options)
+        with rest.enabled(use_api):
+            result = cli_object.create(options)
     except CLIReturnCodeError as err:
         # If the object is not created, raise exception, stop the show.
         raise CLIFactoryError(
@@ -110,6 +151,43 @@ def create_object(cli_object, options, values):
     return result
 
 
+def _entity_exists(cli_object):
+    """Return a function telling whether a cached entity of ``cli_object``
+    still exists on the server, see :func:`robottelo.cache.register_validator`.
+    """
+    def validator(entity):
+        """Fetch the entity information."""
+        try:
+            cli_object.info({u'id': entity['id']})
+        except CLIReturnCodeError:
+            return False
+        return True
+    return validator
+
+
+for _name, _cli_object in (
+        ('activation_key', ActivationKey),
+        ('architecture', Architecture),
+        ('compute_resource', ComputeResource),
+        ('content_view', ContentView),
+        ('domain', Domain),
+        ('environment', Environment),
+        ('host_collection', HostCollection),
+        ('hostgroup', HostGroup),
+        ('location', Location),
+        ('medium', Medium),
+        ('model', Model),
+        ('org', Org),
+        ('os', OperatingSys),
+        ('partition_table', PartitionTable),
+        ('role', Role),
+        ('subnet', Subnet),
+        ('template', Template),
+        ('user', User),
+):
+    cache.register_validator(_name, _entity_exists(_cli_object))
+
+
 @cacheable
 def make_activation_key(options=None):
     """
@@ -1671,6 +1749,129 @@ def make_template(options=None):
     return create_object(Template, args, options)
 
 
+def make_many(make_fn, count, options_fn=None, concurrency=5):
+    """Create ``count`` entities using ``make_fn`` concurrently.
+
+    Entities are created by a pool of ``concurrency`` threads, sharing the
+    pooled SSH connections or, when enabled, the API backend (see
+    :mod:`robottelo.cli.rest`).
+
+    :param make_fn: A factory function like :func:`make_org`.
+    :param int count: Number of entities to create.
+    :param options_fn: Callable receiving the index of each entity and
+        returning the options to pass to ``make_fn``. By default ``make_fn``
+        is called without options.
+    :param int concurrency: Maximum number of entities created at the same
+        time.
+    :rtype: BulkResult
+    :return: The entities created, in the order of their indexes.
+    :raise robottelo.cli.factory.CLIFactoryBulkError: If any entity could
+        not be created. Its ``results`` has the entities which were created.
+
+    """
+    use_api = rest.is_enabled()
+
+    def make(index):
+        """Create the entity ``index``, returning its error if any."""
+        options = options_fn(index) if options_fn is not None else None
+        try:
+            with rest.enabled(use_api):
+                return make_fn(options), None
+        except Exception as err:  # pylint:disable=broad-except
+            return None, err
+
+    start = time.time()
+    with closing(ThreadPool(max(1, min(concurrency, count)))) as pool:
+        outcomes = pool.map(make, range(count))
+    results = BulkResult(
+        [entity for entity, _ in outcomes], time.time() - start)
+    logger.info(
+        '%s created %d entities in %.2f seconds (%.2f per second)',
+        make_fn.__name__, count, results.elapsed, results.throughput,
+    )
+    errors = dict(
+        (index, err) for index, (_, err) in enumerate(outcomes)
+        if err is not None
+    )
+    if errors:
+        raise CLIFactoryBulkError(
+            u'{0} failed to create {1} of {2} entities:\n{3}'.format(
+                make_fn.__name__,
+                len(errors),
+                count,
+                u'\n'.join(
+                    u'{0}: {1}'.format(index, err)
+                    for index, err in sorted(errors.items())
+                ),
+            ),
+            results,
+            errors,
+        )
+    return results
+
+
+def _make_bulk(make_fn, count, options, concurrency):
+    """Create ``count`` entities using ``make_fn`` and the same
+    ``options``.
+    """
+    return make_many(
+        make_fn,
+        count,
+        options_fn=lambda index: dict(options or {}),
+        concurrency=concurrency,
+    )
+
+
+def make_domain_bulk(count, options=None, concurrency=5):
+    """Create ``count`` domains, see :func:`make_many`."""
+    return _make_bulk(make_domain, count, options, concurrency)
+
+
+def make_host_bulk(count, options=None, concurrency=5):
+    """Create ``count`` hosts, see :func:`make_many`."""
+    return _make_bulk(make_host, count, options, concurrency)
+
+
+def make_lifecycle_environment_bulk(count, options=None, concurrency=5):
+    """Create ``count`` lifecycle environments, see :func:`make_many`.
+
+    All the environments have the same prior environment, defaulting to
+    Library.
+
+    """
+    return _make_bulk(make_lifecycle_environment, count, options, concurrency)
+
+
+def make_location_bulk(count, options=None, concurrency=5):
+    """Create ``count`` locations, see :func:`make_many`."""
+    return _make_bulk(make_location, count, options, concurrency)
+
+
+def make_org_bulk(count, options=None, concurrency=5):
+    """Create ``count`` organizations, see :func:`make_many`."""
+    return _make_bulk(make_org, count, options, concurrency)
+
+
+def make_product_bulk(count, options=None, concurrency=5):
+    """Create ``count`` products, see :func:`make_many`."""
+    return _make_bulk(make_product, count, options, concurrency)
+
+
+def make_repository_bulk(count, options=None, concurrency=5):
+    """Create ``count`` repositories, see :func:`make_many`."""
+    return _make_bulk(make_repository, count, options, concurrency)
+
+
+def make_subnet_bulk(count, options=None, concurrency=5):
+    """Create ``count`` subnets, see :func:`make_many`."""
+    return _make_bulk(make_subnet, count, options, concurrency)
+
+
+def make_user_bulk(count, options=None, concurrency=5):
+    """Create ``count`` users, see :func:`make_many`."""
+    return _make_bulk(make_user, count, options, concurrency)
+
+
 def activationkey_add_subscription_to_repo(options=None):
     """
     Adds subscription to activation key.
@@ -1715,6 +1916,153 @@ def activationkey_add_subscription_to_repo(options=None):
                 )
 
 
+def _setup_org_plan(name, options):
+    """Return a fixture plan creating the organization and lifecycle
+    environment if they are not given in ``options``.
+
+    Steps run with the API backend if it is enabled in the calling thread.
+
+    """
+    use_api = rest.is_enabled()
+    plan = Plan(name, context=lambda: rest.enabled(use_api))
+    # Create new organization and lifecycle environment if needed
+    plan.step(
+        'organization-id',
+        lambda inputs: make_org()['id'],
+        value=options.get('organization-id'),
+    )
+    plan.step(
+        'lifecycle-environment-id',
+        lambda inputs: make_lifecycle_environment({
+            u'organization-id': inputs['organization-id']})['id'],
+        requires=('organization-id',),
+        value=options.get('lifecycle-environment-id'),
+    )
+    return plan
+
+
+def _add_content_view_plan_steps(plan, options, publish_requires=()):
+    """Add to ``plan`` the steps adding its ``repository`` to a content view,
+    publishing and promoting it, and associating an activation key with it.
+
+    The content view and activation key are created if they are not given in
+    ``options``.
+
+    :param tuple publish_requires: Steps to wait for before publishing the
+        content view, in addition to the repository association.
+
+    """
+    def add_repository(inputs):
+        """Associate the repository with the content view."""
+        try:
+            ContentView.add_repository({
+                u'id': inputs['content-view-id'],
+                u'organization-id': inputs['organization-id'],
+                u'repository-id': inputs['repository']['id'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to add repository to content view\n{0}'
+                .format(err.msg)
+            )
+
+    def publish(inputs):
+        """Publish a new version of CV and return it."""
+        try:
+            ContentView.publish({u'id': inputs['content-view-id']})
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to publish new version of content view\n{0}'
+                .format(err.msg)
+            )
+        # Get the version id
+        try:
+            return ContentView.info(
+                {u'id': inputs['content-view-id']})['versions'][-1]
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch content view info\n{0}'.format(err.msg))
+
+    def promote(inputs):
+        """Promote version to next env."""
+        try:
+            ContentView.version_promote({
+                u'id': inputs['content-view-version']['id'],
+                u'organization-id': inputs['organization-id'],
+                u'to-lifecycle-environment-id': (
+                    inputs['lifecycle-environment-id']),
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to promote version to next environment\n{0}'
+                .format(err.msg)
+            )
+
+    def activation_key(inputs):
+        """Create activation key if needed and associate content view with
+        it.
+        """
+        if options.get('activationkey-id') is None:
+            return make_activation_key({
+                u'content-view-id': inputs['content-view-id'],
+                u'lifecycle-environment-id': (
+                    inputs['lifecycle-environment-id']),
+                u'organization-id': inputs['organization-id'],
+            })['id']
+        # Given activation key may have no (or different) CV associated.
+        # Associate activation key with CV just to be sure
+        try:
+            ActivationKey.update({
+                u'content-view-id': inputs['content-view-id'],
+                u'id': options['activationkey-id'],
+                u'organization-id': inputs['organization-id'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to associate activation-key with CV\n{0}'
+                .format(err.msg)
+            )
+        return options['activationkey-id']
+
+    # Create CV if needed and associate repo with it
+    plan.step(
+        'content-view-id',
+        lambda inputs: make_content_view({
+            u'organization-id': inputs['organization-id']})['id'],
+        requires=('organization-id',),
+        value=options.get('content-view-id'),
+    )
+    plan.step(
+        'add-repository',
+        add_repository,
+        requires=('content-view-id', 'organization-id', 'repository'),
+    )
+    plan.step(
+        'content-view-version',
+        publish,
+        requires=('add-repository', 'content-view-id') + publish_requires,
+    )
+    plan.step(
+        'promote',
+        promote,
+        requires=(
+            'content-view-version',
+            'lifecycle-environment-id',
+            'organization-id',
+        ),
+    )
+    plan.step(
+        'activationkey-id',
+        activation_key,
+        requires=(
+            'content-view-id',
+            'lifecycle-environment-id',
+            'organization-id',
+            'promote',
+        ),
+    )
+
+
 def setup_org_for_a_custom_repo(options=None):
     """Sets up Org for the given custom repo by:
 
@@ -1729,6 +2077,10 @@ def setup_org_for_a_custom_repo(options=None):
         associates it with the content view.
     5. Adds the custom repo subscription to the activation key
 
+    Steps which do not depend on each other, like creating the lifecycle
+    environment, the product and the content view, run concurrently, see
+    :class:`robottelo.plan.Plan`.
+
     Options::
 
         url - URL to custom repository
@@ -1749,99 +2101,50 @@ def setup_org_for_a_custom_repo(options=None):
             not options or
             not options.get('url')):
         raise CLIFactoryError('Please provide valid custom repo URL.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Create custom product and repository
-    custom_product = make_product({u'organization-id': org_id})
-    custom_repo = make_repository({
-        u'content-type': 'yum',
-        u'product-id': custom_product['id'],
-        u'url': options.get('url'),
-    })
-    # Synchronize custom repository
-    try:
-        Repository.synchronize({'id': custom_repo['id']})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': custom_repo['id'],
+    plan = _setup_org_plan('setup_org_for_a_custom_repo', options)
+
+    def make_custom_repository(inputs):
+        """Create the custom repository and synchronize it."""
+        custom_repo = make_repository({
+            u'content-type': 'yum',
+            u'product-id': inputs['product']['id'],
+            u'url': options.get('url'),
         })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+        # Synchronize custom repository
         try:
-            ActivationKey.update({
-                u'content-view-id': cv_id,
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-            })
+            Repository.synchronize({'id': custom_repo['id']})
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+        return custom_repo
+
+    # Create custom product and repository
+    plan.step(
+        'product',
+        lambda inputs: make_product({
+            u'organization-id': inputs['organization-id']}),
+        requires=('organization-id',),
+    )
+    plan.step('repository', make_custom_repository, requires=('product',))
+    _add_content_view_plan_steps(plan, options)
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'activationkey-id': activationkey_id,
-        u'organization-id': org_id,
-        u'subscription': custom_product['name'],
-    })
+    plan.step(
+        'subscription',
+        lambda inputs: activationkey_add_subscription_to_repo({
+            u'activationkey-id': inputs['activationkey-id'],
+            u'organization-id': inputs['organization-id'],
+            u'subscription': inputs['product']['name'],
+        }),
+        requires=('activationkey-id', 'organization-id', 'product'),
+    )
+    results = plan.run()
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'product-id': custom_product['id'],
-        u'repository-id': custom_repo['id'],
+        u'activationkey-id': results['activationkey-id'],
+        u'content-view-id': results['content-view-id'],
+        u'lifecycle-environment-id': results['lifecycle-environment-id'],
+        u'organization-id': results['organization-id'],
+        u'product-id': results['product']['id'],
+        u'repository-id': results['repository']['id'],
     }
 
 
@@ -1860,6 +2163,10 @@ def setup_org_for_a_rh_repo(options=None):
         associates it with the content view.
     6. Adds the RH repo subscription to the activation key
 
+    Steps which do not depend on each other, like creating the lifecycle
+    environment, the product and the content view, run concurrently, see
+    :class:`robottelo.plan.Plan`.
+
     Options::
 
         product - RH product name
@@ -1887,130 +2194,94 @@ def setup_org_for_a_rh_repo(options=None):
             not options.get('repository')):
         raise CLIFactoryError(
             'Please provide valid product, repository-set and repo.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({
-            u'file': manifest.filename,
-            u'organization-id': org_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to upload manifest\n{0}'.format(err.msg))
-    # Enable repo from Repository Set
-    try:
-        RepositorySet.enable({
-            u'basearch': 'x86_64',
-            u'name': options['repository-set'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-            u'releasever': options.get('releasever'),
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to enable repository set\n{0}'.format(err.msg))
-    # Fetch repository info
-    try:
-        rhel_repo = Repository.info({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch repository info\n{0}'.format(err.msg))
-    # Synchronize the RH repository
-    try:
-        Repository.synchronize({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': rhel_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    try:
-        cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch content view info\n{0}'.format(err.msg))
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+    plan = _setup_org_plan('setup_org_for_a_rh_repo', options)
+
+    def upload_manifest(inputs):
+        """Clone manifest and upload it."""
+        with manifests.clone() as manifest:
+            upload_file(manifest.content, manifest.filename)
         try:
-            ActivationKey.update({
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-                u'content-view-id': cv_id,
+            Subscription.upload({
+                u'file': manifest.filename,
+                u'organization-id': inputs['organization-id'],
             })
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
+                u'Failed to upload manifest\n{0}'.format(err.msg))
+
+    def enable_repository_set(inputs):
+        """Enable repo from Repository Set."""
+        try:
+            RepositorySet.enable({
+                u'basearch': 'x86_64',
+                u'name': options['repository-set'],
+                u'organization-id': inputs['organization-id'],
+                u'product': options['product'],
+                u'releasever': options.get('releasever'),
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to enable repository set\n{0}'.format(err.msg))
+
+    def fetch_repository(inputs):
+        """Fetch repository info."""
+        try:
+            return Repository.info({
+                u'name': options['repository'],
+                u'organization-id': inputs['organization-id'],
+                u'product': options['product'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch repository info\n{0}'.format(err.msg))
+
+    def synchronize_repository(inputs):
+        """Synchronize the RH repository."""
+        try:
+            Repository.synchronize({
+                u'name': options['repository'],
+                u'organization-id': inputs['organization-id'],
+                u'product': options['product'],
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to synchronize repository\n{0}'.format(err.msg))
+
+    plan.step('manifest', upload_manifest, requires=('organization-id',))
+    plan.step(
+        'repository-set',
+        enable_repository_set,
+        requires=('manifest', 'organization-id'),
+    )
+    plan.step(
+        'repository',
+        fetch_repository,
+        requires=('organization-id', 'repository-set'),
+    )
+    # Runs along with the info, the subcommand stored by each Repository
+    # method is kept per thread
+    plan.step(
+        'synchronize',
+        synchronize_repository,
+        requires=('organization-id', 'repository-set'),
+    )
+    _add_content_view_plan_steps(
+        plan, options, publish_requires=('synchronize',))
     # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'organization-id': org_id,
-        u'activationkey-id': activationkey_id,
-        u'subscription': DEFAULT_SUBSCRIPTION_NAME,
-    })
+    plan.step(
+        'subscription',
+        lambda inputs: activationkey_add_subscription_to_repo({
+            u'organization-id': inputs['organization-id'],
+            u'activationkey-id': inputs['activationkey-id'],
+            u'subscription': DEFAULT_SUBSCRIPTION_NAME,
+        }),
+        requires=('activationkey-id', 'organization-id'),
+    )
+    results = plan.run()
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'repository-id': rhel_repo['id'],
+        u'activationkey-id': results['activationkey-id'],
+        u'content-view-id': results['content-view-id'],
+        u'lifecycle-environment-id': results['lifecycle-environment-id'],
+        u'organization-id': results['organization-id'],
+        u'repository-id': results['repository']['id'],
     }
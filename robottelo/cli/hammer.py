@@ -3,8 +3,48 @@ import csv
 import re
 import six
 
+from collections import OrderedDict
+from io import BytesIO, StringIO
 from six.moves import zip
-from six.moves import cStringIO as StringIO
+
+
+# Numbers of the properties listed in info outputs, like " 1) value"
+INFO_NUMBER_REGEX = re.compile(r'(\d+)\)')
+INFO_NUMBERED_VALUE_REGEX = re.compile(r'\d+\)\s+(.+)$')
+
+#: Columns whose values are converted to integers by
+#: :func:`parse_csv_columns`, in addition to the ``-id`` and ``-count`` ones.
+INTEGER_COLUMNS = ('id', 'count')
+
+
+def _csv_lines(lines):
+    """Prepare lines for the CSV reader, ending each one with a new line so
+    quoted values spanning several lines keep their new lines.
+    """
+    for line in lines:
+        if six.PY2 and isinstance(line, six.text_type):
+            line = line.encode('utf8')
+        elif not six.PY2 and isinstance(line, bytes):
+            line = line.decode('utf8')
+        yield line + '\n'
+
+
+def _csv_file(output):
+    """Return a file like object reading the whole ``output`` for the CSV
+    reader, so it is split into lines by the reader itself.
+    """
+    if isinstance(output, (list, tuple)):
+        if output and isinstance(output[0], bytes):
+            output = b'\n'.join(output)
+        else:
+            output = u'\n'.join(output)
+    if six.PY2:
+        if isinstance(output, six.text_type):
+            output = output.encode('utf8')
+        return BytesIO(output)
+    if isinstance(output, bytes):
+        output = output.decode('utf8')
+    return StringIO(output)
 
 
 def _csv_reader(output):
@@ -18,33 +58,110 @@ def _csv_reader(output):
         Also, there are currently some issues regarding ASCII NUL characters.
         Accordingly, all input should be UTF-8 or printable ASCII to be safe;"
 
-    On Python 3 this generator is not needed because the default string type is
-    unicode.
+    On Python 2 the UTF-8 encoded output is given as is to the CSV reader, so
+    the raw output of a command is parsed without being decoded first, and
+    each row values are decoded at once. On Python 3 the output is decoded if
+    needed.
 
-    :param output: can be any object which supports the iterator protocol and
-    returns a unicode string each time its next() method is called.
-    :return: generator that will yield a list of unicode string values.
+    :param output: the output, either whole, as ``bytes`` or unicode string,
+        or as a list of lines. Any other object which supports the iterator
+        protocol and returns a line each time its next() method is called is
+        read lazily.
+    :return: generator that will yield a list of unicode string values for
+        each non empty row.
 
     """
-    data = '\n'.join(output)
-    if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
+    if isinstance(output, (bytes, six.text_type, list, tuple)):
+        reader = csv.reader(_csv_file(output))
+    else:
+        reader = csv.reader(_csv_lines(output))
 
-    for row in csv.reader(handler):
+    for row in reader:
+        if not row:
+            continue
         if six.PY2:
-            yield [value.decode('utf8') for value in row]
+            # Values can't contain NUL characters, decoding them joined is
+            # much faster than decoding them one by one
+            yield '\0'.join(row).decode('utf8').split(u'\0')
         else:
             yield row
 
 
+def _csv_keys(header):
+    """Generate the key names, spaces will be converted to dashes "-"."""
+    return [column.replace(' ', '-').lower() for column in header]
+
+
+def iter_csv(output):
+    """Parse CSV output from Hammer CLI lazily, yielding a python dictionary
+    for each row.
+
+    See :func:`_csv_reader` for the accepted ``output``.
+
+    """
+    reader = _csv_reader(output)
+    keys = _csv_keys(next(reader, []))
+    # For each entry, create a dict mapping each key with each value
+    for values in reader:
+        yield dict(zip(keys, values))
+
+
 def parse_csv(output):
     """Parse CSV output from Hammer CLI and convert it to python dictionary."""
+    return list(iter_csv(output))
+
+
+def _to_integer(value):
+    """Convert an integer column value, keeping the values which are not
+    integers and converting empty values to ``None``.
+    """
+    if value == u'':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _column_type(key, types, typed):
+    """Return the callable converting the values of the column ``key``."""
+    if types and key in types:
+        return types[key]
+    if typed and (key in INTEGER_COLUMNS or key.endswith('-id') or
+                  key.endswith('-count')):
+        return _to_integer
+    return None
+
+
+def parse_csv_columns(output, types=None, typed=False):
+    """Parse CSV output from Hammer CLI into columns.
+
+    No dictionary is created per row, which makes it cheaper than
+    :func:`parse_csv` for long lists when only a few columns are needed.
+
+    :param output: the output to parse, see :func:`_csv_reader`.
+    :param dict types: callables converting the values of some columns, by
+        key.
+    :param bool typed: whether to convert the values of the ``id``,
+        ``count``, ``*-id`` and ``*-count`` columns to integers, empty values
+        being converted to ``None``.
+    :return: the list of values of each column, by key, in the output
+        order.
+    :rtype: collections.OrderedDict
+
+    """
     reader = _csv_reader(output)
-    # Generate the key names, spaces will be converted to dashes "-"
-    keys = [header.replace(' ', '-').lower() for header in next(reader)]
-    # For each entry, create a dict mapping each key with each value
-    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+    keys = _csv_keys(next(reader, []))
+    columns = OrderedDict((key, []) for key in keys)
+    appends = [columns[key].append for key in keys]
+    for values in reader:
+        for append, value in zip(appends, values):
+            append(value)
+    for key in keys:
+        convert = _column_type(key, types, typed)
+        if convert is not None:
+            columns[key] = [convert(value) for value in columns[key]]
+    return columns
 
 
 def parse_help(output):
@@ -111,81 +228,171 @@ def parse_help(output):
     return contents
 
 
+def _info_key(key):
+    """Generate the key name of a property, spaces will be converted to
+    dashes "-".
+    """
+    return key.replace(' ', '-').lower()
+
+
+def _close_info_group(group):
+    """Store the sub-property ``group`` being closed as an empty value if
+    nothing was indented under it, as it was only a property without value.
+    """
+    _, container, parent, key, _ = group
+    if container == {} and parent[key] is container:
+        parent[key] = u''
+
+
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
-    # info dictionary
+    """Parse the info output and returns a dict mapping the values.
+
+    The output is read in a single pass. Properties without value contain the
+    sub-properties indented under them, at any depth, the top level ones
+    being dicts even if nothing is indented under them::
+
+        Content Information:
+            Content View:
+                ID:   1
+                Name: Default Organization View
+            Applicable Packages: 12
+
+    gives ``{'content-information': {'content-view': {'id': '1', 'name':
+    'Default Organization View'}, 'applicable-packages': '12'}}``.
+
+    Numbered values or groups of properties, like ``1) value`` or ``1) Repo
+    Name: repo1`` followed by the other properties of the repository, become
+    lists.
+
+    :param output: the lines of the output.
+
+    """
     contents = {}
-    sub_prop = None  # stores name of the last group of sub-properties
-    sub_num = None  # is not None when list of properties
+    # Open groups of sub-properties, from the top level one, as lists of the
+    # indentation of their key, the group, its parent and its key in the
+    # parent, and whether it is a list of numbered groups being filled
+    groups = []
 
     for line in output:
         # skip empty lines
         if line == '':
             continue
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>'
-            if line.find(':') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+        if line[0] != ' ':
+            # Top level property, sub-properties after a value still go in
+            # the last top level group
+            for group in reversed(groups[1:]):
+                _close_info_group(group)
+            del groups[1:]
+            key, value = line.lstrip().split(':', 1)
+            key = _info_key(key.lstrip())
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new group of sub-properties
+                contents[key] = {}
+                groups = [[0, contents[key], contents, key, False]]
+            else:  # 'key: value' line
+                contents[key] = value
+                if groups:
+                    groups[0][4] = False
+            continue
 
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
+        # sub-properties are indented
+        text = line.lstrip()
+        indent = len(line) - len(text)
+        while len(groups) > 1 and groups[-1][0] >= indent:
+            _close_info_group(groups.pop())
+        if not groups:
+            raise KeyError(
+                u'Sub-property without property: {0}'.format(line))
+        group = groups[-1]
 
-                value = match.group(1)
+        # values are separated by ':' or '=>'
+        if ':' in text:
+            key, _, value = text.partition(':')
+        elif '=>' in text:
+            key, value = text.split(' =>', 1)
+        else:
+            # Parse single attribute collection properties
+            # Template
+            #  1) template1
+            #  2) template2
+            #
+            # or
+            # Template
+            #  template1
+            #  template2
+            match = INFO_NUMBERED_VALUE_REGEX.match(text)
+            if match is not None:
+                text = match.group(1)
+            if isinstance(group[1], dict):
+                group[1] = group[2][group[3]] = []
+            group[1].append(text)
+            continue
 
-                if isinstance(contents[sub_prop], dict):
-                    contents[sub_prop] = []
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        if key[:1].isdigit():
+            starts_with_number = INFO_NUMBER_REGEX.match(key)
+            if starts_with_number:
+                # no. 1) we need to change dict() to list()
+                if int(starts_with_number.group(1)) == 1:
+                    group[1] = group[2][group[3]] = []
+                # remove number from key
+                key = INFO_NUMBER_REGEX.sub('', key)
+                # append empty dict to array
+                group[1].append({})
+                group[4] = True
 
-                contents[sub_prop].append(value)
-            else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value.lstrip()
-                else:
-                    contents[sub_prop][key] = value.lstrip()
+        key = _info_key(key.lstrip())
+        value = value.lstrip()
+        target = group[1][-1] if group[4] else group[1]
+        if value == '':  # 'key:' no value, new group of sub-properties
+            target[key] = {}
+            groups.append([indent, target[key], target, key, False])
         else:
-            sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
-            key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
-                sub_prop = key
-                contents[sub_prop] = {}
-            else:  # 'key: value' line
-                contents[key] = value.lstrip()
+            target[key] = value
 
+    for group in reversed(groups[1:]):
+        _close_info_group(group)
     return contents
+
+
+def _json_value(value, keys):
+    """Normalize a decoded JSON value, see :func:`parse_json`.
+
+    :param dict keys: normalized keys by key, shared by the whole output as
+        the same keys are repeated for every entity.
+
+    """
+    if isinstance(value, six.text_type):
+        return value
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            normalized = keys.get(key)
+            if normalized is None:
+                normalized = keys[key] = key.replace(' ', '-').lower()
+            result[normalized] = _json_value(item, keys)
+        return result
+    if isinstance(value, list):
+        return [_json_value(item, keys) for item in value]
+    if value is None:
+        return u''
+    if isinstance(value, bool):
+        return u'true' if value else u'false'
+    return six.text_type(value)
+
+
+def parse_json(data):
+    """Normalize JSON output from Hammer CLI, already decoded, to the format
+    of the other parsers.
+
+    Keys are lower cased with spaces converted to dashes "-", values are
+    converted to unicode strings and ``null`` to an empty string.
+
+    """
+    return _json_value(data, {})
@@ -103,19 +103,25 @@ class Import(Base):
         """
         result = []
         for csv_file in csv_files:
-            ssh_cat = ssh.command(u'cat {0}'.format(csv_file))
-            if ssh_cat.return_code != 0:
-                raise AssertionError(ssh_cat.stderr)
-            csv = ssh_cat.stdout[:-1]
-            keys = csv[0].split(',')
-            for val in csv[1:]:
-                record = dict(zip(keys, val.split(',')))
+            ssh_cat = ssh.command_stream(u'cat {0}'.format(csv_file))
+            keys = None
+            for line in ssh_cat:
+                # Keep the clean up done by ``ssh.command`` on each line
+                if not line or line.startswith('['):
+                    continue
+                line = line.replace('""', '')
+                if keys is None:
+                    keys = line.split(',')
+                    continue
+                record = dict(zip(keys, line.split(',')))
                 for entity in result:
                     if entity[key] == record[key]:
                         entity.update(record)
                         break
                 else:
                     result.append(record)
+            if ssh_cat.return_code != 0:
+                raise AssertionError(ssh_cat.stderr)
         return result
 
     @classmethod
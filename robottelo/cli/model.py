@@ -27,3 +27,4 @@ class Model(Base):
     """
 
     command_base = 'model'
+    create_fields = ('id', 'name')
@@ -0,0 +1,574 @@
+# -*- encoding: utf-8 -*-
+"""Run hammer entity commands directly against the Foreman/Katello API.
+
+Creating fixtures through hammer means an SSH round trip plus a new Ruby
+process which itself does the HTTP calls. For the ``create``, ``info``,
+``list``, ``update`` and ``delete`` subcommands of the entities listed in
+:data:`RESOURCES` this module does the equivalent API call over a pooled
+``requests.Session`` and returns the same dictionaries
+:func:`robottelo.cli.hammer.parse_info` and
+:func:`robottelo.cli.hammer.parse_csv` would return for the hammer output.
+
+The API backend is only used when it is enabled, either globally with
+``[cli] factory_backend=api`` for the :mod:`robottelo.cli.factory` functions
+or for a block of code with :func:`enabled`, so tests verifying hammer itself
+keep running hammer. Commands which are not covered, or use options which
+can't be translated, are still run by hammer.
+
+"""
+import logging
+import threading
+
+import requests
+import six
+
+from contextlib import contextmanager
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: Return code reported for failed API calls, the one hammer uses for
+#: unexpected errors (``EX_SOFTWARE``).
+ERROR_RETURN_CODE = 70
+
+#: Subcommands the API backend can run.
+SUBCOMMANDS = ('create', 'info', 'list', 'update', 'delete')
+
+
+class APIError(Exception):
+    """Indicates an API call made on behalf of a hammer command failed.
+
+    :param int status_code: HTTP status code of the response, ``None`` if
+        the error was detected before making the call.
+    :param str message: explanation of the error.
+
+    """
+    def __init__(self, status_code, message):
+        super(APIError, self).__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def _to_text(value):
+    """Format an API value the way hammer prints it."""
+    if value is None:
+        return u''
+    if isinstance(value, bool):
+        return u'true' if value else u'false'
+    if isinstance(value, (list, tuple)):
+        return u', '.join(_to_text(item) for item in value)
+    return six.text_type(value)
+
+
+def _lookup(data, path):
+    """Return the value at the dotted ``path`` of the ``data`` dict."""
+    for key in path.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _nested(fields):
+    """Output field made of a sub dictionary, like ``Product:`` in the
+    hammer repository info output.
+    """
+    return lambda data: format_entity(data, fields)
+
+
+def _each(path, fields):
+    """Output field made of a list of sub dictionaries, like ``Versions:`` in
+    the hammer content view info output.
+    """
+    return lambda data: [
+        format_entity(item, fields) for item in _lookup(data, path) or []
+    ]
+
+
+def format_entity(data, fields):
+    """Build a hammer like dictionary from an API entity.
+
+    :param dict data: The entity returned by the API.
+    :param fields: Pairs of hammer key and field specification. A field
+        specification is either the dotted path of the API attribute or a
+        callable receiving the entity.
+    :rtype: dict
+
+    """
+    result = {}
+    for key, spec in fields:
+        if callable(spec):
+            result[key] = spec(data)
+        else:
+            result[key] = _to_text(_lookup(data, spec))
+    return result
+
+
+class Resource(object):
+    """Describes how a hammer entity maps to the API.
+
+    :param str path: Path of the API collection.
+    :param info_fields: Fields of the ``info`` output, see
+        :func:`format_entity`.
+    :param list_fields: Fields of every ``list`` output row.
+    :param dict options: Hammer options whose API parameter is not the option
+        name with dashes replaced by underscores.
+
+    """
+    def __init__(self, path, info_fields, list_fields, options=None):
+        self.path = path
+        self.info_fields = info_fields
+        self.list_fields = list_fields
+        self.options = options or {}
+
+    def parameter(self, option):
+        """Return the API parameter name for a hammer option."""
+        return self.options.get(option, option.replace('-', '_'))
+
+
+_ORGANIZATION = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('label', 'label'),
+    ('title', 'title'),
+    ('description', 'description'),
+)
+
+#: Entities supported by the API backend, keyed by hammer command base.
+RESOURCES = {
+    'activation-key': Resource(
+        '/katello/api/v2/activation_keys',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('description', 'description'),
+            ('content-view', 'content_view.name'),
+            ('lifecycle-environment', 'environment.name'),
+            ('host-limit', lambda data: (
+                u'Unlimited' if data.get('unlimited_content_hosts')
+                else _to_text(data.get('max_content_hosts'))
+            )),
+        ),
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('lifecycle-environment', 'environment.name'),
+            ('content-view', 'content_view.name'),
+        ),
+        {'lifecycle-environment-id': 'environment_id'},
+    ),
+    'architecture': Resource(
+        '/api/v2/architectures',
+        (('id', 'id'), ('name', 'name')),
+        (('id', 'id'), ('name', 'name')),
+    ),
+    'content-view': Resource(
+        '/katello/api/v2/content_views',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('label', 'label'),
+            ('composite', 'composite'),
+            ('description', 'description'),
+            ('organization', 'organization.name'),
+            ('versions', _each('versions', (
+                ('id', 'id'),
+                ('version', 'version'),
+                ('published', 'published'),
+            ))),
+        ),
+        (
+            ('content-view-id', 'id'),
+            ('name', 'name'),
+            ('label', 'label'),
+            ('composite', 'composite'),
+            ('repository-ids', lambda data: u', '.join(
+                _to_text(repo_id) for repo_id in data.get('repository_ids', [])
+            )),
+        ),
+        {'lifecycle-environment-id': 'environment_id'},
+    ),
+    'domain': Resource(
+        '/api/v2/domains',
+        (('id', 'id'), ('name', 'name'), ('description', 'fullname')),
+        (('id', 'id'), ('name', 'name')),
+        {'description': 'fullname'},
+    ),
+    'host-collection': Resource(
+        '/katello/api/v2/host_collections',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('description', 'description'),
+            ('limit', lambda data: (
+                u'None' if data.get('unlimited_hosts')
+                else _to_text(data.get('max_hosts'))
+            )),
+        ),
+        (('id', 'id'), ('name', 'name'), ('limit', 'max_hosts')),
+    ),
+    'lifecycle-environment': Resource(
+        '/katello/api/v2/environments',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('label', 'label'),
+            ('description', 'description'),
+            ('organization', 'organization.name'),
+            ('library', 'library'),
+            ('prior-lifecycle-environment', 'prior.name'),
+        ),
+        (('id', 'id'), ('name', 'name'), ('prior', 'prior.name')),
+        {'prior-id': 'prior'},
+    ),
+    'location': Resource(
+        '/api/v2/locations',
+        (('id', 'id'), ('name', 'name'), ('description', 'description')),
+        (('id', 'id'), ('name', 'name')),
+    ),
+    'model': Resource(
+        '/api/v2/models',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('info', 'info'),
+            ('vendor-class', 'vendor_class'),
+            ('hw-model', 'hardware_model'),
+        ),
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('vendor-class', 'vendor_class'),
+            ('hw-model', 'hardware_model'),
+        ),
+    ),
+    'organization': Resource(
+        '/katello/api/v2/organizations',
+        _ORGANIZATION,
+        _ORGANIZATION[:3] + (('description', 'description'),),
+    ),
+    'product': Resource(
+        '/katello/api/v2/products',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('label', 'label'),
+            ('description', 'description'),
+            ('organization', 'organization.name'),
+            ('sync-state', 'sync_state'),
+            ('gpg', _nested((
+                ('gpg-key-id', 'gpg_key_id'),
+                ('gpg-key', 'gpg_key.name'),
+            ))),
+        ),
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('description', 'description'),
+            ('organization', 'organization.name'),
+            ('repositories', 'repository_count'),
+            ('sync-state', 'sync_state'),
+        ),
+    ),
+    'repository': Resource(
+        '/katello/api/v2/repositories',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('label', 'label'),
+            ('organization', 'organization.name'),
+            ('red-hat-repository', lambda data: (
+                u'yes' if _lookup(data, 'product.redhat') else u'no')),
+            ('content-type', 'content_type'),
+            ('url', 'url'),
+            ('publish-via-http', lambda data: (
+                u'yes' if data.get('unprotected') else u'no')),
+            ('published-at', 'full_path'),
+            ('product', _nested((
+                ('id', 'product.id'),
+                ('name', 'product.name'),
+            ))),
+            ('gpg-key', _nested((
+                ('id', 'gpg_key.id'),
+                ('name', 'gpg_key.name'),
+            ))),
+        ),
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('product', 'product.name'),
+            ('content-type', 'content_type'),
+            ('url', 'url'),
+        ),
+        {'publish-via-http': 'unprotected'},
+    ),
+    'role': Resource(
+        '/api/v2/roles',
+        (('id', 'id'), ('name', 'name')),
+        (('id', 'id'), ('name', 'name')),
+    ),
+    'subnet': Resource(
+        '/api/v2/subnets',
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('network', 'network'),
+            ('mask', 'mask'),
+            ('gateway', 'gateway'),
+            ('vlan-id', 'vlanid'),
+        ),
+        (
+            ('id', 'id'),
+            ('name', 'name'),
+            ('network', 'network'),
+            ('mask', 'mask'),
+        ),
+    ),
+    'user': Resource(
+        '/api/v2/users',
+        (
+            ('id', 'id'),
+            ('login', 'login'),
+            ('name', lambda data: u'{0} {1}'.format(
+                data.get('firstname') or u'', data.get('lastname') or u''
+            ).strip()),
+            ('email', 'mail'),
+            ('admin', lambda data: (
+                u'yes' if data.get('admin') else u'no')),
+        ),
+        (
+            ('id', 'id'),
+            ('login', 'login'),
+            ('name', lambda data: u'{0} {1}'.format(
+                data.get('firstname') or u'', data.get('lastname') or u''
+            ).strip()),
+            ('email', 'mail'),
+        ),
+    ),
+}
+
+#: Hammer options referencing another entity by name, mapped to the option
+#: holding the same entity ID and the command base used to find it.
+REFERENCES = {
+    'content-view': ('content-view-id', 'content-view'),
+    'lifecycle-environment': (
+        'lifecycle-environment-id', 'lifecycle-environment'),
+    'organization': ('organization-id', 'organization'),
+    'prior': ('prior-id', 'lifecycle-environment'),
+    'product': ('product-id', 'product'),
+}
+
+#: Hammer options referencing entities by name, as hammer resolves them. The
+#: ones not in :data:`REFERENCES` are not supported.
+_NAME_OPTIONS = frozenset((
+    'architecture', 'content-view', 'domain', 'domains', 'environment',
+    'gpg-key', 'hostgroup', 'hostgroups', 'lifecycle-environment',
+    'location', 'locations', 'medium', 'operatingsystem', 'organization',
+    'organizations', 'prior', 'product', 'ptable', 'realm', 'roles',
+    'subnet', 'subnets', 'sync-plan', 'user-group', 'user-groups', 'users',
+))
+
+#: Hammer options used to scope searches by name.
+_SCOPE_OPTIONS = ('organization-id', 'product-id')
+
+_state = threading.local()
+
+
+def is_enabled():
+    """Tell whether the API backend is enabled for the current thread."""
+    return getattr(_state, 'enabled', False)
+
+
+@contextmanager
+def enabled(enable=True):
+    """Enable the API backend for the hammer entity commands run by the
+    current thread in the block.
+
+    :param bool enable: Allows to run the block with the backend explicitly
+        enabled or disabled.
+
+    """
+    previous = is_enabled()
+    _state.enabled = enable
+    try:
+        yield
+    finally:
+        _state.enabled = previous
+
+
+def supports(command_base, command_sub, options=None):
+    """Tell whether a hammer command can be run by the API backend."""
+    if command_base not in RESOURCES or command_sub not in SUBCOMMANDS:
+        return False
+    for key, value in (options or {}).items():
+        if value is None or value is False:
+            continue
+        # Lookups by label or title are not supported
+        if (key.endswith('-label') or key.endswith('-title') or
+                (key in _NAME_OPTIONS and key not in REFERENCES)):
+            return False
+    return True
+
+
+def _session():
+    """Return the HTTP session of the current thread.
+
+    Sessions keep their connections to the server open between calls. They
+    are not shared between threads as ``requests`` does not guarantee their
+    thread safety.
+
+    """
+    session = getattr(_state, 'session', None)
+    if session is None:
+        session = _state.session = requests.Session()
+        session.verify = False
+        session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+
+def _request(method, path, user, password, **kwargs):
+    """Make an API call and return the decoded response.
+
+    :raises APIError: If the server answers with an error status.
+
+    """
+    url = u'{0}{1}'.format(settings.server.get_url(), path)
+    logger.debug('>>> [API] %s %s %s', method, url, kwargs)
+    response = _session().request(
+        method, url, auth=(user, password), **kwargs)
+    if response.status_code >= 400:
+        raise APIError(
+            response.status_code,
+            u'{0} {1} failed with status {2}:\n{3}'.format(
+                method, path, response.status_code, response.text)
+        )
+    if not response.content:
+        return {}
+    return response.json()
+
+
+def _parameters(resource, options):
+    """Translate hammer options into API parameters.
+
+    Values are converted the way hammer does: flags become ``True``, ``ids``
+    options become lists and escaped quotes in searches are unescaped.
+
+    """
+    params = {}
+    for key, value in options.items():
+        if value is None or value is False:
+            continue
+        if key.endswith('-ids') and isinstance(value, six.string_types):
+            value = [item.strip() for item in value.split(',')]
+        elif key == 'search':
+            value = value.replace('\\"', '"')
+        params[resource.parameter(key)] = value
+    return params
+
+
+def _search(command_base, name, scope, user, password):
+    """Return the entities of ``command_base`` named ``name``."""
+    resource = RESOURCES[command_base]
+    params = _parameters(resource, scope)
+    params.update({'search': u'name="{0}"'.format(name), 'per_page': 2})
+    return _request(
+        'GET', resource.path, user, password, params=params)['results']
+
+
+def _resolve_references(options, user, password):
+    """Replace options referencing entities by name with their ID options."""
+    options = dict(
+        (key, value) for key, value in options.items()
+        if value is not None and value is not False
+    )
+    # Organizations are resolved first as they scope the other searches
+    for key in sorted(REFERENCES, key=lambda key: key != 'organization'):
+        if key not in options:
+            continue
+        id_option, command_base = REFERENCES[key]
+        scope = dict(
+            (option, options[option]) for option in _SCOPE_OPTIONS
+            if option in options and option != id_option
+        )
+        name = options.pop(key)
+        found = _search(command_base, name, scope, user, password)
+        if len(found) != 1:
+            raise APIError(
+                None, u'Could not find {0} "{1}"'.format(key, name))
+        options[id_option] = found[0]['id']
+    return options
+
+
+def _entity_id(command_base, options, user, password):
+    """Return the ID of the entity a command acts on and the remaining
+    options.
+    """
+    options = dict(options)
+    if 'id' in options:
+        return options.pop('id'), options
+    if 'name' not in options:
+        raise APIError(None, u'Missing arguments for "id"')
+    name = options.pop('name')
+    scope = dict(
+        (option, options[option]) for option in _SCOPE_OPTIONS
+        if option in options
+    )
+    found = _search(command_base, name, scope, user, password)
+    if len(found) != 1:
+        raise APIError(
+            None, u'Could not find {0} "{1}"'.format(command_base, name))
+    return found[0]['id'], options
+
+
+def call(command_base, command_sub, options, user, password):
+    """Run a hammer command through the API.
+
+    :param str command_base: The hammer command base, for example
+        ``organization``.
+    :param str command_sub: One of :data:`SUBCOMMANDS`.
+    :param dict options: The hammer options.
+    :param str user: Foreman user making the calls.
+    :param str password: Foreman password.
+    :return: A dictionary for ``create`` and ``info``, like
+        :func:`robottelo.cli.hammer.parse_info` would return, a list of
+        dictionaries for ``list``, like
+        :func:`robottelo.cli.hammer.parse_csv`, and an empty list for
+        ``update`` and ``delete``.
+    :raises APIError: If an API call fails.
+
+    """
+    resource = RESOURCES[command_base]
+    options = _resolve_references(options or {}, user, password)
+    if command_sub == 'create':
+        entity = _request(
+            'POST', resource.path, user, password,
+            json=_parameters(resource, options),
+        )
+        return format_entity(entity, resource.info_fields)
+    if command_sub == 'list':
+        params = _parameters(resource, options)
+        return [
+            format_entity(item, resource.list_fields)
+            for item in _request(
+                'GET', resource.path, user, password, params=params
+            )['results']
+        ]
+    entity_id, options = _entity_id(command_base, options, user, password)
+    path = u'{0}/{1}'.format(resource.path, entity_id)
+    if command_sub == 'info':
+        entity = _request(
+            'GET', path, user, password,
+            params=_parameters(resource, options),
+        )
+        return format_entity(entity, resource.info_fields)
+    if command_sub == 'update':
+        _request(
+            'PUT', path, user, password,
+            json=_parameters(resource, options),
+        )
+    else:
+        _request(
+            'DELETE', path, user, password,
+            params=_parameters(resource, options),
+        )
+    return []
@@ -24,3 +24,4 @@ class Role(Base):
     """Manipulates Katello engine's role command."""
 
     command_base = 'role'
+    create_fields = ('id', 'name')
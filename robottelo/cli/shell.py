@@ -0,0 +1,283 @@
+# -*- encoding: utf-8 -*-
+"""Persistent hammer shell sessions used to run hammer commands.
+
+Every ``hammer`` call starts a new Ruby interpreter which loads all the hammer
+plugins and the apipie cache before running the command. A hammer shell
+session pays that cost only once: it is started on the server and then
+receives one command per line.
+
+Sessions are kept per ``(hostname, user, password)`` and are selected by
+setting ``[cli] backend=shell``. See :func:`execute`.
+
+The shell runs on a pseudo terminal, so hammer flushes its output after every
+command, and its ``stdout`` and ``stderr`` arrive merged. Lines are only sent
+once hammer displays its prompt: text typed ahead while hammer is busy would
+be echoed by the terminal in the middle of the output. In order to know where
+the output of a command ends, each command is followed by an unknown command
+named after a unique sentinel, and the output ends at the error hammer prints
+for it. As the shell does not report exit statuses, a command is considered
+failed when its output contains a hammer error message and in that case the
+whole output is returned as ``stderr``.
+
+"""
+import atexit
+import codecs
+import logging
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+
+from robottelo import ssh
+from robottelo.cassette import CassetteError, get_cassette
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: Prompt printed by hammer shell before reading each command.
+PROMPT = u'hammer> '
+
+#: Return code used for commands whose output contains an error message.
+ERROR_RETURN_CODE = 1
+
+# Terminal control sequences printed by readline, including color codes
+CONTROL_SEQUENCES_REGEX = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]|\x1b[=>]')
+ERROR_REGEX = re.compile(
+    r'^(Error:|ERROR:|\[ERROR|Could not |Missing arguments)')
+
+
+class HammerShellError(Exception):
+    """Indicates the hammer shell session failed or stopped responding."""
+
+
+class HammerShell(object):
+    """A long lived hammer shell session.
+
+    A session runs a single command at a time, concurrent callers wait for
+    their turn.
+
+    :param str user: Foreman user passed to hammer.
+    :param str password: Foreman password passed to hammer.
+    :param str hostname: The server running hammer. Defaults to
+        ``main.server.hostname``.
+    :param int timeout: Seconds to wait for the shell to start.
+
+    """
+
+    def __init__(self, user, password, hostname=None, timeout=120):
+        self.user = user
+        self.password = password
+        self.hostname = hostname or settings.server.hostname
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._client = None
+        self._channel = None
+        self._sentinel = u'__robottelo_{0}'.format(uuid.uuid4().hex)
+        self._counter = 0
+        self._decoder = None
+        self._partial = u''
+
+    @property
+    def alive(self):
+        """Tell whether the shell process is running."""
+        return (
+            self._channel is not None and
+            not self._channel.closed and
+            not self._channel.exit_status_ready()
+        )
+
+    def start(self):
+        """Start the hammer shell and wait until it is ready.
+
+        :raises robottelo.cassette.CassetteError: If a cassette is replayed,
+            hammer shell sessions are not recorded.
+
+        """
+        cassette = get_cassette()
+        if cassette is not None and not cassette.recording:
+            raise CassetteError(
+                'hammer shell sessions are not recorded in cassettes')
+        self.close()
+        hostname, username, password, key_filename = (
+            ssh._resolve_credentials(  # pylint:disable=protected-access
+                hostname=self.hostname)
+        )
+        self._client = ssh._connect(  # pylint:disable=protected-access
+            hostname, username, password, key_filename)
+        self._decoder = None
+        self._partial = u''
+        self._channel = self._client.get_transport().open_session()
+        self._channel.get_pty(width=1000)
+        self._channel.exec_command(
+            u'LANG={0} hammer -v -u {1} -p {2} shell'
+            .format(settings.locale, self.user, self.password)
+            .encode('utf-8')
+        )
+        logger.info(
+            'Started hammer shell for %s on %s', self.user, self.hostname)
+        # Discard the shell banner
+        self._read(time.time() + self.timeout, self.timeout)
+
+    def close(self):
+        """Stop the hammer shell."""
+        if self._channel is not None:
+            try:
+                self._channel.close()
+            except socket.error as err:
+                logger.debug('Error closing hammer shell channel: %s', err)
+            self._channel = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _read(self, deadline, timeout, sentinel=None):
+        """Read the output lines until hammer displays its prompt.
+
+        :param str sentinel: When given, the lines are read until the error
+            hammer prints for this unknown command, which is not returned,
+            and then until the prompt.
+        :return: The output lines, without the commands echoed back by
+            readline after the prompt.
+        :raises HammerShellError: If the shell stops or does not answer
+            before ``deadline``.
+
+        """
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        output = []
+        found = sentinel is None
+        while True:
+            if self._channel.recv_ready():
+                lines = (self._partial + self._decoder.decode(
+                    self._channel.recv(32768))).split(u'\n')
+                self._partial = lines.pop()
+                for line in lines:
+                    line = CONTROL_SEQUENCES_REGEX.sub(
+                        u'', line).replace(u'\r', u'')
+                    # Lines starting with the prompt are the commands echoed
+                    # back by readline
+                    if line.startswith(PROMPT):
+                        continue
+                    if (not found and ERROR_REGEX.match(line) and
+                            sentinel in line):
+                        found = True
+                        continue
+                    output.append(line)
+                # The prompt stays in the partial line, completed by the
+                # echo of the next command
+                if found and CONTROL_SEQUENCES_REGEX.sub(
+                        u'', self._partial).replace(u'\r', u'') == PROMPT:
+                    return output
+                continue
+            if self._channel.exit_status_ready():
+                raise HammerShellError(
+                    u'hammer shell exited with status {0}'
+                    .format(self._channel.recv_exit_status())
+                )
+            remaining = deadline - time.time()
+            if remaining <= 0 or not select.select(
+                    [self._channel], [], [], remaining)[0]:
+                raise HammerShellError(
+                    u'hammer shell did not answer in {0} seconds'
+                    .format(timeout)
+                )
+
+    def _run(self, command, timeout):
+        """Send ``command`` and then a sentinel, each once hammer displays
+        its prompt, and read the output until hammer complains about the
+        sentinel.
+
+        :return: The output lines of ``command``.
+        :raises HammerShellError: If the shell stops or does not answer in
+            ``timeout`` seconds.
+
+        """
+        self._counter += 1
+        sentinel = u'{0}_{1}'.format(self._sentinel, self._counter)
+        deadline = time.time() + timeout
+        self._channel.sendall(u'{0}\n'.format(command).encode('utf-8'))
+        output = self._read(deadline, timeout)
+        self._channel.sendall(u'{0}\n'.format(sentinel).encode('utf-8'))
+        return output + self._read(deadline, timeout, sentinel)
+
+    def execute(self, command, output_format=None, timeout=None):
+        """Run a hammer command in the shell.
+
+        :param str command: The hammer command without the ``hammer`` prefix,
+            for example ``organization list``.
+        :param str output_format: Value of the ``--output`` hammer option.
+        :param int timeout: Seconds to wait for the command output. Defaults
+            to 120 seconds.
+        :rtype: robottelo.ssh.SSHCommandResult
+
+        """
+        if timeout is None:
+            timeout = 120
+        line = u'{0} {1}'.format(
+            u'--output={0}'.format(output_format) if output_format else u'',
+            command,
+        ).strip()
+        with self.lock:
+            logger.debug('>>> [%s hammer shell] %s', self.hostname, line)
+            try:
+                if not self.alive:
+                    self.start()
+                output = self._run(line, timeout)
+            except (HammerShellError, socket.error):
+                # The shell state is unknown, start a new one next time
+                self.close()
+                raise
+        stdout = u'\n'.join(output).encode('utf-8')
+        if any(ERROR_REGEX.match(out) for out in output):
+            return ssh._build_result(  # pylint:disable=protected-access
+                b'', stdout, ERROR_RETURN_CODE, output_format)
+        return ssh._build_result(  # pylint:disable=protected-access
+            stdout, b'', 0, output_format)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(user, password, hostname=None):
+    """Return the hammer shell session for the given credentials, creating
+    it if needed.
+
+    :rtype: HammerShell
+
+    """
+    hostname = hostname or settings.server.hostname
+    key = (hostname, user, password)
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = HammerShell(user, password, hostname)
+        return _sessions[key]
+
+
+def execute(command, user, password, output_format=None, timeout=None,
+            hostname=None):
+    """Run a hammer command in a persistent hammer shell.
+
+    A shell which crashed is transparently replaced by a new one. If it
+    crashes or stops answering while running the command, the error is raised
+    since the command may have been applied, and a new shell is started on
+    the next call.
+
+    :rtype: robottelo.ssh.SSHCommandResult
+    :raises HammerShellError: If the shell fails while running the command.
+
+    """
+    return get_session(user, password, hostname).execute(
+        command, output_format, timeout)
+
+
+@atexit.register
+def close_sessions():
+    """Stop all hammer shell sessions."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -2,6 +2,7 @@
 import logging
 import os
 import sys
+import tempfile
 
 from logging import config
 from nailgun import entities, entity_mixins
@@ -127,8 +128,13 @@ class ServerSettings(FeatureSettings):
         self.hostname = None
         self.port = None
         self.scheme = None
+        self.ssh_connection_pool = None
+        self.ssh_keepalive = None
         self.ssh_key = None
         self.ssh_password = None
+        self.ssh_pool_idle_timeout = None
+        self.ssh_pool_size = None
+        self.ssh_port = None
         self.ssh_username = None
 
     def read(self, reader):
@@ -140,8 +146,15 @@ class ServerSettings(FeatureSettings):
         self.hostname = reader.get('server', 'hostname')
         self.port = reader.get('server', 'port', cast=int)
         self.scheme = reader.get('server', 'scheme', 'https')
+        self.ssh_connection_pool = reader.get(
+            'server', 'ssh_connection_pool', True, bool)
+        self.ssh_keepalive = reader.get('server', 'ssh_keepalive', 30, int)
         self.ssh_key = reader.get('server', 'ssh_key')
         self.ssh_password = reader.get('server', 'ssh_password')
+        self.ssh_pool_idle_timeout = reader.get(
+            'server', 'ssh_pool_idle_timeout', 300, int)
+        self.ssh_pool_size = reader.get('server', 'ssh_pool_size', 8, int)
+        self.ssh_port = reader.get('server', 'ssh_port', 22, int)
         self.ssh_username = reader.get('server', 'ssh_username', 'root')
 
     def validate(self):
@@ -242,6 +255,143 @@ class ClientsSettings(FeatureSettings):
         return validation_errors
 
 
+class CacheSettings(FeatureSettings):
+    """Object cache settings definitions."""
+    #: Valid values for ``backend``
+    backends = ('memory', 'sqlite')
+
+    def __init__(self, *args, **kwargs):
+        super(CacheSettings, self).__init__(*args, **kwargs)
+        self.backend = None
+        self.path = None
+        self.ttl = None
+        self.max_size = None
+        self.validate_objects = None
+        self.bug_path = None
+        self.bug_ttl = None
+        self.bugs_offline = None
+        self.bug_index = None
+
+    def read(self, reader):
+        """Read object cache settings."""
+        self.backend = reader.get('cache', 'backend', 'memory')
+        self.path = reader.get(
+            'cache',
+            'path',
+            os.path.join(tempfile.gettempdir(), 'robottelo_cache.sqlite'),
+        )
+        self.ttl = reader.get('cache', 'ttl', 3600, int)
+        self.max_size = reader.get('cache', 'max_size', 1000, int)
+        self.validate_objects = reader.get('cache', 'validate', False, bool)
+        self.bug_path = reader.get(
+            'cache',
+            'bug_path',
+            os.path.join(tempfile.gettempdir(), 'robottelo_bugs.sqlite'),
+        )
+        self.bug_ttl = reader.get('cache', 'bug_ttl', 86400, int)
+        self.bugs_offline = reader.get('cache', 'bugs_offline', False, bool)
+        self.bug_index = reader.get(
+            'cache',
+            'bug_index',
+            os.path.join(tempfile.gettempdir(), 'robottelo_bug_index.json'),
+        )
+
+    def validate(self):
+        """Validate object cache settings."""
+        validation_errors = []
+        if self.backend not in self.backends:
+            validation_errors.append(
+                '[cache] backend should be one of {0}.'
+                .format(', '.join(self.backends))
+            )
+        if self.ttl is not None and self.ttl < 0:
+            validation_errors.append('[cache] ttl should not be negative.')
+        if self.max_size is not None and self.max_size < 0:
+            validation_errors.append(
+                '[cache] max_size should not be negative.')
+        if self.bug_ttl is not None and self.bug_ttl < 0:
+            validation_errors.append(
+                '[cache] bug_ttl should not be negative.')
+        return validation_errors
+
+
+class CassetteSettings(FeatureSettings):
+    """SSH cassette settings definitions."""
+    #: Valid values for ``mode``
+    modes = ('record', 'replay', 'once')
+
+    def __init__(self, *args, **kwargs):
+        super(CassetteSettings, self).__init__(*args, **kwargs)
+        self.path = None
+        self.mode = None
+        self.latency_factor = None
+
+    def read(self, reader):
+        """Read SSH cassette settings."""
+        self.path = reader.get('cassette', 'path', None)
+        self.mode = reader.get('cassette', 'mode', 'replay')
+        self.latency_factor = reader.get(
+            'cassette', 'latency_factor', 0.0, float)
+
+    def validate(self):
+        """Validate SSH cassette settings."""
+        validation_errors = []
+        if self.mode not in self.modes:
+            validation_errors.append(
+                '[cassette] mode should be one of {0}.'
+                .format(', '.join(self.modes))
+            )
+        if self.latency_factor is not None and self.latency_factor < 0:
+            validation_errors.append(
+                '[cassette] latency_factor should not be negative.')
+        return validation_errors
+
+
+class CLISettings(FeatureSettings):
+    """Hammer CLI settings definitions."""
+    #: Valid values for ``backend``
+    backends = ('ssh', 'shell')
+    #: Valid values for ``factory_backend``
+    factory_backends = ('hammer', 'api')
+    #: Valid values for ``output_format``
+    output_formats = ('csv', 'json')
+
+    def __init__(self, *args, **kwargs):
+        super(CLISettings, self).__init__(*args, **kwargs)
+        self.backend = None
+        self.factory_backend = None
+        self.skip_create_info = None
+        self.output_format = None
+
+    def read(self, reader):
+        """Read hammer CLI settings."""
+        self.backend = reader.get('cli', 'backend', 'ssh')
+        self.factory_backend = reader.get('cli', 'factory_backend', 'hammer')
+        self.skip_create_info = reader.get(
+            'cli', 'skip_create_info', False, bool)
+        self.output_format = reader.get('cli', 'output_format', 'csv')
+
+    def validate(self):
+        """Validate hammer CLI settings."""
+        validation_errors = []
+        if self.backend not in self.backends:
+            validation_errors.append(
+                '[cli] backend should be one of {0}.'
+                .format(', '.join(self.backends))
+            )
+        if self.factory_backend not in self.factory_backends:
+            validation_errors.append(
+                '[cli] factory_backend should be one of {0}.'
+                .format(', '.join(self.factory_backends))
+            )
+        if self.output_format not in self.output_formats:
+            validation_errors.append(
+                '[cli] output_format should be one of {0}.'
+                .format(', '.join(self.output_formats))
+            )
+        return validation_errors
+
+
 class DockerSettings(FeatureSettings):
     """Docker settings definitions."""
     def __init__(self, *args, **kwargs):
@@ -384,6 +534,32 @@ class DiscoveryISOSettings(FeatureSettings):
         return validation_errors
 
 
+class MetricsSettings(FeatureSettings):
+    """Command metrics settings definitions."""
+    #: Valid values for ``report_format``
+    report_formats = ('json', 'csv')
+
+    def __init__(self, *args, **kwargs):
+        super(MetricsSettings, self).__init__(*args, **kwargs)
+        self.report = None
+        self.report_format = None
+
+    def read(self, reader):
+        """Read command metrics settings."""
+        self.report = reader.get('metrics', 'report', None)
+        self.report_format = reader.get('metrics', 'report_format', 'json')
+
+    def validate(self):
+        """Validate command metrics settings."""
+        validation_errors = []
+        if self.report_format not in self.report_formats:
+            validation_errors.append(
+                '[metrics] report_format should be one of {0}.'
+                .format(', '.join(self.report_formats))
+            )
+        return validation_errors
+
+
 class OscapSettings(FeatureSettings):
     """Oscap settings definitions."""
     def __init__(self, *args, **kwargs):
@@ -414,6 +590,8 @@ class PerformanceSettings(FeatureSettings):
         self.fresh_install_savepoint = None
         self.enabled_repos_savepoint = None
         self.csv_buckets_count = None
+        self.raw_timings = None
+        self.histogram_window = None
         self.sync_count = None
         self.sync_type = None
         self.repos = None
@@ -432,6 +610,10 @@ class PerformanceSettings(FeatureSettings):
             'performance', 'enabled_repos_savepoint')
         self.csv_buckets_count = reader.get(
             'performance', 'csv_buckets_count', 10, int)
+        self.raw_timings = reader.get(
+            'performance', 'raw_timings', True, bool)
+        self.histogram_window = reader.get(
+            'performance', 'histogram_window', 60, int)
         self.sync_count = reader.get(
             'performance', 'sync_count', 3, int)
         self.sync_type = reader.get(
@@ -476,6 +658,41 @@ class RHAISettings(FeatureSettings):
         return []
 
 
+class SimulatorSettings(FeatureSettings):
+    """Satellite simulator settings definitions."""
+    def __init__(self, *args, **kwargs):
+        super(SimulatorSettings, self).__init__(*args, **kwargs)
+        self.enabled = None
+        self.ssh_port = None
+        self.http_port = None
+        self.latency = None
+        self.latencies = None
+
+    def read(self, reader):
+        """Read Satellite simulator settings."""
+        self.enabled = reader.get('simulator', 'enabled', False, bool)
+        self.ssh_port = reader.get('simulator', 'ssh_port', 0, int)
+        self.http_port = reader.get('simulator', 'http_port', 0, int)
+        self.latency = reader.get('simulator', 'latency', 0.0, float)
+        self.latencies = reader.get('simulator', 'latencies', {}, dict)
+
+    def validate(self):
+        """Validate Satellite simulator settings."""
+        validation_errors = []
+        if self.latency is not None and self.latency < 0:
+            validation_errors.append(
+                '[simulator] latency should not be negative.')
+        for key, value in (self.latencies or {}).items():
+            try:
+                float(value)
+            except ValueError:
+                validation_errors.append(
+                    '[simulator] latencies value of "{0}" should be a '
+                    'number.'.format(key)
+                )
+        return validation_errors
+
+
 class TransitionSettings(FeatureSettings):
     """Transition settings definitions."""
     def __init__(self, *args, **kwargs):
@@ -546,15 +763,20 @@ class Settings(object):
         self.webdriver_desired_capabilities = None
 
         # Features
+        self.cache = CacheSettings()
+        self.cassette = CassetteSettings()
+        self.cli = CLISettings()
         self.clients = ClientsSettings()
         self.compute_resources = LibvirtHostSettings()
         self.discovery = DiscoveryISOSettings()
         self.docker = DockerSettings()
         self.fake_manifest = FakeManifestSettings()
         self.ldap = LDAPSettings()
+        self.metrics = MetricsSettings()
         self.oscap = OscapSettings()
         self.performance = PerformanceSettings()
         self.rhai = RHAISettings()
+        self.simulator = SimulatorSettings()
         self.transition = TransitionSettings()
         self.vlan_networking = VlanNetworkSettings()
 
@@ -580,6 +802,15 @@ class Settings(object):
             self._validate_robottelo_settings())
         self.server.read(self.reader)
         self._validation_errors.extend(self.server.validate())
+        if self.reader.has_section('cache'):
+            self.cache.read(self.reader)
+            self._validation_errors.extend(self.cache.validate())
+        if self.reader.has_section('cassette'):
+            self.cassette.read(self.reader)
+            self._validation_errors.extend(self.cassette.validate())
+        if self.reader.has_section('cli'):
+            self.cli.read(self.reader)
+            self._validation_errors.extend(self.cli.validate())
         if self.reader.has_section('clients'):
             self.clients.read(self.reader)
             self._validation_errors.extend(self.clients.validate())
@@ -598,6 +829,9 @@ class Settings(object):
         if self.reader.has_section('ldap'):
             self.ldap.read(self.reader)
             self._validation_errors.extend(self.ldap.validate())
+        if self.reader.has_section('metrics'):
+            self.metrics.read(self.reader)
+            self._validation_errors.extend(self.metrics.validate())
         if self.reader.has_section('oscap'):
             self.oscap.read(self.reader)
             self._validation_errors.extend(self.oscap.validate())
@@ -607,6 +841,9 @@ class Settings(object):
         if self.reader.has_section('rhai'):
             self.rhai.read(self.reader)
             self._validation_errors.extend(self.rhai.validate())
+        if self.reader.has_section('simulator'):
+            self.simulator.read(self.reader)
+            self._validation_errors.extend(self.simulator.validate())
         if self.reader.has_section('transition'):
             self.transition.read(self.reader)
             self._validation_errors.extend(self.transition.validate())
@@ -622,6 +859,7 @@ class Settings(object):
 
         self._configure_logging()
         self._configure_third_party_logging()
+        self._configure_simulator()
         self._configure_entities()
         self._configured = True
 
@@ -704,6 +942,16 @@ class Settings(object):
             ]
         return self._all_features
 
+    def _configure_simulator(self):
+        """Start the Satellite simulator if it is enabled and point the
+        ``[server]`` settings to it, see :mod:`robottelo.simulator`.
+        """
+        if not self.simulator.enabled:
+            return
+        # Imported here as the simulator module uses the settings
+        from robottelo.simulator import get_simulator
+        get_simulator().configure_server(self.server)
+
     def _configure_entities(self):
         """Configure NailGun's entity classes.
 
@@ -4,17 +4,22 @@ import bugzilla
 import logging
 import pytest
 import requests
+import socket
+import threading
+import time
 import unittest2
 
 from functools import wraps
+from robottelo import cache
+from robottelo.cache import OBJECT_CACHE  # noqa pylint:disable=unused-import
 from robottelo.config import settings
 from robottelo.constants import BZ_OPEN_STATUSES, NOT_IMPLEMENTED
+from requests.exceptions import RequestException
 from six.moves.xmlrpc_client import Fault
 from xml.parsers.expat import ExpatError, ErrorString
 
 BUGZILLA_URL = "https://bugzilla.redhat.com/xmlrpc.cgi"
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
 REDMINE_URL = 'http://projects.theforeman.org'
 
 # Test Tier Decorators
@@ -40,6 +45,18 @@ _redmine = {
     'issues': {},
 }
 
+# Bug IDs referenced by `skip_if_bug_open`, by bug type, fetched in one go by
+# `prefetch_bugs`.
+_referenced_bugs = {
+    'bugzilla': set(),
+    'redmine': set(),
+}
+
+# The bug cache on the local disk shared by all processes, see `_bug_cache`.
+_bug_disk_cache = {'backend': None, 'path': None}
+_bug_disk_cache_lock = threading.Lock()
+_prefetch_lock = threading.Lock()
+
 
 def skip_if_not_set(*options):
     """Skips test if expected configuration is not set.
@@ -138,7 +155,12 @@ def stubbed(reason=None):
 
 
 def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+    """Decorator that makes an optional object cache available
+
+    Objects are cached by factory name and options, where ``[cache]``
+    configures, see :mod:`robottelo.cache`.
+
+    """
 
     @wraps(func)
     def cacheable_function(options=None, cached=False):
@@ -146,13 +168,11 @@ def cacheable(func):
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
+        if cached is not True:
+            return func(options)
         object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
+        return cache.get_or_create(
+            object_key, options, lambda: func(options))
 
     return cacheable_function
 
@@ -239,31 +259,131 @@ class BugFetchError(Exception):
     """Indicates an error occurred while fetching information about a bug."""
 
 
+class CachedBug(object):
+    """A Bugzilla bug read from the bug cache on disk.
+
+    Only has the fields used to tell whether a bug is open.
+
+    """
+    def __init__(self, status=None, whiteboard=None):
+        self.status = status
+        self.whiteboard = whiteboard
+
+
+def _bug_cache():
+    """Return the bug cache on disk, or ``None`` if ``[cache] bug_path`` is
+    not set.
+
+    Entries are stored with the time they were fetched so outdated entries
+    can still be used when the bug trackers can't be reached.
+
+    """
+    path = settings.cache.bug_path
+    if not path:
+        return None
+    with _bug_disk_cache_lock:
+        if _bug_disk_cache['path'] != path:
+            _bug_disk_cache['backend'] = cache.SQLiteCache(path)
+            _bug_disk_cache['path'] = path
+        return _bug_disk_cache['backend']
+
+
+def _read_cached_bug(key, outdated=False):
+    """Return the data of bug ``key`` from the bug cache on disk.
+
+    :param bool outdated: Also return data older than ``[cache] bug_ttl``.
+    :return: The bug data or ``None`` if not cached.
+
+    """
+    bug_cache = _bug_cache()
+    if bug_cache is None:
+        return None
+    entry = bug_cache.get(key)
+    if entry is None:
+        return None
+    ttl = settings.cache.bug_ttl
+    if (outdated or settings.cache.bugs_offline or not ttl or
+            time.time() - entry['fetched'] <= ttl):
+        return entry['data']
+    return None
+
+
+def _write_cached_bug(key, data):
+    """Store the data of bug ``key`` in the bug cache on disk."""
+    bug_cache = _bug_cache()
+    if bug_cache is not None:
+        bug_cache.set(key, {'data': data, 'fetched': time.time()})
+
+
+def _bugzilla_connection():
+    """Connect to Bugzilla.
+
+    :raises BugFetchError: If the connection fails.
+
+    """
+    try:
+        bz_conn = bugzilla.RHBugzilla()
+        bz_conn.connect(BUGZILLA_URL)
+    except (TypeError, ValueError):
+        raise BugFetchError(
+            'Could not connect to {0}'.format(BUGZILLA_URL)
+        )
+    except (RequestException, socket.error) as err:
+        raise BugFetchError(
+            'Could not connect to {0}. Error: {1}'.format(BUGZILLA_URL, err)
+        )
+    return bz_conn
+
+
+def _cache_bugzilla_bug(bug_id, bug):
+    """Place bug ``bug_id`` in the cache and in the bug cache on disk."""
+    _bugzilla[bug_id] = bug
+    _write_cached_bug(
+        u'bugzilla:{0}'.format(bug_id),
+        {
+            'status': getattr(bug, 'status', None),
+            'whiteboard': getattr(bug, 'whiteboard', None),
+        }
+    )
+
+
 def _get_bugzilla_bug(bug_id):
     """Fetch bug ``bug_id``.
 
+    The bug is looked up in the cache of the process, then in the bug cache
+    on disk and is fetched from Bugzilla if not found. If Bugzilla can't be
+    reached, or ``[cache] bugs_offline`` is set, an outdated entry of the bug
+    cache on disk is used if any.
+
     :param int bug_id: The ID of a bug in the Bugzilla database.
-    :return: A FRIGGIN UNDOCUMENTED python-bugzilla THING.
+    :return: A FRIGGIN UNDOCUMENTED python-bugzilla THING, or a
+        :class:`CachedBug`.
     :raises BugFetchError: If an error occurs while fetching the bug. For
         example, a network timeout occurs or the bug does not exist.
 
     """
+    key = u'bugzilla:{0}'.format(bug_id)
     # Is bug ``bug_id`` in the cache?
     if bug_id in _bugzilla:
         LOGGER.debug('Bugzilla bug {0} found in cache.'.format(bug_id))
-    else:
-        LOGGER.info('Bugzilla bug {0} not in cache. Fetching.'.format(bug_id))
+        return _bugzilla[bug_id]
+    data = _read_cached_bug(key)
+    if data is not None:
+        LOGGER.debug('Bugzilla bug {0} found in disk cache.'.format(bug_id))
+        _bugzilla[bug_id] = CachedBug(**data)
+        return _bugzilla[bug_id]
+    if settings.cache.bugs_offline:
+        raise BugFetchError(
+            'Bugzilla bug {0} is not cached and bugs are offline'
+            .format(bug_id)
+        )
+    LOGGER.info('Bugzilla bug {0} not in cache. Fetching.'.format(bug_id))
+    try:
         # Make a network connection to the Bugzilla server.
-        try:
-            bz_conn = bugzilla.RHBugzilla()
-            bz_conn.connect(BUGZILLA_URL)
-        except (TypeError, ValueError):
-            raise BugFetchError(
-                'Could not connect to {0}'.format(BUGZILLA_URL)
-            )
+        bz_conn = _bugzilla_connection()
         # Fetch the bug and place it in the cache.
         try:
-            _bugzilla[bug_id] = bz_conn.getbugsimple(bug_id)
+            bug = bz_conn.getbugsimple(bug_id)
         except Fault as err:
             raise BugFetchError(
                 'Could not fetch bug. Error: {0}'.format(err.faultString)
@@ -273,7 +393,22 @@ def _get_bugzilla_bug(bug_id):
                 'Could not interpret bug. Error: {0}'
                 .format(ErrorString(err.code))
             )
-
+        except (RequestException, socket.error) as err:
+            raise BugFetchError(
+                'Could not fetch bug. Error: {0}'.format(err)
+            )
+    except BugFetchError:
+        data = _read_cached_bug(key, outdated=True)
+        if data is None:
+            raise
+        LOGGER.warning(
+            'Could not fetch Bugzilla bug {0}, using outdated cached status.'
+            .format(bug_id)
+        )
+        bug = CachedBug(**data)
+        _bugzilla[bug_id] = bug
+        return bug
+    _cache_bugzilla_bug(bug_id, bug)
     return _bugzilla[bug_id]
 
 
@@ -284,21 +419,43 @@ def _redmine_closed_issue_statuses():
     """Return a list of issue status IDs which indicate an issue is closed.
 
     This list of issue status IDs is not hard-coded. Instead, the Redmine
-    server is consulted when generating this list.
+    server is consulted when generating this list, unless ``[cache]
+    bugs_offline`` is set.
 
     :return: Statuses which indicate an issue is closed.
     :rtype: list
+    :raises BugFetchError: If the statuses are not cached and can't be
+        fetched.
 
     """
     # Is the list of closed statuses cached?
     if _redmine['closed_statuses'] is None:
-        result = requests.get('%s/issue_statuses.json' % REDMINE_URL).json()
-        # We've got a list of *all* statuses. Let's throw only *closed*
-        # statuses in the cache.
-        _redmine['closed_statuses'] = []
-        for issue_status in result['issue_statuses']:
-            if issue_status.get('is_closed', False):
-                _redmine['closed_statuses'].append(issue_status['id'])
+        key = u'redmine:closed_statuses'
+        closed_statuses = _read_cached_bug(key)
+        if closed_statuses is None and settings.cache.bugs_offline:
+            raise BugFetchError(
+                'Redmine issue statuses are not cached and bugs are offline')
+        if closed_statuses is None:
+            try:
+                result = requests.get(
+                    '%s/issue_statuses.json' % REDMINE_URL).json()
+            except (RequestException, ValueError) as err:
+                closed_statuses = _read_cached_bug(key, outdated=True)
+                if closed_statuses is None:
+                    raise BugFetchError(
+                        'Could not fetch Redmine issue statuses. Error: {0}'
+                        .format(err)
+                    )
+            else:
+                # We've got a list of *all* statuses. Let's throw only
+                # *closed* statuses in the cache.
+                closed_statuses = [
+                    issue_status['id']
+                    for issue_status in result['issue_statuses']
+                    if issue_status.get('is_closed', False)
+                ]
+                _write_cached_bug(key, closed_statuses)
+        _redmine['closed_statuses'] = closed_statuses
 
     return _redmine['closed_statuses']
 
@@ -312,30 +469,150 @@ def _get_redmine_bug_status_id(bug_id):
         example, a network timeout occurs or the bug does not exist.
 
     """
+    key = u'redmine:{0}'.format(bug_id)
     if bug_id in _redmine['issues']:
         LOGGER.debug('Redmine bug {0} found in cache.'.format(bug_id))
-    else:
-        # Get info about bug.
-        LOGGER.info('Redmine bug {0} not in cache. Fetching.'.format(bug_id))
+        return _redmine['issues'][bug_id]
+    status_id = _read_cached_bug(key)
+    if status_id is not None:
+        LOGGER.debug('Redmine bug {0} found in disk cache.'.format(bug_id))
+        _redmine['issues'][bug_id] = status_id
+        return status_id
+    if settings.cache.bugs_offline:
+        raise BugFetchError(
+            'Redmine bug {0} is not cached and bugs are offline'
+            .format(bug_id)
+        )
+    # Get info about bug.
+    LOGGER.info('Redmine bug {0} not in cache. Fetching.'.format(bug_id))
+    try:
         result = requests.get(
             '{0}/issues/{1}.json'.format(REDMINE_URL, bug_id)
         )
-        if result.status_code != 200:
+    except RequestException as err:
+        status_id = _read_cached_bug(key, outdated=True)
+        if status_id is None:
             raise BugFetchError(
-                'Redmine bug {0} does not exist'.format(bug_id)
+                'Could not fetch Redmine bug {0}. Error: {1}'
+                .format(bug_id, err)
             )
-        result = result.json()
+        LOGGER.warning(
+            'Could not fetch Redmine bug {0}, using outdated cached status.'
+            .format(bug_id)
+        )
+        _redmine['issues'][bug_id] = status_id
+        return status_id
+    if result.status_code != 200:
+        raise BugFetchError(
+            'Redmine bug {0} does not exist'.format(bug_id)
+        )
+    result = result.json()
+
+    # Place bug into cache.
+    try:
+        _redmine['issues'][bug_id] = result['issue']['status']['id']
+    except KeyError as err:
+        raise BugFetchError(
+            'Could not get status ID of Redmine bug {0}. Error: {1}'.
+            format(bug_id, err)
+        )
+    _write_cached_bug(key, _redmine['issues'][bug_id])
 
-        # Place bug into cache.
+    return _redmine['issues'][bug_id]
+
+
+def _prefetch_bugzilla_bugs(bug_ids):
+    """Fetch the Bugzilla bugs ``bug_ids`` in a single call."""
+    bz_conn = _bugzilla_connection()
+    try:
+        bugs = bz_conn.getbugs(
+            [int(bug_id) for bug_id in bug_ids],
+            include_fields=['id', 'status', 'whiteboard'],
+        )
+    except (Fault, ExpatError, RequestException, socket.error) as err:
+        raise BugFetchError('Could not fetch bugs. Error: {0}'.format(err))
+    for bug_id, bug in zip(bug_ids, bugs):
+        # Bugs which could not be fetched are None
+        if bug is not None:
+            _cache_bugzilla_bug(bug_id, bug)
+
+
+def _prefetch_redmine_bugs(bug_ids):
+    """Fetch the Redmine bugs ``bug_ids``, by pages of 100 bugs."""
+    bug_ids = list(bug_ids)
+    for index in range(0, len(bug_ids), 100):
+        page = bug_ids[index:index + 100]
         try:
-            _redmine['issues'][bug_id] = result['issue']['status']['id']
-        except KeyError as err:
-            raise BugFetchError(
-                'Could not get status ID of Redmine bug {0}. Error: {1}'.
-                format(bug_id, err)
+            result = requests.get(
+                '{0}/issues.json'.format(REDMINE_URL),
+                params={
+                    'issue_id': ','.join(str(bug_id) for bug_id in page),
+                    'limit': 100,
+                    'status_id': '*',
+                },
             )
+            result.raise_for_status()
+            issues = result.json()['issues']
+        except (KeyError, RequestException, ValueError) as err:
+            raise BugFetchError(
+                'Could not fetch Redmine bugs. Error: {0}'.format(err))
+        statuses = dict(
+            (str(issue['id']), issue['status']['id']) for issue in issues)
+        for bug_id in page:
+            if str(bug_id) in statuses:
+                _redmine['issues'][bug_id] = statuses[str(bug_id)]
+                _write_cached_bug(
+                    u'redmine:{0}'.format(bug_id), statuses[str(bug_id)])
 
-    return _redmine['issues'][bug_id]
+
+def prefetch_bugs(bugzilla_ids=None, redmine_ids=None):
+    """Fetch in batches the bugs not cached yet.
+
+    Meant to be run once the tests are collected, so each bug referenced by
+    the tests is fetched with a single call instead of one call per bug. The
+    bug cache on disk is locked while fetching so concurrent test processes
+    fetch the bugs only once.
+
+    Errors are logged, the bugs will be fetched one by one when needed.
+
+    :param bugzilla_ids: Bugzilla bug IDs. Defaults to the bugs referenced by
+        :class:`skip_if_bug_open`.
+    :param redmine_ids: Redmine bug IDs. Defaults to the bugs referenced by
+        :class:`skip_if_bug_open`.
+
+    """
+    if bugzilla_ids is None:
+        bugzilla_ids = _referenced_bugs['bugzilla']
+    if redmine_ids is None:
+        redmine_ids = _referenced_bugs['redmine']
+    if settings.cache.bugs_offline:
+        return
+    bug_cache = _bug_cache()
+    lock = (
+        bug_cache.lock(u'prefetch') if bug_cache is not None
+        else _prefetch_lock
+    )
+    with lock:
+        missing_bugzilla = sorted(
+            bug_id for bug_id in set(bugzilla_ids)
+            if bug_id not in _bugzilla and
+            _read_cached_bug(u'bugzilla:{0}'.format(bug_id)) is None
+        )
+        missing_redmine = sorted(
+            bug_id for bug_id in set(redmine_ids)
+            if bug_id not in _redmine['issues'] and
+            _read_cached_bug(u'redmine:{0}'.format(bug_id)) is None
+        )
+        for tracker, fetch, missing in (
+                ('Bugzilla', _prefetch_bugzilla_bugs, missing_bugzilla),
+                ('Redmine', _prefetch_redmine_bugs, missing_redmine)):
+            if not missing:
+                continue
+            LOGGER.info('Prefetching %d %s bugs.', len(missing), tracker)
+            try:
+                fetch(missing)
+            except BugFetchError as err:
+                LOGGER.warning(err)
 
 
 def bz_bug_is_open(bug_id):
@@ -376,12 +653,12 @@ def rm_bug_is_open(bug_id):
     :rtype: bool
 
     """
-    status_id = None
     try:
         status_id = _get_redmine_bug_status_id(bug_id)
+        if status_id is None or status_id in _redmine_closed_issue_statuses():
+            return False
     except BugFetchError as err:
         LOGGER.warning(err)
-    if status_id is None or status_id in _redmine_closed_issue_statuses():
         return False
     return True
 
@@ -403,6 +680,8 @@ class skip_if_bug_open(object):  # noqa pylint:disable=C0103,R0903
         """
         self.bug_type = bug_type
         self.bug_id = bug_id
+        if bug_type in _referenced_bugs:
+            _referenced_bugs[bug_type].add(bug_id)
 
     def __call__(self, func):
         """Define and return a replacement for ``func``.
@@ -453,5 +732,8 @@ class skip_if_bug_open(object):  # noqa pylint:disable=C0103,R0903
             # Run the test method.
             return func(*args, **kwargs)
 
+        # Allow tools to find the bug a test is skipped for
+        wrapper_func.bug_type = self.bug_type
+        wrapper_func.bug_id = self.bug_id
         # This function replaces what is being decorated.
         return wrapper_func
@@ -186,25 +186,27 @@ def remove_katello_ca(hostname=None):
             hostname
         )
         # Checking the return_code here to verify katello-ca rpm is actually
-        # not present in the system
-        result = ssh.command(
-            'rpm -q katello-ca-consumer-{0}'
-            .format(settings.server.hostname),
-            hostname
-        )
-        if result.return_code == 0:
-            raise AssertionError('Failed to remove the katello-ca rpm')
-        # Resetting rhsm.conf to point to cdn
+        # not present in the system and resetting rhsm.conf to point to cdn.
+        # Both are independent so run them in parallel. All the rhsm.conf
+        # updates go to a single sed call since concurrent in-place edits of
+        # the same file would overwrite each other.
         rhsm_updates = [
             's/^hostname.*/hostname=subscription.rhn.redhat.com/',
             's|^prefix.*|prefix=/subscription|',
             's|^baseurl.*|baseurl=https://cdn.redhat.com|',
             's/^repo_ca_cert.*/repo_ca_cert=%(ca_cert_dir)sredhat-uep.pem/',
         ]
-        for command in rhsm_updates:
-            result = ssh.command(
-                'sed -i -e "{0}" /etc/rhsm/rhsm.conf'.format(command),
-                hostname
-            )
-            if result.return_code != 0:
-                raise AssertionError('Failed to reset the rhsm.conf')
+        rpm_result, sed_result = ssh.command_many(
+            [
+                'rpm -q katello-ca-consumer-{0}'
+                .format(settings.server.hostname),
+                'sed -i {0} /etc/rhsm/rhsm.conf'.format(' '.join(
+                    '-e "{0}"'.format(command) for command in rhsm_updates
+                )),
+            ],
+            hostname
+        )
+        if rpm_result.return_code == 0:
+            raise AssertionError('Failed to remove the katello-ca rpm')
+        if sed_result.return_code != 0:
+            raise AssertionError('Failed to reset the rhsm.conf')
@@ -43,3 +43,24 @@ class LogFile(object):
                 result.append(line)
 
         return result
+
+    @staticmethod
+    def stream_filter(remote_path, pattern, hostname=None):
+        """Filter a remote log file without downloading it.
+
+        The lines are read and matched as they arrive, so only the matching
+        ones are kept in memory.
+
+        :param str remote_path: Path of the log file on the remote host.
+        :param str pattern: Regular expression searched in each line.
+        :param str hostname: The remote host. Defaults to
+            ``main.server.hostname``.
+        :return: The matching lines.
+        :rtype: list
+
+        """
+        return list(ssh.command_stream(
+            u'cat {0}'.format(remote_path),
+            hostname=hostname,
+            line_filter=pattern,
+        ))
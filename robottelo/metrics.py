@@ -0,0 +1,250 @@
+# -*- encoding: utf-8 -*-
+"""Timing of the hammer and SSH commands run by robottelo.
+
+Every command is split in phases:
+
+* ``connect``: getting an SSH connection, a handshake unless a pooled
+  connection is reused,
+* ``execute``: from sending the command until its exit status is received,
+  which includes the output the server sent meanwhile,
+* ``transfer``: reading the rest of the output,
+* ``parse``: decoding and parsing the output, in :mod:`robottelo.ssh` and in
+  :class:`robottelo.cli.base.Base`.
+
+Commands are keyed by their hammer ``(command_base, command_sub)``, ``ssh``
+and an empty subcommand for the commands run with :func:`robottelo.ssh.command`
+outside of the CLI classes, and ``sftp`` for the file transfers. The
+durations of every key and phase are aggregated into
+:class:`robottelo.performance.histogram.HdrHistogram` objects, fixed size
+whatever the number of commands.
+
+Timing is active when ``[metrics] report`` is set, in which case the report
+is written when the process exits, or when a hook is registered with
+:func:`add_hook`. Hooks receive a :class:`CommandTiming` for every command::
+
+    def slow_commands(timing):
+        if timing.duration > 10:
+            print(timing.command_base, timing.command_sub, timing.phases)
+
+    metrics.add_hook(slow_commands)
+
+"""
+import atexit
+import csv
+import json
+import logging
+import os
+import threading
+import time
+
+import six
+
+from collections import namedtuple
+from contextlib import contextmanager
+from robottelo.config import settings
+from robottelo.performance.histogram import HdrHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+#: Phases of a command, in the order they happen.
+PHASES = ('connect', 'execute', 'transfer', 'parse')
+
+#: Timing of a command given to the hooks. ``start`` is the epoch time the
+#: command started, ``duration`` its total duration, ``phases`` the
+#: seconds spent in each of :data:`PHASES`, missing if not reached, and
+#: ``command`` the command line given to :func:`describe`, if any.
+CommandTiming = namedtuple(
+    'CommandTiming',
+    ('command_base', 'command_sub', 'start', 'duration', 'phases',
+     'command'),
+)
+
+
+def _histogram():
+    """Return a histogram of command durations, see
+    :class:`robottelo.performance.histogram.HdrHistogram`.
+
+    Durations from one millisecond to four hours are kept within 10%, in
+    less than 3 KB.
+
+    """
+    return HdrHistogram(lowest=0.001, highest=4 * 3600, significant_figures=1)
+
+
+class CommandMetrics(object):
+    """Histograms of the command durations, shared by all the threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+
+    def add(self, timing):
+        """Record a :class:`CommandTiming`."""
+        key = (timing.command_base, timing.command_sub)
+        with self._lock:
+            histograms = self.histograms.get(key)
+            if histograms is None:
+                histograms = self.histograms[key] = dict(
+                    (phase, _histogram()) for phase in PHASES + ('total',)
+                )
+            histograms['total'].record(timing.duration)
+            for phase, seconds in timing.phases.items():
+                histograms[phase].record(seconds)
+
+    def clear(self):
+        """Forget the recorded durations."""
+        with self._lock:
+            self.histograms = {}
+
+    def summary(self):
+        """Return the summaries of every command and phase, sorted by total
+        duration, the longest first.
+        """
+        with self._lock:
+            result = [
+                {
+                    'command_base': command_base,
+                    'command_sub': command_sub,
+                    'phases': dict(
+                        (phase, histogram.summary())
+                        for phase, histogram in histograms.items()
+                        if histogram.count
+                    ),
+                }
+                for (command_base, command_sub), histograms
+                in self.histograms.items()
+            ]
+        return sorted(
+            result, key=lambda item: -item['phases']['total']['total'])
+
+    def write_report(self, path, report_format='json'):
+        """Write the summaries to ``path`` as JSON or CSV, one row per
+        command and phase.
+        """
+        summary = self.summary()
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        if report_format == 'json':
+            with open(path, 'w') as report:
+                json.dump({'commands': summary}, report, indent=2)
+            return
+        columns = ('count', 'total', 'min', 'mean', 'p50', 'p90', 'p99',
+                   'max')
+        with open(path, 'w') as report:
+            writer = csv.writer(report)
+            writer.writerow(('command', 'phase') + columns)
+            for item in summary:
+                command = u'{0} {1}'.format(
+                    item['command_base'], item['command_sub']).strip()
+                if six.PY2:
+                    command = command.encode('utf-8')
+                for phase in PHASES + ('total',):
+                    if phase in item['phases']:
+                        values = item['phases'][phase]
+                        writer.writerow(
+                            [command, phase] +
+                            [values[column] for column in columns]
+                        )
+
+
+#: Durations of the commands run by the current process.
+METRICS = CommandMetrics()
+
+_hooks = []
+_state = threading.local()
+
+
+def add_hook(hook):
+    """Call ``hook`` with a :class:`CommandTiming` after every command.
+
+    Hooks are called in the thread which ran the command, errors they raise
+    are logged and ignored.
+
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """Stop calling ``hook``."""
+    _hooks.remove(hook)
+
+
+def is_enabled():
+    """Tell whether the commands are timed."""
+    return bool(_hooks or settings.metrics.report)
+
+
+@contextmanager
+def command(command_base, command_sub=''):
+    """Time the command run in the block.
+
+    Blocks can be nested, for example :meth:`robottelo.cli.base.Base.info`
+    around :meth:`robottelo.cli.base.Base.execute` around
+    :func:`robottelo.ssh.command`, only the outermost one is recorded.
+
+    """
+    if getattr(_state, 'phases', None) is not None or not is_enabled():
+        yield
+        return
+    _state.phases = phases = {}
+    _state.command = None
+    start = time.time()
+    try:
+        yield
+    finally:
+        _state.phases = None
+        timing = CommandTiming(
+            command_base, command_sub, start, time.time() - start, phases,
+            _state.command)
+        METRICS.add(timing)
+        for hook in list(_hooks):
+            try:
+                hook(timing)
+            except Exception:  # pylint:disable=broad-except
+                LOGGER.exception('Metrics hook %r failed', hook)
+
+
+def describe(command_line):
+    """Set the command line of the command being timed in the current
+    thread, unless a nested block already did.
+
+    Blocks describe the command the way it is the most useful, for example
+    :meth:`robottelo.cli.base.Base.execute` gives the hammer command without
+    the credentials and :func:`robottelo.ssh.command` the full command line.
+
+    """
+    if getattr(_state, 'phases', None) is not None and _state.command is None:
+        _state.command = command_line
+
+
+def add(phase, seconds):
+    """Add ``seconds`` to a phase of the command being timed in the current
+    thread, if any.
+    """
+    phases = getattr(_state, 'phases', None)
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to a phase, see :func:`add`."""
+    if getattr(_state, 'phases', None) is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        add(name, time.time() - start)
+
+
+@atexit.register
+def write_report():
+    """Write the report configured by the ``[metrics]`` section, if
+    commands were timed.
+    """
+    if settings.metrics.report and METRICS.histograms:
+        METRICS.write_report(
+            settings.metrics.report, settings.metrics.report_format)
+        LOGGER.info('Command metrics written to %s', settings.metrics.report)
@@ -105,10 +105,15 @@ class Candlepin(object):
         return cls.get_real_time(result.stderr)
 
     @classmethod
-    def single_delete(cls, id, thread_id):
-        """Delete host from subscription"""
+    def single_delete(cls, id, thread_id, session=None):
+        """Delete host from subscription
+
+        :param session: Optional ``requests.Session`` sending the request,
+            so its connection to the server is kept alive between deletions.
+
+        """
         start = time.time()
-        response = requests.delete(
+        response = (session or requests).delete(
             urljoin(
                 settings.server.get_url(),
                 '/katello/api/hosts/{0}'.format(id)
@@ -0,0 +1,278 @@
+"""Register virtual consumers through the RHSM API of the server.
+
+The Candlepin concurrency tests register real VMs with
+``subscription-manager``, so the concurrency is capped by the number of VMs
+in ``[performance] virtual_machines``. :class:`ConsumerEngine` does what
+``subscription-manager`` does directly against the ``/rhsm`` endpoints of
+the server, for consumers whose facts are made up by
+:func:`robottelo.system_facts.generate_system_facts`:
+
+1. register, with an activation key or the admin credentials, receiving the
+   consumer identity certificate,
+2. attach a pool, authenticated by the identity certificate,
+3. check in by updating the facts, as ``rhsmcertd`` does,
+4. unregister, unless the consumers are kept for a deletion test.
+
+Every consumer runs these steps one after the other, the consumers run
+``concurrency`` at a time on the thread pool of
+:class:`robottelo.performance.driver.CandlepinDriver`::
+
+    engine = ConsumerEngine(org_label, activation_key='ak-1')
+    try:
+        result = engine.run(5000, clients=10, pool_id=pool_id)
+    finally:
+        engine.close()
+    self._write_stat_csv_chart(
+        self.stat_file_name, result['register'], 10, 'stat-reg-10-clients')
+
+"""
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import requests
+
+from robottelo.config import settings
+from robottelo.performance.driver import CandlepinDriver
+from robottelo.system_facts import generate_system_facts
+from six.moves.urllib.parse import urljoin
+
+LOGGER = logging.getLogger(__name__)
+
+#: Steps of a consumer, the keys of the :meth:`ConsumerEngine.run` result.
+STEPS = ('register', 'attach', 'checkin', 'unregister')
+
+
+class ConsumerError(Exception):
+    """Indicates an RHSM request of a virtual consumer failed."""
+
+
+class VirtualConsumer(object):
+    """A consumer registered without a real system.
+
+    :param str name: Host name of the consumer, random if ``None``.
+
+    """
+    def __init__(self, name=None):
+        self.facts = generate_system_facts(name)
+        self.name = self.facts['network.hostname']
+        self.uuid = None
+        #: Paths of the identity certificate and key once registered.
+        self.cert = None
+        #: HTTP session authenticated by the identity certificate, its
+        #: connection is kept alive between the requests of the consumer.
+        self.session = None
+
+    def close(self):
+        """Close the HTTP session of the consumer."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
+class ConsumerEngine(CandlepinDriver):
+    """Register and drive virtual consumers, ``concurrency`` at a time.
+
+    :param str owner: Label of the organization the consumers register to.
+    :param str activation_key: Activation key to register with, the admin
+        credentials are used if ``None``.
+    :param str environment: Lifecycle environment id to register to when no
+        activation key is given.
+    :param int concurrency: Number of consumers driven at the same time.
+
+    """
+    def __init__(self, owner, activation_key=None, environment=None,
+                 concurrency=100):
+        super(ConsumerEngine, self).__init__(concurrency)
+        self.owner = owner
+        self.activation_key = activation_key
+        self.environment = environment
+        #: Registered consumers, their ``uuid`` can be given to a deletion
+        #: test.
+        self.consumers = []
+        self._cert_dir = tempfile.mkdtemp(prefix='robottelo-consumers-')
+
+    def _request(self, session, method, path, **kwargs):
+        """Send an RHSM request and return its duration and response.
+
+        :raises ConsumerError: If the server answers with an error status.
+
+        """
+        start = time.time()
+        response = session.request(
+            method,
+            urljoin(settings.server.get_url(), path),
+            verify=False,
+            **kwargs
+        )
+        elapsed = time.time() - start
+        if response.status_code >= 400:
+            raise ConsumerError(
+                u'{0} {1} failed with status {2}: {3}'.format(
+                    method, path, response.status_code, response.text)
+            )
+        return elapsed, response
+
+    def register(self, consumer):
+        """Register ``consumer`` and store its identity certificate.
+
+        :return: The registration duration in seconds.
+
+        """
+        params = {'owner': self.owner}
+        auth = None
+        if self.activation_key is not None:
+            params['activation_keys'] = self.activation_key
+        else:
+            auth = settings.server.get_credentials()
+            if self.environment is not None:
+                params['environment'] = self.environment
+        elapsed, response = self._request(
+            self._session(),
+            'POST',
+            '/rhsm/consumers',
+            params=params,
+            auth=auth,
+            json={
+                'name': consumer.name,
+                'type': 'system',
+                'facts': consumer.facts,
+                'installedProducts': [],
+            },
+        )
+        data = response.json()
+        consumer.uuid = data['uuid']
+        cert_file = os.path.join(self._cert_dir, consumer.uuid + '.pem')
+        key_file = os.path.join(self._cert_dir, consumer.uuid + '-key.pem')
+        for path, content in ((cert_file, data['idCert']['cert']),
+                              (key_file, data['idCert']['key'])):
+            with open(path, 'w') as handler:
+                handler.write(content)
+        consumer.cert = (cert_file, key_file)
+        consumer.session = requests.Session()
+        consumer.session.cert = consumer.cert
+        return elapsed
+
+    def attach(self, consumer, pool_id=None):
+        """Attach ``pool_id`` to ``consumer``, auto-attach if ``None``.
+
+        :return: The attach duration in seconds.
+
+        """
+        params = {} if pool_id is None else {'pool': pool_id}
+        return self._request(
+            consumer.session,
+            'POST',
+            '/rhsm/consumers/{0}/entitlements'.format(consumer.uuid),
+            params=params,
+        )[0]
+
+    def checkin(self, consumer):
+        """Check ``consumer`` in by sending its facts again.
+
+        :return: The check-in duration in seconds.
+
+        """
+        return self._request(
+            consumer.session,
+            'PUT',
+            '/rhsm/consumers/{0}'.format(consumer.uuid),
+            json={'facts': consumer.facts},
+        )[0]
+
+    def unregister(self, consumer):
+        """Unregister ``consumer`` and close its session.
+
+        :return: The unregistration duration in seconds.
+
+        """
+        try:
+            return self._request(
+                consumer.session,
+                'DELETE',
+                '/rhsm/consumers/{0}'.format(consumer.uuid),
+            )[0]
+        finally:
+            consumer.close()
+
+    def _lifecycle(self, consumer, pool_id, checkins, unregister):
+        """Run the steps of ``consumer`` and return their durations by step,
+        the steps after a failure are not run.
+
+        When ``unregister`` is set, a consumer which failed after its
+        registration is still unregistered, without timing it, so failed
+        runs do not leave consumers on the server.
+
+        """
+        timings = {}
+        try:
+            timings['register'] = [self.register(consumer)]
+            if pool_id is not False:
+                timings['attach'] = [self.attach(consumer, pool_id)]
+            timings['checkin'] = [
+                self.checkin(consumer) for _ in range(checkins)]
+            if unregister:
+                timings['unregister'] = [self.unregister(consumer)]
+        except (ConsumerError, requests.RequestException) as err:
+            LOGGER.error('Virtual consumer %s failed: %s', consumer.name, err)
+            # The session is closed once an unregistration was attempted
+            if unregister and consumer.session is not None:
+                try:
+                    self.unregister(consumer)
+                except (ConsumerError, requests.RequestException) as error:
+                    LOGGER.error(
+                        'Virtual consumer %s could not be unregistered: %s',
+                        consumer.name, error
+                    )
+            consumer.close()
+        return timings
+
+    def run(self, count, clients=1, pool_id=None, checkins=1,
+            unregister=True):
+        """Drive ``count`` new virtual consumers.
+
+        :param int count: Number of consumers.
+        :param int clients: Number of clients the consumers are split
+            between in the result.
+        :param pool_id: Pool to attach, auto-attach if ``None``, no attach
+            if ``False``.
+        :param int checkins: Number of check-ins of every consumer.
+        :param bool unregister: Whether to unregister the consumers at the
+            end, otherwise they are kept in :attr:`consumers`.
+        :return: A dict with the timings of every step of :data:`STEPS`, in
+            the ``{'thread-0': [...]}`` layout of
+            :class:`robottelo.test.ConcurrentTestCase`.
+
+        """
+        consumers = [VirtualConsumer() for _ in range(count)]
+        per_client = max(1, int(math.ceil(count / float(clients))))
+        results = self._map(
+            lambda consumer: self._lifecycle(
+                consumer, pool_id, checkins, unregister),
+            consumers
+        )
+        if not unregister:
+            self.consumers.extend(
+                consumer for consumer in consumers if consumer.uuid)
+        by_step = dict(
+            (step, dict(
+                ('thread-{0}'.format(client), []) for client in range(clients)
+            ))
+            for step in STEPS
+        )
+        for index, timings in enumerate(results):
+            key = 'thread-{0}'.format(index // per_client)
+            for step, durations in timings.items():
+                by_step[step][key].extend(durations)
+        return by_step
+
+    def close(self):
+        """Close the sessions of the kept consumers and remove their
+        certificates.
+        """
+        for consumer in self.consumers:
+            consumer.close()
+        shutil.rmtree(self._cert_dir, ignore_errors=True)
@@ -0,0 +1,141 @@
+"""Drive many concurrent Candlepin operations from a single process.
+
+:mod:`robottelo.performance.thread` starts an OS thread per client and every
+deletion opens a new HTTP connection. :class:`CandlepinDriver` runs the
+operations on a fixed size pool of threads instead, whatever the number of
+clients, and every pool thread keeps its HTTP session, and so its
+connection to the server, alive from one request to the next. The
+``subscription-manager`` commands run on the client VMs go through the
+pooled SSH connections of :mod:`robottelo.ssh`.
+
+The results have the layout :class:`robottelo.test.ConcurrentTestCase`
+writes to the raw and stat files, a ``thread-<i>`` key per client with the
+list of its timings::
+
+    driver = CandlepinDriver(concurrency=200)
+    time_result_dict = driver.delete(uuid_list, clients=10)
+    self._write_raw_csv_file(
+        self.raw_file_name, time_result_dict, 10, 'raw-del-10-clients')
+
+"""
+import logging
+import threading
+
+import requests
+
+from contextlib import closing
+from multiprocessing.pool import ThreadPool
+from robottelo.performance.candlepin import Candlepin
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CandlepinDriver(object):
+    """Run register, attach and delete operations on a thread pool.
+
+    :param int concurrency: Maximum number of operations run at the same
+        time, the size of the thread pool.
+
+    """
+    def __init__(self, concurrency=100):
+        self.concurrency = concurrency
+        self._state = threading.local()
+
+    def _session(self):
+        """Return the HTTP session of the current pool thread.
+
+        Sessions are not shared between threads as ``requests`` does not
+        guarantee their thread safety, see :mod:`robottelo.cli.rest`.
+
+        """
+        session = getattr(self._state, 'session', None)
+        if session is None:
+            session = self._state.session = requests.Session()
+            session.verify = False
+        return session
+
+    def _map(self, func, items):
+        """Return ``func`` applied to every item, in order, on the pool."""
+        if not items:
+            return []
+        with closing(ThreadPool(
+                max(1, min(self.concurrency, len(items))))) as pool:
+            return pool.map(func, items, chunksize=1)
+
+    def delete(self, uuid_list, clients):
+        """Delete the hosts of ``uuid_list``, ``concurrency`` at a time.
+
+        :param list uuid_list: Ids of the hosts to delete.
+        :param int clients: Number of clients the deletions are split
+            between in the result, as :meth:`kick_off_del_test
+            <robottelo.test.ConcurrentTestCase.kick_off_del_test>` does.
+        :return: The deletion timings by client, ``{'thread-0': [...]}``.
+
+        """
+        per_client = len(uuid_list) // clients if clients else 0
+        tasks = [
+            (index // per_client, uuid)
+            for index, uuid in enumerate(uuid_list[:per_client * clients])
+            if uuid != ''
+        ]
+        timings = self._map(
+            lambda task: Candlepin.single_delete(
+                task[1], task[0], session=self._session()),
+            tasks
+        )
+        result = dict(('thread-{0}'.format(i), []) for i in range(clients))
+        for (client, _), timing in zip(tasks, timings):
+            result['thread-{0}'.format(client)].append(timing)
+        return result
+
+    def register_activation_key(self, ak_name, default_org, vm_list,
+                                iterations):
+        """Register every VM of ``vm_list`` ``iterations`` times with an
+        activation key.
+
+        The registrations of a VM run one after the other, the VMs run
+        concurrently.
+
+        :return: The registration timings by VM, ``{'thread-0': [...]}``.
+
+        """
+        def run(vm_ip):
+            """Register ``vm_ip`` the given number of times."""
+            return [
+                Candlepin.single_register_activation_key(
+                    ak_name, default_org, vm_ip)
+                for _ in range(iterations)
+            ]
+        return self._by_client(self._map(run, vm_list))
+
+    def register_attach(self, sub_id, default_org, environment, vm_list,
+                        iterations):
+        """Register every VM of ``vm_list`` and attach ``sub_id``
+        ``iterations`` times.
+
+        :return: The register and the attach timings by VM, as two dicts
+            ``{'thread-0': [...]}``.
+
+        """
+        def run(vm_ip):
+            """Register and attach ``vm_ip`` the given number of times."""
+            return [
+                Candlepin.single_register_attach(
+                    sub_id, default_org, environment, vm_ip)
+                for _ in range(iterations)
+            ]
+        results = self._map(run, vm_list)
+        return (
+            self._by_client(
+                [[timing[0] for timing in result] for result in results]),
+            self._by_client(
+                [[timing[1] for timing in result] for result in results]),
+        )
+
+    @staticmethod
+    def _by_client(results):
+        """Key the lists of timings of every client by ``thread-<i>``."""
+        return dict(
+            ('thread-{0}'.format(client), timings)
+            for client, timings in enumerate(results)
+        )
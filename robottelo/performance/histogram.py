@@ -0,0 +1,264 @@
+"""Fixed memory latency histograms for the performance tests.
+
+:mod:`robottelo.performance.stat` computes the statistics from lists holding
+every timing. :class:`HdrHistogram` instead counts the timings in buckets
+laid out as in an HDR histogram: the values are split by power of two, and
+every power of two in linear sub-buckets fine enough to keep
+``significant_figures`` decimal digits. Memory only depends on the range and
+precision of the values, whatever their number, and histograms recorded
+separately can be merged.
+
+:class:`Recorder` gives every thread its own histograms, so recording takes
+no lock, and merges them when the results are read. It can also split the
+timings in time windows, to see how the latency evolves during a run::
+
+    recorder = Recorder(window=60)
+    # in every thread
+    recorder.record(time_point)
+    # at the end
+    recorder.histogram().summary()['p99.9']
+    for window_start, histogram in recorder.windows():
+        ...
+
+"""
+import math
+import threading
+import time
+
+import numpy
+
+#: Percentiles reported by :meth:`HdrHistogram.summary`.
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class HdrHistogram(object):
+    """Histogram of durations in seconds with a bounded relative error.
+
+    With the default parameters, durations from 0.1 millisecond to an hour
+    within 1%, a histogram takes 20 KB.
+
+    :param float lowest: Smallest duration told apart from zero, the unit
+        the durations are counted in.
+    :param float highest: Largest duration recorded with the full precision,
+        larger durations are counted in the last bucket.
+    :param int significant_figures: Decimal digits kept, the relative error
+        of the percentiles is below ``10 ** -significant_figures``.
+
+    """
+    def __init__(self, lowest=1e-4, highest=3600, significant_figures=2):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError('significant_figures must be between 1 and 5.')
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_figures = significant_figures
+        # Linear sub-buckets of a power of two, enough for the precision
+        resolution = 2 * 10 ** significant_figures
+        self._sub_bucket_magnitude = int(math.ceil(math.log(resolution, 2)))
+        self._sub_bucket_count = 1 << self._sub_bucket_magnitude
+        self._sub_bucket_half_magnitude = self._sub_bucket_magnitude - 1
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+        self._highest_units = int(math.ceil(highest / lowest))
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= self._highest_units:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = numpy.zeros(
+            (bucket_count + 1) * self._sub_bucket_half_count, numpy.int64)
+        self.count = 0
+        self.total = 0.0
+        self._total_squares = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def _index(self, units):
+        """Return the index of the counter of ``units``."""
+        bucket = (
+            (units | self._sub_bucket_mask).bit_length() -
+            self._sub_bucket_magnitude
+        )
+        sub_bucket = units >> bucket
+        return (
+            ((bucket + 1) << self._sub_bucket_half_magnitude) +
+            sub_bucket - self._sub_bucket_half_count
+        )
+
+    def _highest_equivalent(self, index):
+        """Return the largest duration counted by the counter ``index``."""
+        bucket = (index >> self._sub_bucket_half_magnitude) - 1
+        sub_bucket = (
+            (index & (self._sub_bucket_half_count - 1)) +
+            self._sub_bucket_half_count
+        )
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return ((sub_bucket + 1) << bucket) * self.lowest
+
+    def _compatible(self, other):
+        """Tell whether ``other`` has the same buckets."""
+        return (
+            self.lowest == other.lowest and
+            self.significant_figures == other.significant_figures and
+            len(self.counts) == len(other.counts)
+        )
+
+    def record(self, value, count=1):
+        """Count ``count`` durations of ``value`` seconds."""
+        units = min(int(value / self.lowest), self._highest_units)
+        self.counts[self._index(max(units, 0))] += count
+        self.count += count
+        self.total += value * count
+        self._total_squares += value * value * count
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Add the durations counted by ``other``.
+
+        :raises ValueError: If ``other`` has different buckets.
+
+        """
+        if not self._compatible(other):
+            raise ValueError('Histograms with different buckets.')
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self._total_squares += other._total_squares
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(
+                    self.minimum, value)
+                self.maximum = value if self.maximum is None else max(
+                    self.maximum, value)
+
+    def percentiles(self, percents):
+        """Return the durations below which each of ``percents`` percent of
+        the durations are, ``None`` for each if nothing was recorded.
+        """
+        if not self.count:
+            return [None] * len(percents)
+        cumulated = numpy.cumsum(self.counts)
+        last = self._index(self._highest_units)
+        result = []
+        for percent in percents:
+            rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+            index = int(numpy.searchsorted(cumulated, rank))
+            if index == last:
+                # Holds all the durations above highest
+                result.append(self.maximum)
+                continue
+            result.append(max(
+                self.minimum,
+                min(self._highest_equivalent(index), self.maximum)
+            ))
+        return result
+
+    def percentile(self, percent):
+        """Return the duration below which ``percent`` percent of the
+        durations are.
+        """
+        return self.percentiles((percent,))[0]
+
+    @property
+    def mean(self):
+        """Mean duration, ``None`` if nothing was recorded."""
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self):
+        """Standard deviation, ``None`` if nothing was recorded."""
+        if not self.count:
+            return None
+        variance = self._total_squares / self.count - self.mean ** 2
+        return math.sqrt(max(variance, 0))
+
+    def summary(self):
+        """Return the count, total, min, mean, std, max and
+        :data:`PERCENTILES`, keyed ``p50``, ``p99.9``...
+        """
+        summary = {
+            'count': self.count,
+            'total': self.total,
+            'min': self.minimum,
+            'mean': self.mean,
+            'std': self.std,
+            'max': self.maximum,
+        }
+        for percent, value in zip(
+                PERCENTILES, self.percentiles(PERCENTILES)):
+            summary['p{0:g}'.format(percent)] = value
+        return summary
+
+
+class Recorder(object):
+    """Record durations from many threads into :class:`HdrHistogram`
+    objects.
+
+    :param float window: Seconds of the time windows the durations are split
+        in, by the time they are recorded at. No windows if ``None``.
+    :param kwargs: Parameters of the histograms.
+
+    """
+    def __init__(self, window=None, **kwargs):
+        self.window = window
+        self.start = time.time()
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        #: Histograms of every thread, by window index.
+        self._threads = []
+
+    def _histograms(self):
+        """Return the histograms of the current thread, by window index."""
+        histograms = getattr(self._local, 'histograms', None)
+        if histograms is None:
+            histograms = self._local.histograms = {}
+            with self._lock:
+                self._threads.append(histograms)
+        return histograms
+
+    def record(self, value, timestamp=None):
+        """Record a duration of ``value`` seconds.
+
+        :param float timestamp: Epoch time the duration belongs to, used to
+            pick its window. Defaults to now.
+
+        """
+        index = 0
+        if self.window is not None:
+            if timestamp is None:
+                timestamp = time.time()
+            index = int((timestamp - self.start) // self.window)
+        histograms = self._histograms()
+        histogram = histograms.get(index)
+        if histogram is None:
+            histogram = histograms[index] = HdrHistogram(**self._kwargs)
+        histogram.record(value)
+
+    def windows(self):
+        """Return ``(window start, histogram)`` tuples of every window with
+        durations, the histograms of all threads merged.
+        """
+        merged = {}
+        with self._lock:
+            threads = [dict(histograms) for histograms in self._threads]
+        for histograms in threads:
+            for index, histogram in histograms.items():
+                if index not in merged:
+                    merged[index] = HdrHistogram(**self._kwargs)
+                merged[index].merge(histogram)
+        return [
+            (self.start + index * (self.window or 0), merged[index])
+            for index in sorted(merged)
+        ]
+
+    def histogram(self):
+        """Return the histogram of all the durations recorded."""
+        result = HdrHistogram(**self._kwargs)
+        for _, histogram in self.windows():
+            result.merge(histogram)
+        return result
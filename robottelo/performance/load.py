@@ -0,0 +1,318 @@
+"""Open-loop load generation for the performance tests.
+
+The threads of :mod:`robottelo.performance.thread` are closed-loop: each one
+runs its operations one after the other, so a slow response delays all the
+following requests. The server is then offered less load exactly when it is
+slow and the measured latencies miss the time requests would have waited,
+known as coordinated omission.
+
+:class:`LoadGenerator` instead starts operations at the times given by an
+arrival schedule, whatever the duration of the previous ones, and runs them
+on a pool of workers. Every :class:`Sample` records the intended start time,
+the actual start time, once a worker was free, and the end time, so both the
+service time and the latency corrected for coordinated omission, measured
+from the intended start, are reported::
+
+    def register(worker, index):
+        return Candlepin.single_register_activation_key(
+            ak_name, org, vm_list[worker])
+
+    result = LoadGenerator(
+        register, poisson_arrivals(2, duration=600), workers=10).run()
+    result.summary()['latency']['p99']
+
+Schedules are iterables of start offsets, in seconds from the start of the
+run: :func:`constant_arrivals`, :func:`ramp_arrivals`, :func:`step_arrivals`
+and :func:`poisson_arrivals`.
+
+"""
+import logging
+import math
+import random
+import threading
+import time
+
+import numpy
+
+from collections import namedtuple
+from six.moves.queue import Queue
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Sample(namedtuple(
+        'Sample',
+        ('index', 'worker', 'intended', 'start', 'end', 'value', 'error'))):
+    """An operation run by :class:`LoadGenerator`.
+
+    ``intended``, ``start`` and ``end`` are epoch times, ``value`` is the
+    value returned by the operation and ``error`` the exception it raised,
+    if any.
+
+    """
+    __slots__ = ()
+
+    @property
+    def wait(self):
+        """Seconds between the intended start and the actual start."""
+        return self.start - self.intended
+
+    @property
+    def service_time(self):
+        """Seconds the operation took."""
+        return self.end - self.start
+
+    @property
+    def latency(self):
+        """Seconds from the intended start to the end, the latency corrected
+        for coordinated omission.
+        """
+        return self.end - self.intended
+
+
+def _bounded(offsets, count, duration):
+    """Yield ``offsets`` until ``count`` were yielded or one exceeds
+    ``duration``.
+    """
+    if count is None and duration is None:
+        raise ValueError('Either count or duration must be given.')
+    for index, offset in enumerate(offsets):
+        if count is not None and index >= count:
+            return
+        if duration is not None and offset >= duration:
+            return
+        yield offset
+
+
+def constant_arrivals(rate, count=None, duration=None):
+    """Start ``rate`` operations per second.
+
+    :param float rate: Operations per second.
+    :param int count: Number of operations, unbounded if ``None``.
+    :param float duration: Seconds to start operations for, unbounded if
+        ``None``. At least one of ``count`` and ``duration`` is required.
+
+    """
+    return _bounded(
+        (index / float(rate) for index in _naturals()), count, duration)
+
+
+def ramp_arrivals(start_rate, end_rate, duration):
+    """Start operations at a rate growing linearly from ``start_rate`` to
+    ``end_rate`` operations per second during ``duration`` seconds.
+    """
+    slope = (end_rate - start_rate) / float(duration)
+
+    def offsets():
+        """Solve ``start_rate * t + slope * t ** 2 / 2 == index``."""
+        for index in _naturals():
+            if slope == 0:
+                yield index / float(start_rate)
+            else:
+                yield (
+                    math.sqrt(start_rate ** 2 + 2 * slope * index) -
+                    start_rate
+                ) / slope
+    return _bounded(offsets(), None, duration)
+
+
+def step_arrivals(steps):
+    """Start operations at constant rates changing by steps.
+
+    :param steps: ``(rate, duration)`` tuples, each rate is used for its
+        duration in seconds, one step after the other.
+
+    """
+    step_start = 0.0
+    for rate, duration in steps:
+        for offset in constant_arrivals(rate, duration=duration):
+            yield step_start + offset
+        step_start += duration
+
+
+def poisson_arrivals(rate, count=None, duration=None, seed=None):
+    """Start operations as a Poisson process of ``rate`` operations per
+    second, with exponentially distributed times between them.
+
+    ``count`` and ``duration`` are as in :func:`constant_arrivals`, ``seed``
+    makes the schedule reproducible.
+
+    """
+    generator = random.Random(seed)
+
+    def offsets():
+        """Add exponential intervals."""
+        offset = 0.0
+        while True:
+            yield offset
+            offset += generator.expovariate(rate)
+    return _bounded(offsets(), count, duration)
+
+
+def _naturals():
+    """Yield 0, 1, 2..."""
+    index = 0
+    while True:
+        yield index
+        index += 1
+
+
+def _stat(values):
+    """Return the min, mean, percentiles and max of ``values``."""
+    if not values:
+        return dict.fromkeys(
+            ('min', 'mean', 'p50', 'p90', 'p95', 'p99', 'max'))
+    values = numpy.asarray(values)
+    p50, p90, p95, p99 = numpy.percentile(values, (50, 90, 95, 99))
+    return {
+        'min': float(values.min()),
+        'mean': float(values.mean()),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p95': float(p95),
+        'p99': float(p99),
+        'max': float(values.max()),
+    }
+
+
+class LoadResult(object):
+    """The samples of a :meth:`LoadGenerator.run`, sorted by intended
+    start.
+    """
+    def __init__(self, samples, workers, start, end):
+        self.samples = sorted(samples, key=lambda sample: sample.index)
+        self.workers = workers
+        self.start = start
+        self.end = end
+
+    def summary(self):
+        """Return the counts, the offered and achieved rates, and the
+        statistics of the wait, service time and corrected latency of the
+        successful operations.
+        """
+        succeeded = [
+            sample for sample in self.samples if sample.error is None]
+        elapsed = self.end - self.start
+        offered = None
+        if len(self.samples) > 1:
+            span = self.samples[-1].intended - self.samples[0].intended
+            if span:
+                offered = (len(self.samples) - 1) / span
+        return {
+            'count': len(self.samples),
+            'errors': len(self.samples) - len(succeeded),
+            'elapsed': elapsed,
+            'offered_rate': offered,
+            'throughput': len(succeeded) / elapsed if elapsed else None,
+            'wait': _stat([sample.wait for sample in succeeded]),
+            'service_time': _stat(
+                [sample.service_time for sample in succeeded]),
+            'latency': _stat([sample.latency for sample in succeeded]),
+        }
+
+    def time_result_dict(self, metric='latency'):
+        """Return the ``metric`` of the successful samples in the layout of
+        :class:`robottelo.test.ConcurrentTestCase`,
+        ``{'thread-0': [...], ...}`` with a key per worker.
+
+        :param str metric: ``latency``, ``service_time``, ``wait`` or
+            ``value`` for the values returned by the operation, like the
+            ``time -p`` timings of :mod:`robottelo.performance.candlepin`.
+
+        """
+        result = dict(
+            ('thread-{0}'.format(worker), [])
+            for worker in range(self.workers)
+        )
+        for sample in self.samples:
+            if sample.error is None:
+                result['thread-{0}'.format(sample.worker)].append(
+                    getattr(sample, metric))
+        return result
+
+
+class LoadGenerator(object):
+    """Run an operation at the times of an arrival schedule.
+
+    :param operation: Callable receiving the worker number, from 0 to
+        ``workers - 1``, and the operation index. The worker number can pick
+        a resource owned by the worker, a client VM for example.
+    :param arrivals: Iterable of start offsets in seconds, see the schedules
+        of this module.
+    :param int workers: Number of operations run at the same time. When all
+        workers are busy the next operations wait, which shows in their
+        corrected latency.
+    :param str name: Name used when logging.
+
+    """
+    def __init__(self, operation, arrivals, workers=10, name=None):
+        self.operation = operation
+        self.arrivals = arrivals
+        self.workers = workers
+        self.name = name or 'load'
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def _work(self, worker, queue):
+        """Run the operations queued until ``None`` is received."""
+        while True:
+            item = queue.get()
+            if item is None:
+                return
+            index, intended = item
+            start = time.time()
+            value = error = None
+            try:
+                value = self.operation(worker, index)
+            except Exception as err:  # pylint:disable=broad-except
+                LOGGER.warning(
+                    '%s: operation %d failed: %r', self.name, index, err)
+                error = err
+            sample = Sample(
+                index, worker, intended, start, time.time(), value, error)
+            with self._lock:
+                self._samples.append(sample)
+
+    def run(self):
+        """Start the operations at their intended times and wait for all of
+        them.
+
+        Operations are queued at their intended start whatever the number of
+        busy workers, the schedule never waits for the server.
+
+        :rtype: LoadResult
+
+        """
+        self._samples = []
+        queue = Queue()
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(worker, queue),
+                name='{0}-{1}'.format(self.name, worker),
+            )
+            for worker in range(self.workers)
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        start = time.time()
+        try:
+            for index, offset in enumerate(self.arrivals):
+                intended = start + offset
+                delay = intended - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                queue.put((index, intended))
+        finally:
+            for _ in threads:
+                queue.put(None)
+            for thread in threads:
+                thread.join()
+        result = LoadResult(self._samples, self.workers, start, time.time())
+        LOGGER.info(
+            '%s: %d operations in %.2fs, %d errors',
+            self.name, len(result.samples), result.end - result.start,
+            sum(1 for sample in result.samples if sample.error is not None)
+        )
+        return result
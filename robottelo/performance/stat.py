@@ -3,6 +3,78 @@ import csv
 import numpy
 
 
+#: Columns of the statistics computed by :func:`compute_stats`.
+STAT_COLUMNS = ('min', 'median', 'mean', 'max', 'std', '90%', '95%', '99%')
+
+
+def compute_stats(samples):
+    """Compute the statistics of the samples along the last axis.
+
+    :param samples: Array like of timings, of shape ``(..., n)``, for
+        example ``(clients, buckets, bucket_size)``.
+    :return: An array of shape ``(..., len(STAT_COLUMNS))``.
+
+    """
+    samples = numpy.asarray(samples, dtype=numpy.float64)
+    return numpy.stack(
+        [
+            numpy.amin(samples, axis=-1),
+            numpy.median(samples, axis=-1),
+            numpy.mean(samples, axis=-1),
+            numpy.amax(samples, axis=-1),
+            numpy.std(samples, axis=-1),
+        ] + list(numpy.percentile(samples, (90, 95, 99), axis=-1)),
+        axis=-1
+    )
+
+
+def stack_time_lists(time_lists):
+    """Return the timings of all clients as a 2D array, ``None`` if the
+    clients do not have the same number of timings.
+    """
+    if not time_lists or len(set(len(item) for item in time_lists)) != 1:
+        return None
+    return numpy.array(time_lists, dtype=numpy.float64)
+
+
+def bucket_labels(bucket_size, num_buckets):
+    """Return the ``1-50``, ``51-100``... labels of the buckets."""
+    return ['{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
+            for i in range(num_buckets)]
+
+
+def _bucketize(samples, bucket_size):
+    """Split ``samples`` in as many full buckets of ``bucket_size`` as
+    possible, as an array of shape ``(buckets, bucket_size)``.
+    """
+    samples = numpy.asarray(samples, dtype=numpy.float64)
+    num_buckets = len(samples) // bucket_size
+    return samples[:num_buckets * bucket_size].reshape(
+        num_buckets, bucket_size)
+
+
+def _stat_rows(name, labels, stats):
+    """Return the csv rows of a block of statistics."""
+    return [[], [name], ['bucket'] + list(STAT_COLUMNS)] + [
+        [label] + row for label, row in zip(labels, stats.tolist())]
+
+
+def _return_stat(stats):
+    """Return the ``{bucket: (min, median, max, std)}`` dictionary the
+    chart utilities take.
+    """
+    return dict(
+        (i, (row[0], row[1], row[3], row[4]))
+        for i, row in enumerate(stats.tolist())
+    )
+
+
+def _write_rows(stat_file_name, rows):
+    """Append ``rows`` to the csv file in one go."""
+    with open(stat_file_name, 'a') as handler:
+        csv.writer(handler).writerows(rows)
+
+
 def generate_stat_for_concurrent_thread(
         thread_name,
         time_list,
@@ -13,56 +85,130 @@ def generate_stat_for_concurrent_thread(
     # check empty case: empty bucket has no need to compute stat
     if bucket_size == 0:
         return
+    buckets = _bucketize(time_list, bucket_size)
+    stats = compute_stats(buckets)
+    _write_rows(stat_file_name, _stat_rows(
+        '{0}'.format(thread_name),
+        bucket_labels(bucket_size, len(buckets)),
+        stats
+    ))
+    return _return_stat(stats)
+
+
+def generate_stat_per_client_bucketized(
+        time_lists, stat_file_name, bucket_size):
+    """Write the statistics of every bucket of every client.
+
+    When all clients have the same number of timings, they are split in
+    buckets and computed at once.
+
+    :param list time_lists: The timings of every client.
+    :return: The list of the ``{bucket: (min, median, max, std)}``
+        dictionaries of every client.
+
+    """
+    matrix = stack_time_lists(time_lists)
+    if matrix is not None:
+        num_buckets = matrix.shape[1] // bucket_size
+        all_stats = compute_stats(
+            matrix[:, :num_buckets * bucket_size].reshape(
+                len(matrix), num_buckets, bucket_size))
     else:
-        num_buckets = len(time_list)/bucket_size
+        all_stats = [
+            compute_stats(_bucketize(time_list, bucket_size))
+            for time_list in time_lists
+        ]
+    rows = []
+    for i, stats in enumerate(all_stats):
+        rows.extend(_stat_rows(
+            'client-{0}'.format(i),
+            bucket_labels(bucket_size, len(stats)),
+            stats
+        ))
+    _write_rows(stat_file_name, rows)
+    return [_return_stat(stats) for stats in all_stats]
 
-    return_stat = {}
 
-    # create list of bucket series
-    buckets = ['{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
-               for i in range(num_buckets)]
+def generate_stat_per_test_bucketized(
+        time_lists, stat_file_name, bucket_size, num_buckets):
+    """Write the statistics of every bucket of the test, the bucket ``i``
+    gathering the bucket ``i`` of every client.
 
-    with open(stat_file_name, 'a') as handler:
-        writer = csv.writer(handler)
-        writer.writerow([])
-        writer.writerow(['{0}'.format(thread_name)])
-        writer.writerow([
-            'bucket',
-            'min',
-            'median',
-            'mean',
-            'max',
-            'std',
-            '90%',
-            '95%',
-            '99%'
-        ])
-        for i, bucket in enumerate(buckets):
-            # slice the given time-list into buckets
-            time_list_slice = time_list[bucket_size * i:bucket_size * (i + 1)]
+    :return: The ``{bucket: (min, median, max, std)}`` dictionary.
 
-            # variables for generating graphs only
-            gmin = numpy.amin(time_list_slice)
-            gmean = numpy.mean(time_list_slice)
-            gmedian = numpy.median(time_list_slice)
-            gmax = numpy.amax(time_list_slice)
-            gstd = numpy.std(time_list_slice)
+    """
+    matrix = stack_time_lists(time_lists)
+    if matrix is not None and matrix.shape[1] >= num_buckets * bucket_size:
+        chunks = matrix[:, :num_buckets * bucket_size].reshape(
+            len(matrix), num_buckets, bucket_size
+        ).transpose(1, 0, 2).reshape(num_buckets, -1)
+    else:
+        chunks = [
+            sum((list(time_list[i * bucket_size:(i + 1) * bucket_size])
+                 for time_list in time_lists), [])
+            for i in range(num_buckets)
+        ]
+    rows = []
+    stat_dict = {}
+    for i, chunk in enumerate(chunks):
+        if len(chunk) == 0:
+            stat_dict[i] = (0, 0, 0, 0)
+            continue
+        stats = compute_stats(chunk)[numpy.newaxis]
+        rows.extend(_stat_rows(
+            'bucket-{0}'.format(i), bucket_labels(len(chunk), 1), stats))
+        stat_dict[i] = _return_stat(stats)[0]
+    _write_rows(stat_file_name, rows)
+    return stat_dict
 
-            writer.writerow([
-                bucket,
-                gmin,
-                gmedian,
-                gmean,
-                gmax,
-                gstd,
-                numpy.percentile(time_list_slice, 90),
-                numpy.percentile(time_list_slice, 95),
-                numpy.percentile(time_list_slice, 99)
-            ])
 
-            # update a dictionary with key as each bucket and values as stat
-            return_stat.update({i: (gmin, gmedian, gmax, gstd)})
-        return return_stat
+def generate_stat_per_client(time_lists, stat_file_name):
+    """Write the statistics of all the timings of every client.
+
+    :return: The ``{client: (min, median, max, std)}`` dictionary.
+
+    """
+    matrix = stack_time_lists(time_lists)
+    if matrix is not None and matrix.shape[1]:
+        all_stats = compute_stats(matrix)
+    else:
+        all_stats = [
+            compute_stats(time_list) if len(time_list) else None
+            for time_list in time_lists
+        ]
+    rows = []
+    stat_dict = {}
+    for i, (time_list, stats) in enumerate(zip(time_lists, all_stats)):
+        if stats is None:
+            stat_dict[i] = (0, 0, 0, 0)
+            continue
+        stats = numpy.asarray(stats)[numpy.newaxis]
+        rows.extend(_stat_rows(
+            'client-{0}'.format(i), bucket_labels(len(time_list), 1), stats))
+        stat_dict[i] = _return_stat(stats)[0]
+    _write_rows(stat_file_name, rows)
+    return stat_dict
+
+
+def generate_stat_per_test(time_lists, stat_file_name):
+    """Write the statistics of all the timings of the test.
+
+    :return: The ``{0: (min, median, max, std)}`` dictionary.
+
+    """
+    samples = numpy.concatenate([
+        numpy.asarray(time_list, dtype=numpy.float64)
+        for time_list in time_lists
+    ] or [[]])
+    if not len(samples):
+        return {}
+    stats = compute_stats(samples)[numpy.newaxis]
+    _write_rows(stat_file_name, _stat_rows(
+        'test-{0}'.format(len(time_lists)),
+        bucket_labels(len(samples), 1),
+        stats
+    ))
+    return _return_stat(stats)
 
 
 def generate_stat_for_pulp_sync(index, time_list, stat_file_name):
@@ -83,3 +229,67 @@ def generate_stat_for_pulp_sync(index, time_list, stat_file_name):
             sync_std,
         ])
     return (sync_min, sync_median, sync_max, sync_std)
+
+
+def generate_stat_for_histogram(name, recorder, stat_file_name):
+    """statistics computing utility for the timings of a
+    :class:`robottelo.performance.histogram.Recorder`
+
+    A row is written for every time window of the recorder, with the
+    columns ``window`` (start of the window in seconds from the start of the
+    recorder), ``count``, ``min``, ``median``, ``mean``, ``max``, ``std``,
+    ``90%``, ``95%``, ``99%`` and ``99.9%``, and a last ``all`` row for the
+    whole run.
+
+    :return: A dictionary with the ``(min, median, max, std)`` of every
+        window, like :func:`generate_stat_for_concurrent_thread` returns for
+        every bucket.
+
+    """
+    return_stat = {}
+    windows = recorder.windows()
+    with open(stat_file_name, 'a') as handler:
+        writer = csv.writer(handler)
+        writer.writerow([])
+        writer.writerow(['{0}'.format(name)])
+        writer.writerow([
+            'window',
+            'count',
+            'min',
+            'median',
+            'mean',
+            'max',
+            'std',
+            '90%',
+            '95%',
+            '99%',
+            '99.9%'
+        ])
+        rows = [
+            ('{0:.0f}'.format(start - recorder.start), histogram)
+            for start, histogram in windows
+        ]
+        rows.append(('all', recorder.histogram()))
+        for i, (window, histogram) in enumerate(rows):
+            summary = histogram.summary()
+            writer.writerow([
+                window,
+                summary['count'],
+                summary['min'],
+                summary['p50'],
+                summary['mean'],
+                summary['max'],
+                summary['std'],
+                summary['p90'],
+                summary['p95'],
+                summary['p99'],
+                summary['p99.9']
+            ])
+            if i < len(windows):
+                return_stat.update({i: (
+                    summary['min'],
+                    summary['p50'],
+                    summary['max'],
+                    summary['std']
+                )})
+    return return_stat
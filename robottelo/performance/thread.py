@@ -1,4 +1,15 @@
-"""Test utilities for multi-threading programming"""
+"""Test utilities for multi-threading programming
+
+These threads run closed-loop, each one waits for an operation to finish
+before starting the next. See :mod:`robottelo.performance.load` to start
+operations at a target rate instead.
+
+Timings are appended to the list of the thread in ``time_result_dict`` and,
+when given, recorded in a :class:`robottelo.performance.histogram.Recorder`
+shared by the threads. ``time_result_dict`` can be ``None`` to keep only the
+histograms.
+
+"""
 import logging
 import threading
 import time
@@ -17,19 +28,32 @@ class PerformanceThread(threading.Thread):
     multiple threads to measure timing latency.
 
     """
-    def __init__(self, thread_id, thread_name, time_result_dict):
+    def __init__(self, thread_id, thread_name, time_result_dict,
+                 recorder=None):
         threading.Thread.__init__(self)
         self.thread_id = thread_id
         self.thread_name = thread_name
         self.time_result_dict = time_result_dict
+        self.recorder = recorder
         self.logger = LOGGER
 
+    def _record(self, time_point, time_result_dict=None, recorder=None):
+        """Keep ``time_point`` in the list of the thread in
+        ``time_result_dict`` and record it in ``recorder``, if they are not
+        ``None``.
+        """
+        if time_result_dict is not None:
+            time_result_dict.get(self.thread_name).append(time_point)
+        if recorder is not None:
+            recorder.record(time_point)
+
 
 class DeleteThread(PerformanceThread):
     """Thread utility to support concurrent content hosts deletion"""
-    def __init__(self, thread_id, thread_name, sublist, time_result_dict):
+    def __init__(self, thread_id, thread_name, sublist, time_result_dict,
+                 recorder=None):
         super(DeleteThread, self).__init__(
-            thread_id, thread_name, time_result_dict)
+            thread_id, thread_name, time_result_dict, recorder)
         self.sublist = sublist
 
     def run(self):
@@ -42,7 +66,8 @@ class DeleteThread(PerformanceThread):
                     .format(idx, self.thread_id, uuid))
                 # conduct one request by the id
                 time_point = Candlepin.single_delete(uuid, self.thread_id)
-                self.time_result_dict[self.thread_name].append(time_point)
+                self._record(
+                    time_point, self.time_result_dict, self.recorder)
 
 
 class SubscribeAKThread(PerformanceThread):
@@ -55,9 +80,10 @@ class SubscribeAKThread(PerformanceThread):
             num_iterations,
             ak_name,
             default_org,
-            vm_ip):
+            vm_ip,
+            recorder=None):
         super(SubscribeAKThread, self).__init__(
-            thread_id, thread_name, time_result_dict)
+            thread_id, thread_name, time_result_dict, recorder)
         self.num_iterations = num_iterations
         self.ak_name = ak_name
         self.default_org = default_org
@@ -73,7 +99,7 @@ class SubscribeAKThread(PerformanceThread):
                 self.ak_name,
                 self.default_org,
                 self.vm_ip)
-            self.time_result_dict[self.thread_name].append(time_point)
+            self._record(time_point, self.time_result_dict, self.recorder)
 
 
 class SubscribeAttachThread(PerformanceThread):
@@ -88,6 +114,9 @@ class SubscribeAttachThread(PerformanceThread):
         dict-register: {client-0: [...], ..., client-9:[...]}
         dict-attach: {client-0: [...], ..., client-9:[...]}
 
+    Likewise, ``recorder_register`` and ``recorder_attach`` record the
+    timings of each step.
+
     """
     def __init__(
             self,
@@ -99,7 +128,9 @@ class SubscribeAttachThread(PerformanceThread):
             num_iterations,
             sub_id,
             default_org, environment,
-            vm_ip):
+            vm_ip,
+            recorder_register=None,
+            recorder_attach=None):
         super(SubscribeAttachThread, self).__init__(
             thread_id,
             thread_name,
@@ -108,6 +139,8 @@ class SubscribeAttachThread(PerformanceThread):
 
         self.time_result_dict_register = time_result_dict_register
         self.time_result_dict_attach = time_result_dict_attach
+        self.recorder_register = recorder_register
+        self.recorder_attach = recorder_attach
         self.num_iterations = num_iterations
         self.sub_id = sub_id
         self.default_org = default_org
@@ -128,14 +161,18 @@ class SubscribeAttachThread(PerformanceThread):
 
             # split original time_result_dict into two new dictionaries
             # append each client's register timing data
-            self.time_result_dict_register.get(
-                self.thread_name, 'thread-0'
-            ).append(time_points[0])
+            self._record(
+                time_points[0],
+                self.time_result_dict_register,
+                self.recorder_register,
+            )
 
             # append each client's attach timing data
-            self.time_result_dict_attach.get(
-                self.thread_name, 'thread-0'
-            ).append(time_points[1])
+            self._record(
+                time_points[1],
+                self.time_result_dict_attach,
+                self.recorder_attach,
+            )
 
 
 class SyncThread(PerformanceThread):
@@ -147,11 +184,13 @@ class SyncThread(PerformanceThread):
             time_result_dict,
             repository_id,
             repository_name,
-            iteration):
+            iteration,
+            recorder=None):
         super(SyncThread, self).__init__(
             thread_id,
             thread_name,
-            time_result_dict
+            time_result_dict,
+            recorder
         )
         self.repository_id = repository_id
         self.repository_name = repository_name
@@ -170,4 +209,4 @@ class SyncThread(PerformanceThread):
         )
 
         # append sync timing to each thread
-        self.time_result_dict.get(self.thread_name).append(time_point)
+        self._record(time_point, self.time_result_dict, self.recorder)
@@ -0,0 +1,207 @@
+# -*- encoding: utf-8 -*-
+"""Build fixtures made of several dependent steps, running independent steps
+in parallel.
+
+A :class:`Plan` is a set of named steps, each one declaring the steps whose
+results it needs. Running the plan runs every step once, as soon as all its
+requirements are done, and returns the result of each step::
+
+    plan = Plan('organization with a product')
+    plan.step('organization-id', lambda inputs: make_org()['id'])
+    plan.step(
+        'product-id',
+        lambda inputs: make_product({
+            u'organization-id': inputs['organization-id']})['id'],
+        requires=('organization-id',),
+    )
+    results = plan.run()
+
+Once a plan is run, the duration of each step and the critical path, the
+chain of dependent steps which determined the plan duration, are available
+and logged.
+
+"""
+import logging
+import sys
+import time
+
+import six
+
+from contextlib import closing
+from multiprocessing.pool import ThreadPool
+from six.moves.queue import Queue
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PlanError(Exception):
+    """Indicates a plan is not valid, for example it has a dependency
+    cycle.
+    """
+
+
+class Step(object):
+    """A step of a :class:`Plan`.
+
+    :param str name: Name of the step, used as key of its result.
+    :param func: Callable receiving a dict with the results of the required
+        steps and returning the step result.
+    :param tuple requires: Names of the steps this step needs.
+
+    """
+    def __init__(self, name, func, requires=()):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+
+
+class Plan(object):
+    """A set of dependent steps run concurrently.
+
+    :param str name: Name of the plan, used when logging.
+    :param int concurrency: Maximum number of steps run at the same time.
+    :param context: Optional callable returning a context manager which is
+        entered around each step, in the thread running it.
+
+    """
+    def __init__(self, name=None, concurrency=4, context=None):
+        self.name = name or 'plan'
+        self.concurrency = concurrency
+        self.context = context
+        self.steps = {}
+        #: Results of the steps done, by step name.
+        self.results = {}
+        #: ``(start, end)`` times of the steps run, by step name.
+        self.times = {}
+        self.elapsed = None
+
+    def step(self, name, func, requires=(), value=None):
+        """Add a step to the plan.
+
+        :param value: When not ``None`` the step is done with this result
+            and ``func`` is not called. Allows to reuse entities given by the
+            caller.
+
+        """
+        if name in self.steps:
+            raise PlanError(u'Step {0} is already defined'.format(name))
+        self.steps[name] = Step(name, func, requires)
+        if value is not None:
+            self.results[name] = value
+
+    def _validate(self):
+        """Check every requirement is a step of the plan."""
+        for step in self.steps.values():
+            unknown = set(step.requires) - set(self.steps)
+            if unknown:
+                raise PlanError(u'Step {0} requires unknown steps {1}'.format(
+                    step.name, ', '.join(sorted(unknown))))
+
+    def _run_step(self, step, inputs):
+        """Run ``step`` returning its outcome instead of raising."""
+        start = time.time()
+        try:
+            if self.context is None:
+                value = step.func(inputs)
+            else:
+                with self.context():
+                    value = step.func(inputs)
+            return step.name, value, None, start, time.time()
+        except Exception:  # pylint:disable=broad-except
+            return step.name, None, sys.exc_info(), start, time.time()
+
+    def run(self):
+        """Run the steps not done yet.
+
+        If a step fails, no other step is started, the running ones are
+        waited for and the step error is raised.
+
+        :return: The results of all the steps, by step name.
+        :rtype: dict
+        :raises PlanError: If the plan is not valid.
+
+        """
+        self._validate()
+        pending = set(self.steps) - set(self.results)
+        running = set()
+        done = Queue()
+        error = None
+        start = time.time()
+        with closing(ThreadPool(max(1, self.concurrency))) as pool:
+            while pending or running:
+                ready = [] if error else sorted(
+                    name for name in pending
+                    if all(req in self.results
+                           for req in self.steps[name].requires)
+                )
+                for name in ready:
+                    step = self.steps[name]
+                    inputs = dict(
+                        (req, self.results[req]) for req in step.requires)
+                    pending.remove(name)
+                    running.add(name)
+                    pool.apply_async(
+                        self._run_step, (step, inputs), callback=done.put)
+                if not running:
+                    if error:
+                        break
+                    raise PlanError(u'Steps {0} of {1} depend on each other'
+                                    .format(', '.join(sorted(pending)),
+                                            self.name))
+                name, value, exc_info, step_start, step_end = done.get()
+                running.remove(name)
+                self.times[name] = (step_start, step_end)
+                if exc_info is not None:
+                    error = error or exc_info
+                else:
+                    self.results[name] = value
+        self.elapsed = time.time() - start
+        if error:
+            six.reraise(*error)
+        self._log_report()
+        return dict(self.results)
+
+    def duration(self, name):
+        """Return the seconds taken by step ``name``, 0 if it was not run."""
+        if name not in self.times:
+            return 0.0
+        step_start, step_end = self.times[name]
+        return step_end - step_start
+
+    @property
+    def critical_path(self):
+        """The chain of steps which determined the plan duration, starting
+        with the first step run.
+        """
+        if not self.times:
+            return []
+        path = [max(self.times, key=lambda name: self.times[name][1])]
+        while True:
+            requires = [
+                req for req in self.steps[path[-1]].requires
+                if req in self.times
+            ]
+            if not requires:
+                break
+            path.append(max(requires, key=lambda name: self.times[name][1]))
+        return list(reversed(path))
+
+    @property
+    def critical_path_time(self):
+        """Seconds spent running the steps of the critical path."""
+        return sum(self.duration(name) for name in self.critical_path)
+
+    def _log_report(self):
+        """Log the duration of each step and the critical path."""
+        LOGGER.info(
+            '%s done in %.2f seconds, sum of steps %.2f seconds, critical '
+            'path %.2f seconds: %s',
+            self.name,
+            self.elapsed,
+            sum(self.duration(name) for name in self.times),
+            self.critical_path_time,
+            ' -> '.join(self.critical_path),
+        )
+        for name in sorted(self.times, key=lambda name: self.times[name][0]):
+            LOGGER.debug('%s step %s took %.2f seconds',
+                         self.name, name, self.duration(name))
@@ -0,0 +1,268 @@
+# -*- encoding: utf-8 -*-
+"""Pytest plugin reporting the remote calls made by every test.
+
+Every hammer command, SSH command and NailGun HTTP request is attributed to
+the test running it, setup and teardown included, and a report is printed
+at the end of the session with:
+
+* the tests making the most remote calls and spending the most time in them,
+* the identical commands run the most often, candidates for caching,
+* the calls and time of every test module.
+
+The plugin is shipped with robottelo and enabled with::
+
+    py.test -p robottelo.profiler --remote-profile tests/foreman/cli
+
+``--remote-profile-top`` sets the number of lines of each table and
+``--remote-profile-report`` writes the full data as JSON. The calls are
+timed by :mod:`robottelo.metrics`, so a hammer command is counted once even
+though it runs an SSH command. When the tests are distributed with
+pytest-xdist every worker profiles its own tests, give a report path to get
+their data.
+
+"""
+import json
+import os
+import threading
+
+from functools import wraps
+from robottelo import metrics
+
+#: Key of the calls made outside of any test, in session fixtures for
+#: example.
+OUTSIDE_TESTS = '<session>'
+
+#: NailGun client functions timed, with the HTTP method they send.
+NAILGUN_FUNCTIONS = (
+    ('request', None),
+    ('head', 'HEAD'),
+    ('get', 'GET'),
+    ('post', 'POST'),
+    ('put', 'PUT'),
+    ('patch', 'PATCH'),
+    ('delete', 'DELETE'),
+)
+
+
+class Totals(object):
+    """Number and duration of remote calls."""
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def add(self, duration):
+        """Count a call lasting ``duration`` seconds."""
+        self.count += 1
+        self.duration += duration
+
+    def to_dict(self):
+        """Return the totals as a dict, for the JSON report."""
+        return {'count': self.count, 'duration': self.duration}
+
+
+class RemoteCallProfile(object):
+    """Remote calls of a test session, grouped by test, command and module.
+
+    :meth:`add` is a :mod:`robottelo.metrics` hook, it may be called from
+    the threads a test starts.
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        #: Test node id receiving the calls.
+        self.current = OUTSIDE_TESTS
+        self.tests = {}
+        self.commands = {}
+        #: Tests which ran each command.
+        self.command_tests = {}
+
+    def add(self, timing):
+        """Attribute a :class:`robottelo.metrics.CommandTiming` to the
+        current test.
+        """
+        command = timing.command or u'{0} {1}'.format(
+            timing.command_base, timing.command_sub).strip()
+        if isinstance(command, bytes):
+            command = command.decode('utf-8', 'replace')
+        with self._lock:
+            test = self.current
+            self.tests.setdefault(test, Totals()).add(timing.duration)
+            self.commands.setdefault(command, Totals()).add(timing.duration)
+            self.command_tests.setdefault(command, set()).add(test)
+
+    def modules(self):
+        """Return the totals of every test module, by module path."""
+        modules = {}
+        for test, totals in self.tests.items():
+            module = modules.setdefault(test.split('::')[0], Totals())
+            module.count += totals.count
+            module.duration += totals.duration
+        return modules
+
+    def to_dict(self):
+        """Return the profile as a dict, for the JSON report."""
+        return {
+            'tests': dict(
+                (test, totals.to_dict())
+                for test, totals in self.tests.items()
+            ),
+            'commands': [
+                dict(
+                    totals.to_dict(),
+                    command=command,
+                    tests=sorted(self.command_tests[command]),
+                )
+                for command, totals in self.commands.items()
+            ],
+            'modules': dict(
+                (module, totals.to_dict())
+                for module, totals in self.modules().items()
+            ),
+        }
+
+
+def _top(totals, top, key):
+    """Return the ``top`` items of the ``totals`` dict, sorted by ``key``."""
+    return sorted(totals.items(), key=lambda item: -key(item[1]))[:top]
+
+
+def _timed(function, method):
+    """Wrap a NailGun client function so its requests are timed.
+
+    :param str method: HTTP method sent by ``function``, ``None`` for
+        ``request`` which receives it as first argument.
+
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        """Time the request and describe it by method and URL."""
+        if method is None:
+            http_method, url = args[:2]
+        else:
+            http_method, url = method, args[0]
+        with metrics.command('nailgun', http_method.lower()):
+            metrics.describe(u'{0} {1}'.format(http_method, url))
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def pytest_addoption(parser):
+    """Add the ``--remote-profile`` options."""
+    group = parser.getgroup('robottelo')
+    group.addoption(
+        '--remote-profile',
+        action='store_true',
+        default=False,
+        help='Report the remote calls made by every test.',
+    )
+    group.addoption(
+        '--remote-profile-top',
+        type=int,
+        default=10,
+        metavar='N',
+        help='Number of lines of the remote calls tables (default 10).',
+    )
+    group.addoption(
+        '--remote-profile-report',
+        default=None,
+        metavar='PATH',
+        help='Write the remote calls of every test as JSON to PATH.',
+    )
+
+
+def pytest_configure(config):
+    """Start profiling when ``--remote-profile`` is given."""
+    if config.getoption('remote_profile'):
+        config.pluginmanager.register(
+            RemoteCallProfiler(config), 'robottelo-remote-profiler')
+
+
+class RemoteCallProfiler(object):
+    """Plugin object registered for the profiled sessions."""
+    def __init__(self, config):
+        self.config = config
+        self.profile = RemoteCallProfile()
+        self._nailgun = []
+
+    def pytest_sessionstart(self, session):
+        """Register the metrics hook and time the NailGun requests."""
+        metrics.add_hook(self.profile.add)
+        try:
+            from nailgun import client
+        except ImportError:
+            return
+        for name, method in NAILGUN_FUNCTIONS:
+            function = getattr(client, name)
+            self._nailgun.append((client, name, function))
+            setattr(client, name, _timed(function, method))
+
+    def pytest_sessionfinish(self, session):
+        """Unregister the hook, restore NailGun and write the report."""
+        metrics.remove_hook(self.profile.add)
+        for client, name, function in self._nailgun:
+            setattr(client, name, function)
+        self._nailgun = []
+        path = self.config.getoption('remote_profile_report')
+        if path:
+            worker = getattr(self.config, 'slaveinput', {}).get('slaveid')
+            if worker:
+                path = u'{0}.{1}'.format(path, worker)
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(path, 'w') as report:
+                json.dump(self.profile.to_dict(), report, indent=2)
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        """Attribute the next calls to the test starting."""
+        self.profile.current = nodeid
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        """Attribute the calls made between tests to the session."""
+        self.profile.current = OUTSIDE_TESTS
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Print the top tests, repeated commands and module totals."""
+        profile = self.profile
+        top = self.config.getoption('remote_profile_top')
+        write = terminalreporter.write_line
+        terminalreporter.write_sep('=', 'remote calls profile')
+        if not profile.tests:
+            write('No remote calls.')
+            return
+        write('Tests with the most remote calls:')
+        for test, totals in _top(
+                profile.tests, top, lambda totals: totals.count):
+            write(u'{0:8d} {1:10.2f}s  {2}'.format(
+                totals.count, totals.duration, test))
+        write('')
+        write('Tests spending the most time in remote calls:')
+        for test, totals in _top(
+                profile.tests, top, lambda totals: totals.duration):
+            write(u'{0:8d} {1:10.2f}s  {2}'.format(
+                totals.count, totals.duration, test))
+        repeated = dict(
+            (command, totals)
+            for command, totals in profile.commands.items()
+            if totals.count > 1
+        )
+        if repeated:
+            write('')
+            write('Commands run the most often with the same arguments:')
+            for command, totals in _top(
+                    repeated, top, lambda totals: totals.count):
+                write(u'{0:8d} {1:10.2f}s  {2:5d} tests  {3}'.format(
+                    totals.count,
+                    totals.duration,
+                    len(profile.command_tests[command]),
+                    command,
+                ))
+        write('')
+        write('Remote calls by module:')
+        for module, totals in _top(
+                profile.modules(), len(profile.tests),
+                lambda totals: totals.duration):
+            write(u'{0:8d} {1:10.2f}s  {2}'.format(
+                totals.count, totals.duration, module))
@@ -0,0 +1,997 @@
+# -*- encoding: utf-8 -*-
+"""In-process stand-in for a Satellite server, to measure robottelo's own
+overhead without a real server.
+
+The simulator keeps the entities in memory, see :class:`SatelliteState`, and
+serves them through two front ends:
+
+* an SSH server, built on paramiko's server interface, running the subset of
+  hammer commands issued by :mod:`robottelo.cli`, see
+  :class:`HammerSimulator`: ``create``, ``info``, ``list``, ``update`` and
+  ``delete`` of the entities of :data:`robottelo.cli.rest.RESOURCES`, plus the
+  commands the :mod:`robottelo.cli.factory` setup functions need, like
+  ``repository synchronize`` or ``content-view publish``,
+* a minimal HTTP API, see :class:`RESTSimulator`, answering the calls of the
+  :mod:`robottelo.cli.rest` backend. NailGun's raw calls, like
+  ``create_json``, are answered too, but not the ones reading whole
+  entities, which expect every field of the real API.
+
+Outputs are built with the :mod:`robottelo.cli.rest` field definitions, so
+they parse like the real ones. Nothing is actually synchronized or
+published, and every command or API call waits for a configurable latency
+instead.
+
+It is enabled by the ``[simulator]`` section of the settings, in which case
+it is started when the settings are configured and the ``[server]``
+settings are pointed to it. The ``make_org``, ``setup_org_for_a_custom_repo``
+or :class:`robottelo.test.ConcurrentTestCase` flows can then be load tested
+offline. It can also be used directly::
+
+    simulator = Simulator(latencies={'repository synchronize': 2})
+    simulator.start()
+    simulator.configure_server(settings.server)
+
+"""
+import atexit
+import json
+import logging
+import re
+import shlex
+import socket
+import threading
+import time
+
+import paramiko
+import six
+
+from collections import OrderedDict
+from six.moves import socketserver
+from six.moves.urllib.parse import parse_qsl
+from robottelo.cli import rest
+from robottelo.config import settings
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+LOGGER = logging.getLogger(__name__)
+
+#: Return code of hammer for unknown commands and options.
+USAGE_RETURN_CODE = 64
+
+#: Return code of hammer for invalid or missing entities.
+DATA_RETURN_CODE = 65
+
+#: Return code of the shell for commands other than hammer.
+NOT_FOUND_RETURN_CODE = 127
+
+#: Fields of the ``subscription list`` rows, subscriptions are created with
+#: their products.
+SUBSCRIPTION_FIELDS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('quantity', 'quantity'),
+    ('consumed', 'consumed'),
+)
+
+# API attributes with a {id, name} reference to another entity, by the
+# parameter holding the ID of this entity, and the kind of the entity. Other
+# ``*_id`` parameters are refused, as the real API would ignore them.
+_REFERENCES = {
+    'content_view_id': ('content_view', 'content-view'),
+    'environment_id': ('environment', 'lifecycle-environment'),
+    'organization_id': ('organization', 'organization'),
+    'prior': ('prior', 'lifecycle-environment'),
+    'prior_id': ('prior', 'lifecycle-environment'),
+    'product_id': ('product', 'product'),
+}
+
+# Attribute looked up by the name options, when it is not ``name``
+_NAME_ATTRIBUTES = {'user': 'login'}
+
+# Kinds of the API collections, by collection name
+_COLLECTIONS = dict(
+    (resource.path.rsplit('/', 1)[1], kind)
+    for kind, resource in rest.RESOURCES.items()
+)
+_COLLECTIONS['subscriptions'] = 'subscription'
+
+_PATH_REGEX = re.compile(
+    r'^/(?:katello/)?api(?:/v2)?/(?P<collection>\w+)'
+    r'(?:/(?P<id>\d+)(?:/(?P<action>\w+))?)?/?$'
+)
+_SEARCH_REGEX = re.compile(r'^\s*(\w+)\s*=\s*"?(.*?)"?\s*$')
+
+
+class SimulatorError(Exception):
+    """Indicates the simulated server refused a command or API call.
+
+    :param str message: explanation of the error, printed by hammer.
+    :param int return_code: hammer return code.
+
+    """
+    def __init__(self, message, return_code=DATA_RETURN_CODE):
+        super(SimulatorError, self).__init__(message)
+        self.message = message
+        self.return_code = return_code
+
+
+def _to_id(value):
+    """Return an entity ID given as option or parameter."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise SimulatorError(u'Invalid ID "{0}"'.format(value))
+
+
+def _check_parameters(params):
+    """Refuse the ``*_id`` parameters which are not API parameters, like
+    ``lifecycle_environment_id`` instead of ``environment_id``.
+    """
+    for key in params:
+        if key.endswith('_id') and key not in _REFERENCES:
+            raise SimulatorError(u'Unknown parameter "{0}"'.format(key))
+
+
+def _csv_line(values):
+    """Return a CSV line, quoting the values when needed."""
+    line = []
+    for value in values:
+        value = six.text_type(value)
+        if any(char in value for char in u',"\n'):
+            value = u'"{0}"'.format(value.replace(u'"', u'""'))
+        line.append(value)
+    return u','.join(line)
+
+
+def _title(key):
+    """Return a hammer output key as hammer prints it, for example
+    ``content-view-id`` becomes ``Content View ID``.
+    """
+    return u' '.join(
+        u'ID' if word == 'id' else word.capitalize()
+        for word in key.split('-')
+    )
+
+
+class SatelliteState(object):
+    """The entities of the simulated server, as the API returns them.
+
+    Every entity kind, a hammer command base, has its own ID sequence.
+    References to other entities are stored as ``{'id': ..., 'name': ...}``
+    dictionaries, like ``organization`` for the ``organization_id``
+    parameter. All methods are thread safe.
+
+    """
+    def __init__(self):
+        self.entities = {}
+        self._lock = threading.RLock()
+        self._next_ids = {}
+
+    def _new_id(self, kind):
+        """Return the next ID of ``kind``."""
+        entity_id = self._next_ids.get(kind, 1)
+        self._next_ids[kind] = entity_id + 1
+        return entity_id
+
+    def _reference(self, kind, entity_id):
+        """Return the reference to an entity, stored by the entities using
+        it.
+        """
+        entity = self._get(kind, entity_id)
+        return {
+            'id': entity['id'],
+            'name': entity.get(_NAME_ATTRIBUTES.get(kind, 'name')),
+        }
+
+    def _get(self, kind, entity_id):
+        """Return the stored entity, raising if it does not exist."""
+        entity = self.entities.get(kind, {}).get(_to_id(entity_id))
+        if entity is None:
+            raise SimulatorError(u'Could not find {0} with ID {1}'.format(
+                kind.replace('-', ' '), entity_id))
+        return entity
+
+    def _set(self, kind, entity, params):
+        """Update ``entity`` with ``params``, resolving the references."""
+        _check_parameters(params)
+        for key, value in params.items():
+            if key == 'new_name':
+                entity[_NAME_ATTRIBUTES.get(kind, 'name')] = value
+            elif key in _REFERENCES:
+                attribute, reference_kind = _REFERENCES[key]
+                entity[attribute] = self._reference(reference_kind, value)
+                if key != 'prior':
+                    entity[key] = entity[attribute]['id']
+            else:
+                entity[key] = value
+
+    def _add(self, kind, entity):
+        """Store a new entity and return it."""
+        entity['id'] = self._new_id(kind)
+        self.entities.setdefault(kind, OrderedDict())[entity['id']] = entity
+        return entity
+
+    def create(self, kind, params):
+        """Create an entity from its API parameters.
+
+        Organizations get a ``Library`` lifecycle environment and products a
+        subscription, like on a real server.
+
+        :return: A copy of the new entity.
+        :raises SimulatorError: If the name is missing or already used in
+            the organization, or a referenced entity does not exist.
+
+        """
+        name_attribute = _NAME_ATTRIBUTES.get(kind, 'name')
+        with self._lock:
+            entity = {}
+            self._set(kind, entity, params)
+            name = entity.get(name_attribute)
+            if not name:
+                raise SimulatorError(
+                    u'Missing arguments for "{0}"'.format(name_attribute))
+            scope = {}
+            if 'organization' in entity:
+                scope['organization_id'] = entity['organization']['id']
+            if self.list(kind, dict(scope, search=u'{0}="{1}"'.format(
+                    name_attribute, name))):
+                raise SimulatorError(
+                    u'Could not create the {0}:\n  Name has already been '
+                    u'taken'.format(kind.replace('-', ' ')))
+            entity.setdefault('label', re.sub(r'\W', '_', name))
+            entity.setdefault('description', None)
+            self._add(kind, entity)
+            if kind == 'organization':
+                self._add('lifecycle-environment', {
+                    'name': u'Library',
+                    'label': u'Library',
+                    'library': True,
+                    'organization': self._reference(kind, entity['id']),
+                    'organization_id': entity['id'],
+                })
+            elif kind == 'product':
+                entity.update({'repository_count': 0, 'sync_state': None})
+                self._add('subscription', {
+                    'name': name,
+                    'quantity': -1,
+                    'consumed': 0,
+                    'organization': entity['organization'],
+                    'organization_id': entity['organization_id'],
+                    'product_id': entity['id'],
+                })
+            elif kind == 'repository':
+                product = self._get('product', entity['product_id'])
+                product['repository_count'] += 1
+                entity.setdefault('content_type', u'yum')
+                entity['organization'] = product['organization']
+                entity['full_path'] = u'/pulp/repos/{0}'.format(
+                    entity['label'])
+            elif kind == 'content-view':
+                entity.update({
+                    'composite': False, 'repository_ids': [], 'versions': []})
+            elif kind == 'lifecycle-environment':
+                entity['library'] = False
+            return dict(entity)
+
+    def get(self, kind, entity_id):
+        """Return a copy of an entity.
+
+        :raises SimulatorError: If the entity does not exist.
+
+        """
+        with self._lock:
+            return dict(self._get(kind, entity_id))
+
+    def find(self, kind, name, scope=None):
+        """Return the ID of the entity of ``kind`` named ``name`` in the
+        ``scope`` given as API parameters, like ``organization_id``.
+
+        :raises SimulatorError: If there is no such entity.
+
+        """
+        found = self.list(kind, dict(scope or {}, search=u'{0}="{1}"'.format(
+            _NAME_ATTRIBUTES.get(kind, 'name'), name)))
+        if not found:
+            raise SimulatorError(u'Could not find {0} "{1}"'.format(
+                kind.replace('-', ' '), name))
+        return found[0]['id']
+
+    def list(self, kind, params=None):
+        """Return copies of the entities of ``kind``.
+
+        :param dict params: API parameters: ``search`` as ``key="value"``,
+            ``*_id`` parameters to scope the search, ``page`` and
+            ``per_page``.
+
+        """
+        params = dict(params or {})
+        _check_parameters(params)
+        page = int(params.pop('page', 1))
+        per_page = params.pop('per_page', None)
+        search = params.pop('search', None)
+        filters = {}
+        if search:
+            match = _SEARCH_REGEX.match(search.replace('\\"', '"'))
+            if match is not None:
+                filters[match.group(1)] = match.group(2)
+        for key, value in params.items():
+            if key in _REFERENCES and kind != _REFERENCES[key][1]:
+                filters[_REFERENCES[key][0]] = _to_id(value)
+        with self._lock:
+            result = []
+            for entity in self.entities.get(kind, {}).values():
+                for key, value in filters.items():
+                    actual = entity.get(key)
+                    if isinstance(actual, dict):
+                        actual = actual['id']
+                    if six.text_type(actual) != six.text_type(value):
+                        break
+                else:
+                    result.append(dict(entity))
+        if per_page:
+            per_page = int(per_page)
+            result = result[(page - 1) * per_page:page * per_page]
+        return result
+
+    def update(self, kind, entity_id, params):
+        """Update an entity with API parameters and return a copy of it."""
+        with self._lock:
+            entity = self._get(kind, entity_id)
+            self._set(kind, entity, params)
+            return dict(entity)
+
+    def delete(self, kind, entity_id):
+        """Delete an entity.
+
+        :raises SimulatorError: If the entity does not exist.
+
+        """
+        with self._lock:
+            entity = self._get(kind, entity_id)
+            del self.entities[kind][entity['id']]
+            if kind == 'repository':
+                product = self.entities['product'].get(entity['product_id'])
+                if product is not None:
+                    product['repository_count'] -= 1
+
+    def synchronize(self, repository_id):
+        """Mark a repository and its product as synchronized."""
+        with self._lock:
+            repository = self._get('repository', repository_id)
+            repository['last_sync'] = time.strftime('%Y-%m-%d %H:%M:%S UTC')
+            self._get('product', repository['product_id'])['sync_state'] = (
+                u'Syncing Complete.')
+
+    def add_repository(self, content_view_id, repository_id):
+        """Add a repository to a content view."""
+        with self._lock:
+            content_view = self._get('content-view', content_view_id)
+            repository_id = self._get('repository', repository_id)['id']
+            if repository_id not in content_view['repository_ids']:
+                content_view['repository_ids'].append(repository_id)
+
+    def publish(self, content_view_id):
+        """Publish a new version of a content view and return it."""
+        with self._lock:
+            content_view = self._get('content-view', content_view_id)
+            version = {
+                'id': self._new_id('content-view-version'),
+                'version': u'{0}.0'.format(len(content_view['versions']) + 1),
+                'published': time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            }
+            content_view['versions'].append(version)
+            return dict(version)
+
+    def promote(self, version_id, environment_id):
+        """Promote a content view version to a lifecycle environment."""
+        version_id = _to_id(version_id)
+        with self._lock:
+            self._get('lifecycle-environment', environment_id)
+            for content_view in self.entities.get(
+                    'content-view', {}).values():
+                for version in content_view['versions']:
+                    if version['id'] == version_id:
+                        return
+        raise SimulatorError(
+            u'Could not find content view version with ID {0}'
+            .format(version_id))
+
+    def add_subscription(self, activation_key_id, subscription_id, quantity):
+        """Attach a subscription to an activation key."""
+        with self._lock:
+            self._get('activation-key', activation_key_id)
+            subscription = self._get('subscription', subscription_id)
+            subscription['consumed'] += int(quantity or 1)
+
+
+class HammerSimulator(object):
+    """Run hammer commands against a :class:`SatelliteState`.
+
+    :param state: The simulated server state.
+    :param wait: Called with the ``(command_base, command_sub)`` of every
+        command before running it, to simulate its duration.
+
+    """
+    def __init__(self, state, wait=None):
+        self.state = state
+        self.wait = wait or (lambda command_base, command_sub: None)
+        self._actions = {
+            ('activation-key', 'add-subscription'): self._add_subscription,
+            ('content-view', 'add-repository'): self._add_repository,
+            ('content-view', 'publish'): self._publish,
+            ('content-view', 'version promote'): self._promote,
+            ('ping', ''): self._ping,
+            ('repository', 'synchronize'): self._synchronize,
+            ('subscription', 'list'): self._subscriptions,
+        }
+
+    @staticmethod
+    def parse_command(command):
+        """Split a hammer command line as
+        :meth:`robottelo.cli.base.Base.execute` builds it.
+
+        :return: A ``(command_base, command_sub, options, output_format)``
+            tuple, ``None`` if the command does not run hammer. Options are
+            ``True`` for flags.
+
+        """
+        if six.PY2 and isinstance(command, six.text_type):
+            command = command.encode('utf-8')
+        elif not six.PY2 and isinstance(command, bytes):
+            command = command.decode('utf-8')
+        words = shlex.split(command)
+        if six.PY2:
+            words = [word.decode('utf-8') for word in words]
+        if u'hammer' not in words:
+            return None
+        words = iter(words[words.index(u'hammer') + 1:])
+        output_format = None
+        commands = []
+        options = {}
+        for word in words:
+            if word in (u'-u', u'-p'):
+                next(words, None)
+            elif word.startswith(u'--output'):
+                output_format = (
+                    word.partition(u'=')[2] or next(words, u'')) or None
+            elif word.startswith(u'--'):
+                key, equal, value = word[2:].partition(u'=')
+                options[key] = value if equal else True
+            elif not word.startswith(u'-'):
+                commands.append(word)
+        if not commands:
+            return None
+        return commands[0], u' '.join(commands[1:]), options, output_format
+
+    def run(self, command):
+        """Run a command line.
+
+        :return: A ``(stdout, stderr, return_code)`` tuple, with ``stdout``
+            and ``stderr`` as UTF-8 bytes, like the SSH channel returns them.
+
+        """
+        parsed = self.parse_command(command)
+        if parsed is None:
+            return b'', u'{0}: command not simulated\n'.format(
+                command).encode('utf-8'), NOT_FOUND_RETURN_CODE
+        command_base, command_sub, options, output_format = parsed
+        self.wait(command_base, command_sub)
+        try:
+            stdout = self._run(command_base, command_sub, options,
+                               output_format)
+        except SimulatorError as err:
+            return b'', u'{0}\n'.format(err.message).encode(
+                'utf-8'), err.return_code
+        return stdout.encode('utf-8'), b'', 0
+
+    def _run(self, command_base, command_sub, options, output_format):
+        """Run a parsed command and return its output."""
+        action = self._actions.get((command_base, command_sub))
+        if action is not None:
+            return action(options, output_format)
+        resource = rest.RESOURCES.get(command_base)
+        if resource is None or command_sub not in rest.SUBCOMMANDS:
+            raise SimulatorError(
+                u'Error: unknown command "{0} {1}"'.format(
+                    command_base, command_sub),
+                USAGE_RETURN_CODE,
+            )
+        params = self._params(command_base, options)
+        if command_sub == 'list':
+            return self._list(
+                self.state.list(command_base, params),
+                resource.list_fields,
+                output_format,
+            )
+        if command_sub == 'create':
+            entity = self.state.create(command_base, params)
+            return self._message(
+                u'{0} created'.format(_title(command_base)),
+                output_format,
+                ('id', entity['id']),
+                ('name', entity.get(_NAME_ATTRIBUTES.get(
+                    command_base, 'name'))),
+            )
+        entity_id = self._entity_id(command_base, params)
+        if command_sub == 'info':
+            return self._info(
+                self.state.get(command_base, entity_id),
+                resource.info_fields,
+                output_format,
+            )
+        if command_sub == 'update':
+            self.state.update(command_base, entity_id, params)
+        else:
+            self.state.delete(command_base, entity_id)
+        return self._message(
+            u'{0} {1}d'.format(_title(command_base), command_sub),
+            output_format,
+        )
+
+    def _params(self, command_base, options):
+        """Translate hammer options into API parameters, resolving the
+        options referencing entities by name.
+        """
+        resource = rest.RESOURCES.get(command_base)
+        options = dict(options)
+        if 'per-page' in options:
+            options['per_page'] = options.pop('per-page')
+        # Organizations are resolved first as they scope the other searches
+        for key in sorted(
+                rest.REFERENCES, key=lambda key: key != 'organization'):
+            if key in options:
+                id_option, kind = rest.REFERENCES[key]
+                scope = {}
+                if 'organization-id' in options and kind != 'organization':
+                    scope['organization_id'] = options['organization-id']
+                options[id_option] = self.state.find(
+                    kind, options.pop(key), scope)
+        return dict(
+            (resource.parameter(key) if resource else key.replace('-', '_'),
+             value)
+            for key, value in options.items()
+        )
+
+    def _entity_id(self, kind, params):
+        """Return the ID of the entity a command acts on, removing the
+        options identifying it from ``params``.
+        """
+        if 'id' in params:
+            return params.pop('id')
+        name_attribute = _NAME_ATTRIBUTES.get(kind, 'name')
+        if name_attribute not in params:
+            raise SimulatorError(
+                u'Missing arguments for "id"', USAGE_RETURN_CODE)
+        scope = dict(
+            (key, params[key]) for key in ('organization_id', 'product_id')
+            if key in params and kind != _REFERENCES[key][1]
+        )
+        return self.state.find(kind, params.pop(name_attribute), scope)
+
+    @staticmethod
+    def _rows(entities, fields):
+        """Return the output rows of ``entities``, as ordered pairs."""
+        return [
+            [(key, rest.format_entity(entity, ((key, spec),))[key])
+             for key, spec in fields]
+            for entity in entities
+        ]
+
+    def _list(self, entities, fields, output_format):
+        """Return the output of a list command."""
+        rows = self._rows(entities, fields)
+        if output_format == 'json':
+            return json.dumps([
+                OrderedDict((_title(key), value) for key, value in row)
+                for row in rows
+            ])
+        lines = [_csv_line(_title(key) for key, _ in fields)]
+        lines.extend(_csv_line(value for _, value in row) for row in rows)
+        return u'\n'.join(lines) + u'\n'
+
+    def _info(self, entity, fields, output_format):
+        """Return the output of an info command."""
+        row = self._rows([entity], fields)[0]
+        if output_format == 'json':
+            return json.dumps(self._json_keys(OrderedDict(row)))
+        lines = []
+        for key, value in row:
+            if isinstance(value, dict):
+                lines.append(u'{0}:'.format(_title(key)))
+                lines.extend(
+                    u'    {0}: {1}'.format(_title(sub_key), sub_value)
+                    for sub_key, sub_value in sorted(value.items())
+                )
+            elif isinstance(value, list):
+                lines.append(u'{0}:'.format(_title(key)))
+                for number, item in enumerate(value, 1):
+                    for index, (sub_key, sub_value) in enumerate(
+                            sorted(item.items())):
+                        lines.append(u'{0}{1}: {2}'.format(
+                            u' {0}) '.format(number) if index == 0
+                            else u'    ',
+                            _title(sub_key),
+                            sub_value,
+                        ))
+            else:
+                lines.append(u'{0}: {1}'.format(_title(key), value))
+        return u'\n'.join(lines) + u'\n'
+
+    def _json_keys(self, value):
+        """Return an info value with the keys hammer prints in JSON."""
+        if isinstance(value, dict):
+            return OrderedDict(
+                (_title(key), self._json_keys(item))
+                for key, item in value.items()
+            )
+        if isinstance(value, list):
+            return [self._json_keys(item) for item in value]
+        return value
+
+    @staticmethod
+    def _message(message, output_format, *fields):
+        """Return the output of a command printing a message and optionally
+        some fields of the entity it acted on.
+        """
+        fields = (('message', message),) + fields
+        if output_format == 'json':
+            return json.dumps(OrderedDict(
+                (_title(key), value) for key, value in fields))
+        if output_format == 'csv':
+            return u'{0}\n{1}\n'.format(
+                _csv_line(_title(key) for key, _ in fields),
+                _csv_line(value for _, value in fields),
+            )
+        return u'{0}\n'.format(message)
+
+    def _add_subscription(self, options, output_format):
+        """Run ``activation-key add-subscription``."""
+        self.state.add_subscription(
+            options.get('id'),
+            options.get('subscription-id'),
+            options.get('quantity'),
+        )
+        return self._message(
+            u'Subscription added to activation key', output_format)
+
+    def _add_repository(self, options, output_format):
+        """Run ``content-view add-repository``."""
+        self.state.add_repository(
+            options.get('id'), options.get('repository-id'))
+        return self._message(
+            u'The repository has been associated', output_format)
+
+    def _publish(self, options, output_format):
+        """Run ``content-view publish``."""
+        self.state.publish(options.get('id'))
+        return self._message(u'Task success', output_format)
+
+    def _promote(self, options, output_format):
+        """Run ``content-view version promote``."""
+        self.state.promote(
+            options.get('id'), options.get('to-lifecycle-environment-id'))
+        return self._message(u'Task success', output_format)
+
+    def _ping(self, options, output_format):
+        """Run ``ping``."""
+        return u'candlepin:\n    Status:          ok\n'
+
+    def _synchronize(self, options, output_format):
+        """Run ``repository synchronize``."""
+        self.state.synchronize(options.get('id'))
+        return self._message(u'Task success', output_format)
+
+    def _subscriptions(self, options, output_format):
+        """Run ``subscription list``."""
+        params = self._params('subscription', options)
+        return self._list(
+            self.state.list('subscription', params),
+            SUBSCRIPTION_FIELDS,
+            output_format,
+        )
+
+
+class RESTSimulator(object):
+    """WSGI application answering the API calls against a
+    :class:`SatelliteState`.
+
+    Collections are found by name under ``/api``, ``/api/v2`` and
+    ``/katello/api/v2``, see :data:`robottelo.cli.rest.RESOURCES`. Entities
+    are returned as stored, and collections with the usual ``results``,
+    ``page`` and ``per_page`` keys.
+
+    :param state: The simulated server state.
+    :param wait: Called with the ``(command_base, command_sub)`` matching
+        every call before answering it, to simulate its duration.
+
+    """
+    def __init__(self, state, wait=None):
+        self.state = state
+        self.wait = wait or (lambda command_base, command_sub: None)
+
+    def __call__(self, environ, start_response):
+        try:
+            status, body = self.handle(
+                environ['REQUEST_METHOD'],
+                environ.get('PATH_INFO', ''),
+                dict(parse_qsl(environ.get('QUERY_STRING', ''))),
+                self._body(environ),
+            )
+        except SimulatorError as err:
+            status = 404 if err.message.startswith('Could not find') else 422
+            body = {'error': {'message': err.message}}
+        data = json.dumps(body).encode('utf-8')
+        start_response(
+            '{0} {1}'.format(status, 'OK' if status < 400 else 'Error'),
+            [('Content-Type', 'application/json'),
+             ('Content-Length', str(len(data)))],
+        )
+        return [data]
+
+    @staticmethod
+    def _body(environ):
+        """Return the decoded JSON body of a request, unwrapping the
+        parameters NailGun nests under the entity name.
+        """
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        if not length:
+            return {}
+        body = json.loads(environ['wsgi.input'].read(length).decode('utf-8'))
+        if len(body) == 1 and isinstance(list(body.values())[0], dict):
+            body = list(body.values())[0]
+        return body
+
+    def handle(self, method, path, query, body):
+        """Answer an API call.
+
+        :return: A ``(status, body)`` tuple.
+
+        """
+        if path.rstrip('/') in ('/api/status', '/api/v2/status',
+                                '/katello/api/ping', '/katello/api/v2/ping'):
+            return 200, {'status': 'ok'}
+        match = _PATH_REGEX.match(path)
+        kind = match and _COLLECTIONS.get(match.group('collection'))
+        if kind is None:
+            return 404, {'error': {'message': 'Route not simulated'}}
+        entity_id, action = match.group('id'), match.group('action')
+        params = dict(query, **body)
+        if entity_id is None:
+            if method == 'POST':
+                self.wait(kind, 'create')
+                return 201, self.state.create(kind, params)
+            self.wait(kind, 'list')
+            results = self.state.list(kind, params)
+            return 200, {
+                'total': len(results),
+                'subtotal': len(results),
+                'page': int(params.get('page', 1)),
+                'per_page': params.get('per_page'),
+                'results': results,
+            }
+        if action == 'sync' and kind == 'repository':
+            self.wait(kind, 'synchronize')
+            self.state.synchronize(entity_id)
+            return 202, {'state': 'stopped', 'result': 'success'}
+        if action == 'publish' and kind == 'content-view':
+            self.wait(kind, 'publish')
+            self.state.publish(entity_id)
+            return 202, {'state': 'stopped', 'result': 'success'}
+        if action is not None:
+            return 404, {'error': {'message': 'Route not simulated'}}
+        if method == 'GET':
+            self.wait(kind, 'info')
+            return 200, self.state.get(kind, entity_id)
+        if method == 'PUT':
+            self.wait(kind, 'update')
+            return 200, self.state.update(kind, entity_id, params)
+        if method == 'DELETE':
+            self.wait(kind, 'delete')
+            self.state.delete(kind, entity_id)
+            return 200, {}
+        return 405, {'error': {'message': 'Method not allowed'}}
+
+
+class _SSHServerInterface(paramiko.ServerInterface):
+    """Accept any credentials and run the exec requests with hammer."""
+    def __init__(self, hammer):
+        self.hammer = hammer
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def get_allowed_auths(self, username):
+        return 'password,publickey'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_exec_request(self, channel, command):
+        thread = threading.Thread(
+            target=self._exec, args=(channel, command))
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _exec(self, channel, command):
+        """Run a command and send its output to the client.
+
+        The channel is left for the client to close, as closing it here
+        could happen before the exec request is acknowledged.
+
+        """
+        try:
+            stdout, stderr, return_code = self.hammer.run(command)
+            if stdout:
+                channel.sendall(stdout)
+            if stderr:
+                channel.sendall_stderr(stderr)
+            channel.send_exit_status(return_code)
+        except Exception:  # pylint:disable=broad-except
+            LOGGER.exception('Simulated command failed: %s', command)
+            channel.send_exit_status(1)
+        finally:
+            channel.shutdown_write()
+
+
+class _ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """WSGI server answering every request in its own thread."""
+    daemon_threads = True
+
+
+class _QuietWSGIRequestHandler(WSGIRequestHandler):
+    """Request handler logging the requests at debug level."""
+    def log_message(self, format, *args):  # pylint:disable=W0622
+        LOGGER.debug('[simulator] ' + format, *args)
+
+
+class Simulator(object):
+    """SSH and HTTP servers simulating a Satellite on the local machine.
+
+    :param str host: Address the servers listen on.
+    :param int ssh_port: Port of the SSH server, a free one if ``0``.
+    :param int http_port: Port of the HTTP server, a free one if ``0``.
+    :param float latency: Seconds every command and API call takes.
+    :param dict latencies: Seconds taken by specific commands, keyed by
+        ``command_base command_sub``, like ``repository synchronize``, which
+        override ``latency``. API calls use the hammer command they match.
+    :param host_key: The ``paramiko.PKey`` of the SSH server, a new RSA key
+        if not given.
+
+    """
+    def __init__(self, host='127.0.0.1', ssh_port=0, http_port=0, latency=0,
+                 latencies=None, host_key=None):
+        self.host = host
+        self.ssh_port = ssh_port
+        self.http_port = http_port
+        self.latency = latency
+        self.latencies = dict(
+            (key, float(value)) for key, value in (latencies or {}).items())
+        self.host_key = host_key
+        self.state = SatelliteState()
+        self.hammer = HammerSimulator(self.state, self.wait)
+        self.rest = RESTSimulator(self.state, self.wait)
+        self._http_server = None
+        self._ssh_socket = None
+        self._transports = []
+        self._stopped = threading.Event()
+
+    def wait(self, command_base, command_sub):
+        """Sleep for the latency of a command."""
+        latency = self.latencies.get(
+            u'{0} {1}'.format(command_base, command_sub).strip(),
+            self.latency
+        )
+        if latency:
+            time.sleep(latency)
+
+    def start(self):
+        """Start the SSH and HTTP servers in background threads."""
+        if self.host_key is None:
+            self.host_key = paramiko.RSAKey.generate(2048)
+        self._ssh_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._ssh_socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._ssh_socket.bind((self.host, self.ssh_port))
+        self._ssh_socket.listen(128)
+        self.ssh_port = self._ssh_socket.getsockname()[1]
+        self._http_server = make_server(
+            self.host,
+            self.http_port,
+            self.rest,
+            server_class=_ThreadingWSGIServer,
+            handler_class=_QuietWSGIRequestHandler,
+        )
+        self.http_port = self._http_server.server_port
+        for target in (self._accept, self._http_server.serve_forever):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+        LOGGER.info('Simulator listening on %s, SSH port %d, HTTP port %d',
+                    self.host, self.ssh_port, self.http_port)
+
+    def _accept(self):
+        """Accept the SSH connections until the simulator is stopped."""
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._ssh_socket.accept()
+            except (socket.error, OSError):
+                break
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self.host_key)
+            try:
+                transport.start_server(
+                    server=_SSHServerInterface(self.hammer))
+            except (paramiko.SSHException, EOFError) as err:
+                LOGGER.debug('SSH negotiation failed: %s', err)
+                continue
+            self._transports.append(transport)
+            thread = threading.Thread(
+                target=self._hold_channels, args=(transport,))
+            thread.daemon = True
+            thread.start()
+
+    @staticmethod
+    def _hold_channels(transport):
+        """Accept the channels of a connection, which are handled by the
+        server interface, and keep them until the client closes them, as the
+        transport only keeps weak references to them.
+        """
+        channels = []
+        while transport.is_active():
+            channel = transport.accept(1)
+            channels = [item for item in channels if not item.closed]
+            if channel is not None:
+                channels.append(channel)
+
+    def stop(self):
+        """Stop the servers and close the SSH connections."""
+        self._stopped.set()
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+        if self._ssh_socket is not None:
+            try:
+                self._ssh_socket.shutdown(socket.SHUT_RDWR)
+            except (socket.error, OSError):
+                pass
+            self._ssh_socket.close()
+        for transport in self._transports:
+            transport.close()
+
+    def configure_server(self, server):
+        """Point the ``[server]`` settings to the simulator.
+
+        :param server: The :class:`robottelo.config.settings.ServerSettings`
+            to update.
+
+        """
+        server.hostname = self.host
+        server.ssh_port = self.ssh_port
+        server.port = self.http_port
+        server.scheme = 'http'
+
+
+_simulator = None
+_simulator_lock = threading.Lock()
+
+
+def get_simulator():
+    """Return the simulator configured by the ``[simulator]`` section,
+    starting it the first time. It is stopped when the process exits.
+    """
+    global _simulator  # pylint:disable=global-statement
+    with _simulator_lock:
+        if _simulator is None:
+            _simulator = Simulator(
+                ssh_port=settings.simulator.ssh_port,
+                http_port=settings.simulator.http_port,
+                latency=settings.simulator.latency,
+                latencies=settings.simulator.latencies,
+            )
+            _simulator.start()
+            atexit.register(_simulator.stop)
+        return _simulator
@@ -1,16 +1,30 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
+import codecs
 import json
 import logging
+import select
+import socket
+import threading
+import time
 from contextlib import contextmanager
 
 import paramiko
 import re
 
+from robottelo import metrics
+from robottelo.cassette import CassetteError, get_cassette
 from robottelo.cli import hammer
 from robottelo.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Remove escape code for colors displayed in the output
+COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+COLOR_CODES_BYTES_REGEX = re.compile(br'\x1b\[\d\d?m')
+# Remove the Rails traffic information lines
+RAILS_LINES_BYTES_REGEX = re.compile(br'^\[.*(\n|$)', re.MULTILINE)
+
 
 class SSHCommandResult(object):
     """Structure that returns in all ssh commands results."""
@@ -40,6 +54,46 @@ def _call_paramiko_sshclient():
     return paramiko.SSHClient()
 
 
+def _resolve_credentials(hostname=None, username=None, password=None,
+                         key_filename=None):
+    """Fill the connection arguments which were not provided with the values
+    from configuration's ``server`` section.
+
+    :return: A ``(hostname, username, password, key_filename)`` tuple.
+    :rtype: tuple
+
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if username is None:
+        username = settings.server.ssh_username
+    if key_filename is None:
+        key_filename = settings.server.ssh_key
+    if password is None:
+        password = settings.server.ssh_password
+    return (hostname, username, password, key_filename)
+
+
+def _connect(hostname, username, password, key_filename, timeout=10):
+    """Create a new paramiko client and authenticate it against ``hostname``.
+
+    :return: A connected SSH client.
+    :rtype: paramiko.SSHClient
+
+    """
+    client = _call_paramiko_sshclient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname,
+        port=settings.server.ssh_port or 22,
+        username=username,
+        key_filename=key_filename,
+        password=password,
+        timeout=timeout
+    )
+    return client
+
+
 @contextmanager
 def _get_connection(hostname=None, username=None, password=None,
                     key_filename=None, timeout=10):
@@ -72,24 +126,9 @@ def _get_connection(hostname=None, username=None, password=None,
     :rtype: paramiko.SSHClient
 
     """
-    if hostname is None:
-        hostname = settings.server.hostname
-    if username is None:
-        username = settings.server.ssh_username
-    if key_filename is None:
-        key_filename = settings.server.ssh_key
-    if password is None:
-        password = settings.server.ssh_password
-
-    client = _call_paramiko_sshclient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        password=password,
-        timeout=timeout
-    )
+    hostname, username, password, key_filename = _resolve_credentials(
+        hostname, username, password, key_filename)
+    client = _connect(hostname, username, password, key_filename, timeout)
     client_id = hex(id(client))
     try:
         logger.info('Instantiated Paramiko client {0}'.format(client_id))
@@ -100,6 +139,213 @@ def _get_connection(hostname=None, username=None, password=None,
         logger.info('Destroyed Paramiko client {0}'.format(client_id))
 
 
+class SSHConnectionPool(object):
+    """Thread-safe pool of persistent SSH connections.
+
+    Connections are kept per ``(hostname, username, key_filename)`` and are
+    handed out to one caller at a time. A connection which is released back to
+    the pool stays open, so the next caller skips the TCP, key exchange and
+    authentication handshakes. Idle connections older than
+    ``max_idle_time`` seconds are evicted and every connection is health
+    checked before being reused, dead ones are transparently replaced by a
+    fresh connection.
+
+    :param int max_idle_time: Seconds an idle connection is kept open.
+    :param int keepalive: Interval in seconds of the transport keepalive
+        packets. ``0`` disables keepalive.
+    :param int max_size: Maximum number of idle connections kept per key.
+
+    """
+
+    def __init__(self, max_idle_time=300, keepalive=30, max_size=8):
+        self.max_idle_time = max_idle_time
+        self.keepalive = keepalive
+        self.max_size = max_size
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'evictions': 0,
+            'handshake_time': 0.0,
+            'handshakes': 0,
+            'hits': 0,
+            'in_use': 0,
+            'misses': 0,
+        }
+
+    @staticmethod
+    def _is_alive(client):
+        """Tell whether ``client`` has an active transport."""
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _close(client):
+        """Close ``client`` ignoring any error raised while doing it."""
+        try:
+            client.close()
+        except Exception as err:  # pylint:disable=broad-except
+            logger.debug('Error closing Paramiko client: %s', err)
+
+    def _evict_expired(self, now):
+        """Close idle connections unused for more than ``max_idle_time``.
+
+        Must be called with the pool lock held.
+
+        """
+        for key, idle in self._idle.items():
+            alive = []
+            for client, last_used in idle:
+                if now - last_used > self.max_idle_time:
+                    self._stats['evictions'] += 1
+                    self._close(client)
+                else:
+                    alive.append((client, last_used))
+            self._idle[key] = alive
+
+    def acquire(self, hostname, username, password, key_filename,
+                timeout=10):
+        """Check out a connection, opening a new one if none is available.
+
+        :return: A connected SSH client. It must be given back by calling
+            :meth:`release` or :meth:`discard`.
+        :rtype: paramiko.SSHClient
+
+        """
+        key = (hostname, username, key_filename)
+        with self._lock:
+            self._evict_expired(time.time())
+            idle = self._idle.get(key, [])
+            while idle:
+                client, _ = idle.pop()
+                if self._is_alive(client):
+                    self._stats['hits'] += 1
+                    self._stats['in_use'] += 1
+                    return client
+                self._stats['evictions'] += 1
+                self._close(client)
+            self._stats['misses'] += 1
+        start = time.time()
+        client = _connect(hostname, username, password, key_filename, timeout)
+        elapsed = time.time() - start
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        with self._lock:
+            self._stats['handshakes'] += 1
+            self._stats['handshake_time'] += elapsed
+            self._stats['in_use'] += 1
+        logger.info(
+            'Instantiated pooled Paramiko client {0} for {1}@{2}'
+            .format(hex(id(client)), username, hostname)
+        )
+        return client
+
+    def release(self, client, hostname, username, key_filename):
+        """Give ``client`` back to the pool so it can be reused."""
+        key = (hostname, username, key_filename)
+        with self._lock:
+            self._stats['in_use'] -= 1
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_size and self._is_alive(client):
+                idle.append((client, time.time()))
+                return
+        self._close(client)
+
+    def discard(self, client):
+        """Close ``client`` instead of returning it to the pool."""
+        with self._lock:
+            self._stats['in_use'] -= 1
+        self._close(client)
+
+    def close_all(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for client, _ in connections:
+                self._close(client)
+
+    def stats(self):
+        """Return a copy of the pool counters.
+
+        The counters are ``hits`` and ``misses`` for connection checkouts,
+        ``handshakes`` and ``handshake_time`` (in seconds) for new connections,
+        ``evictions`` for idle or dead connections which were closed and
+        ``in_use`` for connections checked out and not given back yet.
+
+        :rtype: dict
+
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = sum(len(idle) for idle in self._idle.values())
+        return stats
+
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """Return the shared :class:`SSHConnectionPool`.
+
+    The pool is created on first use, taking its configuration from the
+    ``server`` section of the settings.
+
+    """
+    global _connection_pool  # pylint:disable=global-statement
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = SSHConnectionPool(
+                max_idle_time=settings.server.ssh_pool_idle_timeout or 300,
+                keepalive=settings.server.ssh_keepalive or 0,
+                max_size=settings.server.ssh_pool_size or 8,
+            )
+    return _connection_pool
+
+
+@atexit.register
+def close_pooled_connections():
+    """Close every idle connection held by the shared connection pool."""
+    if _connection_pool is not None:
+        _connection_pool.close_all()
+
+
+@contextmanager
+def _get_pooled_connection(hostname=None, username=None, password=None,
+                           key_filename=None, timeout=10):
+    """Yield an ssh connection object checked out from the connection pool.
+
+    Accepts the same arguments as :func:`_get_connection`. The connection is
+    given back to the pool when the caller is done with it, unless an error
+    was raised while using it, in which case the connection is closed. This
+    includes ``GeneratorExit``, raised when a generator holding the
+    connection is closed before being exhausted, since the state of its
+    channels is unknown.
+
+    When ``[server] ssh_connection_pool`` is disabled this behaves exactly as
+    :func:`_get_connection`.
+
+    """
+    if settings.server.ssh_connection_pool is False:
+        with _get_connection(
+                hostname, username, password, key_filename, timeout) as conn:
+            yield conn
+        return
+    hostname, username, password, key_filename = _resolve_credentials(
+        hostname, username, password, key_filename)
+    pool = get_connection_pool()
+    client = pool.acquire(hostname, username, password, key_filename, timeout)
+    completed = False
+    try:
+        yield client
+        completed = True
+    finally:
+        if completed:
+            pool.release(client, hostname, username, key_filename)
+        else:
+            pool.discard(client)
+
+
 def upload_file(local_file, remote_file, hostname=None):
     """Upload a local file to a remote machine
 
@@ -108,79 +354,476 @@ def upload_file(local_file, remote_file, hostname=None):
         placed.
     :param hostname: target machine hostname. If not provided will be used the
         ``server.hostname`` from the configuration.
+
+    Nothing is uploaded when replaying a cassette, see
+    :mod:`robottelo.cassette`.
     """
-    with _get_connection(hostname=hostname) as connection:
-        try:
-            sftp = connection.open_sftp()
-            # Check if local_file is a file-like object and use the proper
-            # paramiko function to upload it to the remote machine.
-            if hasattr(local_file, 'read'):
-                sftp.putfo(local_file, remote_file)
-            else:
-                sftp.put(local_file, remote_file)
-        finally:
-            sftp.close()
+    cassette = get_cassette()
+    if cassette is not None and not cassette.recording:
+        logger.debug('Not uploading %s, replaying a cassette', remote_file)
+        return
+    with metrics.command('sftp', 'upload'):
+        start = time.time()
+        with _get_pooled_connection(hostname=hostname) as connection:
+            metrics.add('connect', time.time() - start)
+            with metrics.phase('transfer'):
+                try:
+                    sftp = connection.open_sftp()
+                    # Check if local_file is a file-like object and use the
+                    # proper paramiko function to upload it to the remote
+                    # machine.
+                    if hasattr(local_file, 'read'):
+                        sftp.putfo(local_file, remote_file)
+                    else:
+                        sftp.put(local_file, remote_file)
+                finally:
+                    sftp.close()
 
 
 def download_file(remote_file, local_file=None, hostname=None):
     """Download a remote file to the local machine. If ``hostname`` is not
     provided will be used the server.
 
+    When a cassette is in use the file content is recorded or replayed, see
+    :mod:`robottelo.cassette`.
+
     """
     if local_file is None:
         local_file = remote_file
-    with _get_connection(hostname=hostname) as connection:
+    cassette = get_cassette()
+    if cassette is not None:
+        cassette.download(
+            hostname or settings.server.hostname,
+            remote_file,
+            local_file,
+            lambda: _download_file(remote_file, local_file, hostname),
+        )
+    else:
+        _download_file(remote_file, local_file, hostname)
+
+
+def _download_file(remote_file, local_file, hostname):
+    """Download a remote file over SFTP, see :func:`download_file`."""
+    with metrics.command('sftp', 'download'):
+        start = time.time()
+        with _get_pooled_connection(hostname=hostname) as connection:
+            metrics.add('connect', time.time() - start)
+            with metrics.phase('transfer'):
+                try:
+                    sftp = connection.open_sftp()
+                    sftp.get(remote_file, local_file)
+                finally:
+                    sftp.close()
+
+
+def _exec_command(cmd, hostname, timeout, retry=True):
+    """Run ``cmd`` on a pooled connection and read its output.
+
+    A pooled connection may be dropped by the server after being health
+    checked. If the command channel can not be opened the command is retried
+    once, the stale connection is not returned to the pool since it is not
+    active anymore.
+
+    :return: A ``(stdout, stderr, return_code)`` tuple with the raw bytes
+        read from the remote command.
+    :raises paramiko.SSHException: If the command channel can not be opened.
+
+    """
+    start = time.time()
+    with _get_pooled_connection(hostname=hostname) as connection:
+        metrics.add('connect', time.time() - start)
         try:
-            sftp = connection.open_sftp()
-            sftp.get(remote_file, local_file)
-        finally:
-            sftp.close()
+            start = time.time()
+            _, stdout, stderr = connection.exec_command(cmd, timeout)
+        except (paramiko.SSHException, socket.error, EOFError) as err:
+            if not retry:
+                raise
+            logger.debug('Retrying on a new connection due to: %s', err)
+        else:
+            errorcode = stdout.channel.recv_exit_status()
+            metrics.add('execute', time.time() - start)
+            start = time.time()
+            output = stdout.read(), stderr.read(), errorcode
+            metrics.add('transfer', time.time() - start)
+            return output
+    return _exec_command(cmd, hostname, timeout, retry=False)
+
+
+def _build_result(stdout, stderr, return_code, output_format=None):
+    """Decode and clean up the raw output of a command.
+
+    :param bytes stdout: Raw contents of the command ``stdout``.
+    :param bytes stderr: Raw contents of the command ``stderr``.
+    :param int return_code: The command exit status.
+    :param str output_format: Passed through to ``SSHCommandResult``.
+    :rtype: SSHCommandResult
+
+    """
+    # Successful CSV output is parsed straight from the raw bytes, the CSV
+    # parser decodes the values itself
+    raw_csv = output_format == 'csv' and return_code == 0
+    if stdout and not raw_csv:
+        # Convert to unicode string
+        stdout = stdout.decode('utf-8')
+        logger.debug('<<< stdout\n%s', stdout)
+    elif stdout and logger.isEnabledFor(logging.DEBUG):
+        logger.debug('<<< stdout\n%s', stdout.decode('utf-8'))
+    if stderr:
+        # Convert to unicode string and remove all color codes characters
+        stderr = COLOR_CODES_REGEX.sub('', stderr.decode('utf-8'))
+        logger.debug('<<< stderr\n%s', stderr)
+
+    if stdout and raw_csv:
+        # Same clean up as below, done on the whole output at once
+        stdout = COLOR_CODES_BYTES_REGEX.sub(
+            b'', RAILS_LINES_BYTES_REGEX.sub(b'', stdout.replace(b'""', b'')))
+    elif stdout and output_format != 'json':
+        # For output we don't really want to see all of Rails traffic
+        # information, so strip it out.
+        # Empty fields are returned as "" which gives us u'""'
+        stdout = stdout.replace('""', '')
+        stdout = u''.join(stdout).split('\n')
+        stdout = [
+            COLOR_CODES_REGEX.sub('', line)
+            for line in stdout if not line.startswith('[')
+        ]
+
+    return SSHCommandResult(
+        stdout, stderr, return_code, output_format)
 
 
 def command(cmd, hostname=None, output_format=None, timeout=None):
     """
     Executes SSH command(s) on remote hostname.
     Defaults to main.server.hostname.
+
+    When a cassette is in use the command output is recorded or replayed, see
+    :mod:`robottelo.cassette`.
     """
 
     # Set a default timeout of 120 seconds
     if timeout is None:
         timeout = 120
 
-    # Variable to hold results returned from the command
-    stdout = stderr = errorcode = None
+    hostname = hostname or settings.server.hostname
+
+    logger.debug('>>> [%s] %s', hostname, cmd)
+
+    with metrics.command('ssh'):
+        metrics.describe(cmd)
+        cassette = get_cassette()
+        if cassette is not None:
+            stdout, stderr, errorcode = cassette.execute(
+                hostname, cmd, lambda: _exec_command(cmd, hostname, timeout))
+        else:
+            stdout, stderr, errorcode = _exec_command(cmd, hostname, timeout)
+
+        with metrics.phase('parse'):
+            return _build_result(stdout, stderr, errorcode, output_format)
+
+
+def _read_channels(channels, timeout):
+    """Read ``stdout`` and ``stderr`` of all ``channels`` until every command
+    has finished.
 
-    # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
+    Both streams of every channel are drained as soon as data arrives, so a
+    command filling one of them never blocks the others.
+
+    :param list channels: ``paramiko.Channel`` objects with a command started.
+    :param int timeout: Seconds to wait for all commands to finish.
+    :return: A list of ``(stdout, stderr, return_code)`` tuples in the same
+        order as ``channels``.
+    :raises socket.timeout: If the commands do not finish in ``timeout``
+        seconds.
+
+    """
+    outputs = dict((channel, ([], [])) for channel in channels)
+    pending = list(channels)
+    deadline = time.time() + timeout
+    while pending:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise socket.timeout(
+                'Commands did not finish in {0} seconds'.format(timeout))
+        select.select(pending, [], [], min(remaining, 1))
+        for channel in pending[:]:
+            stdout, stderr = outputs[channel]
+            while channel.recv_ready():
+                stdout.append(channel.recv(32768))
+            while channel.recv_stderr_ready():
+                stderr.append(channel.recv_stderr(32768))
+            if channel.exit_status_ready() and not (
+                    channel.recv_ready() or channel.recv_stderr_ready()):
+                pending.remove(channel)
+    return [
+        (
+            b''.join(outputs[channel][0]),
+            b''.join(outputs[channel][1]),
+            channel.recv_exit_status(),
+        )
+        for channel in channels
+    ]
+
+
+def command_many(cmds, hostname=None, output_format=None, timeout=None,
+                 max_channels=10):
+    """Executes independent SSH commands in parallel on remote hostname.
+
+    All commands share a single authenticated connection, each one running on
+    its own channel. At most ``max_channels`` commands run at the same time,
+    make sure it does not exceed the server ``MaxSessions`` setting (10 by
+    default on OpenSSH).
+
+    The commands must not depend on each other since their execution order is
+    not guaranteed.
+
+    When a cassette is in use the commands outputs are recorded, with the
+    duration of their batch, or replayed, see :mod:`robottelo.cassette`.
+
+    :param list cmds: The commands to be executed.
+    :param str hostname: The remote host. Defaults to
+        ``main.server.hostname``.
+    :param str output_format: Passed through to each ``SSHCommandResult``.
+    :param int timeout: Seconds to wait for each batch of ``max_channels``
+        commands to finish. Defaults to 120 seconds.
+    :param int max_channels: Maximum number of channels open at once.
+    :return: A list of ``SSHCommandResult``, in the same order as ``cmds``.
+
+    """
+    if timeout is None:
+        timeout = 120
 
     hostname = hostname or settings.server.hostname
 
-    logger.debug('>>> [%s] %s', hostname, cmd)
+    cassette = get_cassette()
+    if cassette is not None and not cassette.recording:
+        results = []
+        for cmd in cmds:
+            logger.debug('>>> [%s] %s', hostname, cmd)
+            results.append(_build_result(
+                *cassette.replay(hostname, cmd), output_format=output_format))
+        return results
+
+    results = []
+    with _get_pooled_connection(hostname=hostname) as connection:
+        transport = connection.get_transport()
+        for start in range(0, len(cmds), max_channels):
+            batch = cmds[start:start + max_channels]
+            channels = []
+            try:
+                started = time.time()
+                for cmd in batch:
+                    logger.debug('>>> [%s] %s', hostname, cmd)
+                    channel = transport.open_session()
+                    channel.settimeout(timeout)
+                    channel.exec_command(cmd)
+                    channels.append(channel)
+                outputs = _read_channels(channels, timeout)
+                for cmd, (stdout, stderr, errorcode) in zip(batch, outputs):
+                    if cassette is not None:
+                        cassette.record(
+                            hostname, cmd, stdout, stderr, errorcode,
+                            time.time() - started
+                        )
+                    results.append(_build_result(
+                        stdout, stderr, errorcode, output_format))
+            finally:
+                for channel in channels:
+                    channel.close()
+    return results
+
+
+class SSHCommandStream(object):
+    """Output lines of a remote command, read as they arrive.
+
+    Iterating over this object runs the command and yields each decoded
+    ``stdout`` line, without the trailing new line and with the color codes
+    removed. Only ``buffer_size`` bytes plus the current line are kept in
+    memory, so it is suitable to process huge outputs, like log files.
+
+    ``stderr`` is read at the same time and only its last ``max_stderr_size``
+    bytes are kept. After the iteration has finished ``return_code`` and
+    ``stderr`` are available::
+
+        stream = ssh.command_stream('cat /var/log/foreman/production.log',
+                                    line_filter='Completed 500')
+        errors = list(stream)
+        if stream.return_code != 0:
+            ...
 
-    with _get_connection(hostname=hostname) as connection:
-        _, stdout, stderr = connection.exec_command(cmd, timeout)
-        errorcode = stdout.channel.recv_exit_status()
-        stdout = stdout.read()
-        stderr = stderr.read()
+    Use :func:`command_stream` to create it.
 
-    if stdout:
-        # Convert to unicode string
-        stdout = stdout.decode('utf-8')
-        logger.debug('<<< stdout\n%s', stdout)
-    if stderr:
-        # Convert to unicode string and remove all color codes characters
-        stderr = regex.sub('', stderr.decode('utf-8'))
-        logger.debug('<<< stderr\n%s', stderr)
+    """
 
-    if stdout and output_format != 'json':
-        # For output we don't really want to see all of Rails traffic
-        # information, so strip it out.
-        # Empty fields are returned as "" which gives us u'""'
-        stdout = stdout.replace('""', '')
-        stdout = u''.join(stdout).split('\n')
-        stdout = [
-            regex.sub('', line) for line in stdout if not line.startswith('[')
-        ]
+    def __init__(self, cmd, hostname=None, timeout=None, buffer_size=32768,
+                 line_filter=None, callback=None, max_stderr_size=65536):
+        self.cmd = cmd
+        self.hostname = hostname or settings.server.hostname
+        self.timeout = 120 if timeout is None else timeout
+        self.buffer_size = buffer_size
+        if line_filter is not None and not callable(line_filter):
+            line_filter = re.compile(line_filter).search
+        self.line_filter = line_filter
+        self.callback = callback
+        self.max_stderr_size = max_stderr_size
+        self.return_code = None
+        self.stderr = None
+        self._stderr = b''
+
+    def _read_stderr(self, channel):
+        """Read available ``stderr`` data keeping only its tail."""
+        while channel.recv_stderr_ready():
+            self._stderr = (
+                self._stderr + channel.recv_stderr(self.buffer_size)
+            )[-self.max_stderr_size:]
+
+    def _lines(self, lines):
+        """Clean up, filter and hand ``lines`` to the callback."""
+        for line in lines:
+            line = COLOR_CODES_REGEX.sub('', line)
+            if self.line_filter is not None and not self.line_filter(line):
+                continue
+            if self.callback is not None:
+                self.callback(line)
+            yield line
+
+    def __iter__(self):
+        logger.debug('>>> [%s] %s', self.hostname, self.cmd)
+        cassette = get_cassette()
+        if cassette is not None and not cassette.recording:
+            raise CassetteError(
+                'Streamed commands are not recorded in cassettes: [{0}] {1}'
+                .format(self.hostname, self.cmd)
+            )
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        partial = u''
+        with _get_pooled_connection(hostname=self.hostname) as connection:
+            channel = connection.get_transport().open_session()
+            try:
+                channel.settimeout(self.timeout)
+                channel.exec_command(self.cmd)
+                while True:
+                    self._read_stderr(channel)
+                    if channel.recv_ready():
+                        lines = (partial + decoder.decode(
+                            channel.recv(self.buffer_size))).split(u'\n')
+                        partial = lines.pop()
+                        for line in self._lines(lines):
+                            yield line
+                    elif channel.exit_status_ready():
+                        break
+                    elif not select.select(
+                            [channel], [], [], self.timeout)[0]:
+                        raise socket.timeout(
+                            'No output received in {0} seconds'
+                            .format(self.timeout)
+                        )
+                partial += decoder.decode(b'', True)
+                if partial:
+                    for line in self._lines([partial]):
+                        yield line
+                self._read_stderr(channel)
+                self.return_code = channel.recv_exit_status()
+            finally:
+                channel.close()
+        self.stderr = COLOR_CODES_REGEX.sub(
+            '', self._stderr.decode('utf-8', 'replace'))
+        if self.stderr:
+            logger.debug('<<< stderr\n%s', self.stderr)
+
+
+def command_stream(cmd, hostname=None, timeout=None, buffer_size=32768,
+                   line_filter=None, callback=None):
+    """Executes SSH command on remote hostname streaming its output.
+
+    The output is not recorded in cassettes and iterating over the stream
+    raises :class:`robottelo.cassette.CassetteError` when replaying one, see
+    :mod:`robottelo.cassette`.
+
+    :param str cmd: The command to be executed.
+    :param str hostname: The remote host. Defaults to
+        ``main.server.hostname``.
+    :param int timeout: Seconds to wait for new output before giving up.
+        Defaults to 120 seconds.
+    :param int buffer_size: Maximum number of bytes read at once.
+    :param line_filter: Either a callable receiving a line and returning
+        whether it should be yielded or a regular expression which should be
+        found in the line.
+    :param callback: A callable called with each line which passes the
+        filter.
+    :return: An iterable ``SSHCommandStream``.
 
-    return SSHCommandResult(
-        stdout, stderr, errorcode, output_format)
+    """
+    return SSHCommandStream(
+        cmd,
+        hostname=hostname,
+        timeout=timeout,
+        buffer_size=buffer_size,
+        line_filter=line_filter,
+        callback=callback,
+    )
+
+
+class SSHAsyncResult(object):
+    """Result of commands running in background.
+
+    Returned by :func:`command_many_async`, call :meth:`result` to get the
+    commands results.
+
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self._done = threading.Event()
+        self._error = None
+        self._result = None
+        thread = threading.Thread(
+            target=self._run, args=(func, args, kwargs))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, func, args, kwargs):
+        """Call ``func`` and store its result or the raised exception."""
+        try:
+            self._result = func(*args, **kwargs)
+        except Exception as err:  # pylint:disable=broad-except
+            self._error = err
+        finally:
+            self._done.set()
+
+    def done(self):
+        """Return ``True`` if the commands have finished."""
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Wait for the commands and return their results.
+
+        :param int timeout: Seconds to wait, wait forever if ``None``.
+        :return: The list of ``SSHCommandResult``.
+        :raises socket.timeout: If the commands did not finish in time.
+        :raises: Any exception raised while running the commands.
+
+        """
+        if not self._done.wait(timeout):
+            raise socket.timeout(
+                'Commands did not finish in {0} seconds'.format(timeout))
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def command_many_async(cmds, hostname=None, output_format=None,
+                       timeout=None, max_channels=10):
+    """Same as :func:`command_many` but runs in background.
+
+    :return: An ``SSHAsyncResult`` whose ``result`` method returns the list of
+        ``SSHCommandResult``.
+
+    """
+    return SSHAsyncResult(
+        command_many,
+        cmds,
+        hostname=hostname,
+        output_format=output_format,
+        timeout=timeout,
+        max_channels=max_channels,
+    )
@@ -31,7 +31,15 @@ from robottelo.performance.graph import(
     generate_line_chart_raw_candlepin,
     generate_line_chart_stat_bucketized_candlepin,
 )
-from robottelo.performance.stat import generate_stat_for_concurrent_thread
+from robottelo.performance.histogram import Recorder
+from robottelo.performance.load import LoadGenerator
+from robottelo.performance.stat import (
+    generate_stat_for_histogram,
+    generate_stat_per_client,
+    generate_stat_per_client_bucketized,
+    generate_stat_per_test,
+    generate_stat_per_test_bucketized,
+)
 from robottelo.performance.thread import (
     DeleteThread,
     SyncThread,
@@ -271,6 +279,11 @@ class ConcurrentTestCase(TestCase):
     2. concurrent subscription by register and attach,
     3. concurrent subscription deletion.
 
+    The timings of these tests are recorded in histograms, see
+    :class:`robottelo.performance.histogram.Recorder`, and also kept in
+    lists, for the raw csv files and the bucketized statistics, unless
+    ``[performance] raw_timings`` is disabled.
+
     """
 
     @classmethod
@@ -281,6 +294,8 @@ class ConcurrentTestCase(TestCase):
         # general running parameters
         cls.num_threads = NUM_THREADS
         cls.num_buckets = settings.performance.csv_buckets_count
+        cls.raw_timings = settings.performance.raw_timings
+        cls.histogram_window = settings.performance.histogram_window
         cls.vm_list = settings.performance.virtual_machines
         cls.org_id = cls._get_organization_id()  # get organization-id
         cls.sub_id = ''
@@ -396,11 +411,11 @@ class ConcurrentTestCase(TestCase):
            1000 iterations concurrently;
 
         """
-        self.num_iterations = total_iterations / current_num_threads
+        self.num_iterations = total_iterations // current_num_threads
 
     def _set_bucket_size(self):
         """Set size for each bucket"""
-        bucket = self.num_iterations / self.num_buckets
+        bucket = self.num_iterations // self.num_buckets
 
         # check if num_iterations for each client is smaller than 10
         if bucket > 0:
@@ -408,6 +423,58 @@ class ConcurrentTestCase(TestCase):
         else:
             self.bucket_size = 1
 
+    def _new_time_result_dict(self, current_num_threads):
+        """Return the dictionary of the timing lists of every thread,
+        ``None`` when the raw timings are not kept.
+        """
+        if not self.raw_timings:
+            return None
+        return dict(
+            ('thread-{0}'.format(i), []) for i in range(current_num_threads))
+
+    def _new_recorder(self):
+        """Return the histogram recorder of a test case step, split in
+        ``[performance] histogram_window`` windows.
+        """
+        return Recorder(window=self.histogram_window or None)
+
+    def _write_results(
+            self,
+            raw_file_name,
+            stat_file_name,
+            time_result_dict,
+            recorder,
+            current_num_threads,
+            step):
+        """Write the raw and stat csv files and charts of a test case step.
+
+        The raw csv files and the statistics computed from the timing lists
+        are only written when the timings were kept, the statistics of the
+        histograms always are.
+
+        :param str step: Short name of the step, ``ak`` for example, used in
+            the csv section names.
+
+        """
+        if time_result_dict is not None:
+            self._write_raw_csv_file(
+                raw_file_name,
+                time_result_dict,
+                current_num_threads,
+                'raw-{0}-{1}-clients'.format(step, current_num_threads)
+            )
+            self._write_stat_csv_chart(
+                stat_file_name,
+                time_result_dict,
+                current_num_threads,
+                'stat-{0}-{1}-clients'.format(step, current_num_threads)
+            )
+        generate_stat_for_histogram(
+            'histogram-{0}-{1}-clients'.format(step, current_num_threads),
+            recorder,
+            stat_file_name,
+        )
+
     def _join_all_threads(self, thread_list):
         """Wait for all threads to complete"""
         for thread in thread_list:
@@ -543,6 +610,16 @@ class ConcurrentTestCase(TestCase):
             )
             writer.writerow([])
 
+    @staticmethod
+    def _time_lists(time_result_dict, current_num_threads=None):
+        """Return the timing lists of ``thread-0`` to ``thread-<n-1>``."""
+        if current_num_threads is None:
+            current_num_threads = len(time_result_dict)
+        return [
+            time_result_dict.get('thread-{0}'.format(i))
+            for i in range(current_num_threads)
+        ]
+
     def _write_stat_per_client_bucketized(
             self,
             stat_file_name,
@@ -560,18 +637,14 @@ class ConcurrentTestCase(TestCase):
         """
         test_category = self._get_output_filename(stat_file_name)
 
-        for i in range(current_num_threads):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
-            thread_name = 'client-{0}'.format(i)
-            stat_dict = generate_stat_for_concurrent_thread(
-                thread_name,
-                time_list,
-                stat_file_name,
-                self.bucket_size,
-                self.num_buckets
-            )
+        stat_dicts = generate_stat_per_client_bucketized(
+            self._time_lists(time_result_dict, current_num_threads),
+            stat_file_name,
+            self.bucket_size,
+        )
 
-            # create line chart with each client being grouped by buckets
+        # create line chart with each client being grouped by buckets
+        for i, stat_dict in enumerate(stat_dicts):
             generate_line_chart_stat_bucketized_candlepin(
                 stat_dict,
                 'Concurrent Subscription Statistics - per client bucketized: '
@@ -605,32 +678,15 @@ class ConcurrentTestCase(TestCase):
             line chart of statistics on these chunks.
 
         """
-        # parameters for generating bucketized line chart
-        stat_dict = {}
-        return_stat = {}
         current_num_threads = len(time_result_dict)
         test_category = self._get_output_filename(stat_file_name)
 
-        for i in range(self.num_buckets):
-            chunks_bucket_i = []
-            for j in range(len(time_result_dict)):
-                time_list = time_result_dict.get('thread-{0}'.format(j))
-                # slice out bucket-size from each client's result and merge
-                chunks_bucket_i += time_list[
-                    i * self.bucket_size: (i + 1) * self.bucket_size
-                ]
-
-            # for each chunk i, compute and output its stat
-            return_stat = generate_stat_for_concurrent_thread(
-                'bucket-{0}'.format(i),
-                chunks_bucket_i,
-                stat_file_name,
-                len(chunks_bucket_i),
-                1
-            )
-
-            # for each chunk i, add stat into final return_dict
-            stat_dict.update({i: return_stat.get(0, (0, 0, 0, 0))})
+        stat_dict = generate_stat_per_test_bucketized(
+            self._time_lists(time_result_dict),
+            stat_file_name,
+            self.bucket_size,
+            self.num_buckets,
+        )
 
         # create line chart with all clients grouped by a chunk of buckets
         generate_line_chart_stat_bucketized_candlepin(
@@ -654,27 +710,11 @@ class ConcurrentTestCase(TestCase):
         note: take the full list of a client i; calculate stat on the list
 
         """
-        # parameters for generating bucketized line chart
-        stat_dict = {}
-        return_stat = {}
         current_num_threads = len(time_result_dict)
         test_category = self._get_output_filename(stat_file_name)
 
-        for i in range(current_num_threads):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
-            thread_name = 'client-{0}'.format(i)
-
-            # for each client i, compute and output its stat
-            return_stat = generate_stat_for_concurrent_thread(
-                thread_name,
-                time_list,
-                stat_file_name,
-                len(time_list),
-                1
-            )
-
-            # for each chunk i, add stat into final return_dict
-            stat_dict.update({i: return_stat.get(0, (0, 0, 0, 0))})
+        stat_dict = generate_stat_per_client(
+            self._time_lists(time_result_dict), stat_file_name)
 
         # create graph based on stats of all clients
         generate_bar_chart_stat(
@@ -693,21 +733,11 @@ class ConcurrentTestCase(TestCase):
         note: take the full dictionary of test and calculate overall stat
 
         """
-        full_list = []  # list containing 1st to 5kth data point
         current_num_threads = len(time_result_dict)
         test_category = self._get_output_filename(stat_file_name)
 
-        for i in range(len(time_result_dict)):
-            time_list = time_result_dict.get('thread-{0}'.format(i))
-            full_list += time_list
-
-        stat_dict = generate_stat_for_concurrent_thread(
-            'test-{0}'.format(len(time_result_dict)),
-            full_list,
-            stat_file_name,
-            len(full_list),
-            1
-        )
+        stat_dict = generate_stat_per_test(
+            self._time_lists(time_result_dict), stat_file_name)
 
         generate_bar_chart_stat(
             stat_dict,
@@ -737,20 +767,20 @@ class ConcurrentTestCase(TestCase):
         # Create a list to store all threads
         thread_list = []
         # Create a dictionary to store all timing results from each client
-        time_result_dict_ak = {}
+        time_result_dict_ak = self._new_time_result_dict(current_num_threads)
+        recorder_ak = self._new_recorder()
 
         # Create new threads and start each thread mapped with a vm
         for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_ak[thread_name] = []
             thread = SubscribeAKThread(
                 i,
-                thread_name,
+                'thread-{0}'.format(i),
                 time_result_dict_ak,
                 self.num_iterations,
                 self.ak_name,
                 self.default_org,
-                current_vm_list[i]
+                current_vm_list[i],
+                recorder_ak,
             )
             thread.start()
             thread_list.append(thread)
@@ -758,20 +788,14 @@ class ConcurrentTestCase(TestCase):
         # wait all threads in thread list
         self._join_all_threads(thread_list)
 
-        # write raw result of activation-key
-        self._write_raw_csv_file(
+        # write raw and stat results of activation-key and generate charts
+        self._write_results(
             self.raw_file_name,
-            time_result_dict_ak,
-            current_num_threads,
-            'raw-ak-{0}-clients'.format(current_num_threads)
-        )
-
-        # write stat result of ak and generate charts
-        self._write_stat_csv_chart(
             self.stat_file_name,
             time_result_dict_ak,
+            recorder_ak,
             current_num_threads,
-            'stat-ak-{0}-clients'.format(current_num_threads)
+            'ak'
         )
 
     def kick_off_att_test(self, current_num_threads, total_iterations):
@@ -792,19 +816,19 @@ class ConcurrentTestCase(TestCase):
         # Create a list to store all threads
         thread_list = []
         # Create a dictionary to store register timings from each client
-        time_result_dict_register = {}
+        time_result_dict_register = self._new_time_result_dict(
+            current_num_threads)
+        recorder_register = self._new_recorder()
         # Create a dictionary to store attach timings from each client
-        time_result_dict_attach = {}
+        time_result_dict_attach = self._new_time_result_dict(
+            current_num_threads)
+        recorder_attach = self._new_recorder()
 
         # Create new threads and start each thread mapped with a vm
         for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_register[thread_name] = []
-            time_result_dict_attach[thread_name] = []
-
             thread = SubscribeAttachThread(
                 i,
-                thread_name,
+                'thread-{0}'.format(i),
                 {},
                 time_result_dict_register,
                 time_result_dict_attach,
@@ -812,7 +836,9 @@ class ConcurrentTestCase(TestCase):
                 self.sub_id,
                 self.default_org,
                 self.environment,
-                current_vm_list[i]
+                current_vm_list[i],
+                recorder_register,
+                recorder_attach,
             )
             thread.start()
             thread_list.append(thread)
@@ -820,36 +846,24 @@ class ConcurrentTestCase(TestCase):
         # wait all threads in thread list
         self._join_all_threads(thread_list)
 
-        # write raw result of register
-        self._write_raw_csv_file(
+        # write raw and stat results of register and generate charts
+        self._write_results(
             self.reg_raw_file_name,
-            time_result_dict_register,
-            current_num_threads,
-            'raw-reg-{0}-clients'.format(current_num_threads)
-        )
-
-        # write raw result of attach
-        self._write_raw_csv_file(
-            self.raw_file_name,
-            time_result_dict_attach,
-            current_num_threads,
-            'raw-att-{0}-clients'.format(current_num_threads)
-        )
-
-        # write stat result of register and generate charts
-        self._write_stat_csv_chart(
             self.reg_stat_file_name,
             time_result_dict_register,
+            recorder_register,
             current_num_threads,
-            'stat-reg-{0}-clients'.format(current_num_threads)
+            'reg'
         )
 
-        # write stat result of attach and generate charts
-        self._write_stat_csv_chart(
+        # write raw and stat results of attach and generate charts
+        self._write_results(
+            self.raw_file_name,
             self.stat_file_name,
             time_result_dict_attach,
+            recorder_attach,
             current_num_threads,
-            'stat-att-{0}-clients'.format(current_num_threads)
+            'att'
         )
 
     def kick_off_del_test(self, current_num_threads):
@@ -872,18 +886,19 @@ class ConcurrentTestCase(TestCase):
         # Create a list to store all threads
         thread_list = []
         # Create a dictionary to store all timing results from each thread
-        time_result_dict_del = {}
+        time_result_dict_del = self._new_time_result_dict(current_num_threads)
+        recorder_del = self._new_recorder()
 
         # Create new threads and start the thread which has sublist of uuids
         for i in range(current_num_threads):
-            time_result_dict_del['thread-{0}'.format(i)] = []
             thread = DeleteThread(
                 i,
                 'thread-{0}'.format(i),
                 uuid_list[
                     self.num_iterations * i: self.num_iterations * (i + 1)
                 ],
-                time_result_dict_del
+                time_result_dict_del,
+                recorder_del,
             )
             thread.start()
             thread_list.append(thread)
@@ -891,20 +906,14 @@ class ConcurrentTestCase(TestCase):
         # wait all threads in thread list
         self._join_all_threads(thread_list)
 
-        # write raw result of del
-        self._write_raw_csv_file(
+        # write raw and stat results of del
+        self._write_results(
             self.raw_file_name,
-            time_result_dict_del,
-            current_num_threads,
-            'raw-del-{0}-clients'.format(current_num_threads)
-        )
-
-        # write stat result of del
-        self._write_stat_csv_chart(
             self.stat_file_name,
             time_result_dict_del,
+            recorder_del,
             current_num_threads,
-            'stat-del-{0}-clients'.format(current_num_threads)
+            'del'
         )
 
     def kick_off_concurrent_sync_test(
@@ -989,3 +998,51 @@ class ConcurrentTestCase(TestCase):
                 )
 
         return time_result_dict
+
+    def kick_off_open_loop_test(
+            self,
+            operation,
+            arrivals,
+            current_num_threads,
+            test_name,
+            metric='latency'):
+        """Run ``operation`` at the times of an open-loop arrival schedule
+        and write the raw and stat results like the closed-loop tests.
+
+        See :mod:`robottelo.performance.load` for the operation and schedule
+        arguments, each of the ``current_num_threads`` workers is a client
+        of the stat files and charts.
+
+        :param str test_name: Short name of the test, ``ak`` for example,
+            used in the csv section names.
+        :param str metric: Timing written, ``latency`` corrected for
+            coordinated omission by default.
+        :return: The :class:`robottelo.performance.load.LoadResult`.
+
+        """
+        result = LoadGenerator(
+            operation,
+            arrivals,
+            workers=current_num_threads,
+            name='{0}-{1}-clients'.format(test_name, current_num_threads),
+        ).run()
+        self.logger.info('Open-loop summary: {0}'.format(result.summary()))
+        time_result_dict = result.time_result_dict(metric)
+
+        # Parameter for statistics files
+        self._set_num_iterations(len(result.samples), current_num_threads)
+        self._set_bucket_size()
+
+        self._write_raw_csv_file(
+            self.raw_file_name,
+            time_result_dict,
+            current_num_threads,
+            'raw-{0}-{1}-clients'.format(test_name, current_num_threads)
+        )
+        self._write_stat_csv_chart(
+            self.stat_file_name,
+            time_result_dict,
+            current_num_threads,
+            'stat-{0}-{1}-clients'.format(test_name, current_num_threads)
+        )
+        return result
@@ -161,13 +161,12 @@ class VirtualMachine(object):
             u'virsh destroy {0}'.format(self.hostname),
             hostname=self.provisioning_server
         )
-        ssh.command(
-            u'virsh undefine {0}'.format(self.hostname),
-            hostname=self.provisioning_server
-        )
         image_name = u'{0}.img'.format(self.hostname)
-        ssh.command(
-            u'rm {0}'.format(os.path.join(self.image_dir, image_name)),
+        ssh.command_many(
+            [
+                u'virsh undefine {0}'.format(self.hostname),
+                u'rm {0}'.format(os.path.join(self.image_dir, image_name)),
+            ],
             hostname=self.provisioning_server
         )
 
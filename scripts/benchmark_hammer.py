@@ -0,0 +1,102 @@
+#!/usr/bin/env python2
+"""Time the hammer output parsers.
+
+For each output recorded in ``tests/robottelo/data/hammer`` the legacy info
+parser and the current one are run, and the best time of a parse is printed. Then list outputs of increasing sizes are parsed from the
+raw command output, as CSV and as JSON, see ``[cli] output_format``. Run from
+the repository root with ``PYTHONPATH=. scripts/benchmark_hammer.py``.
+
+"""
+from __future__ import print_function
+import json
+import timeit
+
+from robottelo import ssh
+from robottelo.cli import hammer
+from tests.robottelo.test_hammer import (
+    is_flat_info,
+    legacy_parse_info,
+    recorded_info_outputs,
+)
+
+NUMBER = 1000
+REPEAT = 5
+
+
+def best_time(func, output):
+    """Return the best time, in microseconds, of ``func(output)``."""
+    return min(timeit.repeat(
+        lambda: func(output), number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def list_outputs(rows):
+    """Return a raw list output of ``rows`` rows, as CSV and as JSON."""
+    entities = [
+        {
+            u'ID': index,
+            u'Name': u'repo_{0}'.format(index),
+            u'Product': u'product "{0}"'.format(index % 10),
+            u'Content Type': u'yum',
+            u'URL': None,
+        }
+        for index in range(rows)
+    ]
+    fields = (u'ID', u'Name', u'Product', u'Content Type', u'URL')
+    csv_output = u'\n'.join(
+        [u','.join(fields)] + [
+            u'{0},{1},"{2}",{3},""'.format(
+                entity[u'ID'],
+                entity[u'Name'],
+                entity[u'Product'].replace(u'"', u'""'),
+                entity[u'Content Type'],
+            )
+            for entity in entities
+        ]
+    )
+    return csv_output.encode('utf-8'), json.dumps(entities).encode('utf-8')
+
+
+def parse_list_output(output, output_format):
+    """Parse a raw list output the way ``Base.list`` does."""
+    result = ssh._build_result(  # pylint:disable=protected-access
+        output, b'', 0, output_format).stdout
+    if output_format == 'json':
+        result = hammer.parse_json(result)
+    return result
+
+
+def main():
+    """Print the time taken by each parser for each recorded output and
+    list output size.
+    """
+    print('{0:<25}{1:>8}{2:>12}{3:>12}{4:>9}'.format(
+        'output', 'lines', 'legacy us', 'current us', 'speedup'))
+    for name, output in sorted(recorded_info_outputs().items()):
+        if (is_flat_info(output) and
+                hammer.parse_info(output) != legacy_parse_info(output)):
+            raise AssertionError('{0} is not parsed as before'.format(name))
+        legacy = best_time(legacy_parse_info, output)
+        current = best_time(hammer.parse_info, output)
+        print('{0:<25}{1:>8}{2:>12.1f}{3:>12.1f}{4:>8.2f}x'.format(
+            name, len(output), legacy, current, legacy / current))
+    print()
+    print('{0:<25}{1:>12}{2:>12}{3:>12}'.format(
+        'list output rows', 'csv ms', 'json ms', 'speedup'))
+    for rows in (10, 1000, 10000):
+        csv_output, json_output = list_outputs(rows)
+        number = max(1, 10000 // rows)
+        csv_time, json_time = [
+            min(timeit.repeat(
+                lambda: parse_list_output(output, output_format),
+                number=number,
+                repeat=REPEAT,
+            )) / number * 1e3
+            for output, output_format in (
+                (csv_output, 'csv'), (json_output, 'json'))
+        ]
+        print('{0:<25}{1:>12.2f}{2:>12.2f}{3:>11.2f}x'.format(
+            rows, csv_time, json_time, csv_time / json_time))
+
+
+if __name__ == '__main__':
+    main()
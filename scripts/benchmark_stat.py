@@ -0,0 +1,62 @@
+#!/usr/bin/env python2
+"""Time the statistics of the performance tests csv files.
+
+Synthetic timings of 1 million samples, split between 10 clients, go
+through the four stat blocks ``ConcurrentTestCase`` writes: per client
+bucketized, per test bucketized, per client and per test. The legacy
+per-bucket computations and the vectorized ones of
+:mod:`robottelo.performance.stat` are run, and the best time of each is
+printed. Charts are not generated. Run from the repository root with
+``PYTHONPATH=. scripts/benchmark_stat.py``.
+
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import time
+
+import numpy
+
+from tests.robottelo.test_stat import legacy_write_stats, write_stats
+
+CLIENTS = 10
+SAMPLES = 1000000
+NUM_BUCKETS = 10
+REPEAT = 3
+
+
+def best_time(func, time_lists, directory):
+    """Return the best time, in seconds, of writing the stat blocks."""
+    times = []
+    for index in range(REPEAT):
+        stat_file_name = os.path.join(
+            directory, '{0}-{1}.csv'.format(func.__name__, index))
+        start = time.time()
+        func(stat_file_name, time_lists, SAMPLES // CLIENTS // NUM_BUCKETS,
+             NUM_BUCKETS)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    """Print the legacy and vectorized times."""
+    generator = numpy.random.RandomState(1)
+    time_lists = generator.lognormal(
+        0, 0.5, (CLIENTS, SAMPLES // CLIENTS)).tolist()
+    directory = tempfile.mkdtemp()
+    try:
+        legacy = best_time(legacy_write_stats, time_lists, directory)
+        vectorized = best_time(write_stats, time_lists, directory)
+    finally:
+        shutil.rmtree(directory)
+    print('{0} samples, {1} clients, {2} buckets'.format(
+        SAMPLES, CLIENTS, NUM_BUCKETS))
+    print('{0:>12} {1:>10}'.format('', 'seconds'))
+    print('{0:>12} {1:10.3f}'.format('legacy', legacy))
+    print('{0:>12} {1:10.3f}'.format('vectorized', vectorized))
+    print('{0:>12} {1:10.1f}x'.format('speed-up', legacy / vectorized))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python2
+"""Index the Bugzilla and Redmine bugs referenced by the Foreman tests.
+
+The index is updated incrementally and written to ``[cache] bug_index``, or
+to the path given with ``--index``. The references found are printed, one per
+line. With ``--fetch`` the status of every referenced bug is fetched and
+stored in the bug cache, so the tests can then be run with ``[cache]
+bugs_offline`` enabled.
+
+"""
+from __future__ import print_function
+import argparse
+import logging
+import os
+
+from robottelo.bug_index import BugIndex
+from robottelo.config import settings
+from robottelo.decorators import prefetch_bugs
+
+TESTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'foreman',
+)
+
+
+def main():
+    """Update the bug index and print the references found."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        'path', nargs='?', default=TESTS_PATH,
+        help='directory of the test modules, defaults to tests/foreman')
+    parser.add_argument('--index', help='path of the index file')
+    parser.add_argument(
+        '--fetch', action='store_true',
+        help='fetch the status of the referenced bugs')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    settings.configure()
+
+    index = BugIndex(args.index or settings.cache.bug_index)
+    parsed = index.update(args.path)
+    index.save()
+    for ref in index.references():
+        print('{0}:{1}: {2} {3} {4}'.format(
+            os.path.relpath(ref.path), ref.line, ref.tracker, ref.bug_id,
+            ref.scope
+        ))
+    print('{0} references to {1} Bugzilla and {2} Redmine bugs, {3} of {4} '
+          'modules parsed'.format(
+              len(index.references()),
+              len(index.bug_ids('bugzilla')),
+              len(index.bug_ids('redmine')),
+              parsed,
+              len(index.files),
+          ))
+    if args.fetch:
+        prefetch_bugs(index.bug_ids('bugzilla'), index.bug_ids('redmine'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Configuration of the pytest runs of the Foreman tests."""
+import logging
+import os
+
+from robottelo.bug_index import BugIndex
+from robottelo.config import settings
+from robottelo.config.settings import ImproperlyConfigured
+from robottelo.decorators import prefetch_bugs
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _indexed_bugs(session):
+    """Return the Bugzilla and Redmine bugs referenced by the collected
+    modules, updating the bug index.
+
+    No bugs are returned when ``[cache] bug_index`` is not set.
+
+    """
+    if not settings.cache.bug_index:
+        return set(), set()
+    index = BugIndex(settings.cache.bug_index)
+    index.update(os.path.dirname(__file__))
+    index.save()
+    paths = set(str(item.fspath) for item in session.items)
+    return index.bug_ids('bugzilla', paths), index.bug_ids('redmine', paths)
+
+
+def pytest_collection_finish(session):
+    """Fetch in batches the bugs the collected tests may be skipped for.
+
+    Besides the ``skip_if_bug_open`` decorators, the bugs checked in the test
+    bodies are found with the bug index, see :mod:`robottelo.bug_index`.
+
+    Nothing is fetched when robottelo is not configured, the tests will
+    report the configuration issue.
+
+    """
+    if not settings.configured:
+        try:
+            settings.configure()
+        except ImproperlyConfigured:
+            return
+    prefetch_bugs()
+    try:
+        bugzilla_ids, redmine_ids = _indexed_bugs(session)
+    except (IOError, OSError) as err:
+        LOGGER.warning('Could not update the bug index: %s', err)
+        return
+    # The bugs already fetched for the decorated tests are not fetched again
+    prefetch_bugs(bugzilla_ids, redmine_ids)
@@ -0,0 +1,119 @@
+"""Tests for module ``robottelo.bug_index``."""
+import os
+import shutil
+import tempfile
+
+import six
+
+from robottelo.bug_index import BugIndex, BugReference, find_references
+from tests.foreman import conftest
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+MODULE = '''
+from robottelo import decorators
+from robottelo.datafactory import generate_strings_list
+from robottelo.decorators import bz_bug_is_open, skip_if_bug_open
+
+
+@skip_if_bug_open('bugzilla', 1)
+def test_one():
+    if bz_bug_is_open(2):
+        return
+    generate_strings_list(bug_id=3)
+
+
+class FooTestCase(object):
+    @decorators.skip_if_bug_open('redmine', '4')
+    def test_two(self, bug_id):
+        bz_bug_is_open(bug_id)
+        decorators.rm_bug_is_open(5)
+'''
+
+
+class FindReferencesTestCase(TestCase):
+    """Tests for :func:`robottelo.bug_index.find_references`."""
+    def test_find_references(self):
+        """Literal bug IDs are found with their line and scope"""
+        self.assertEqual(find_references(MODULE), [
+            ('bugzilla', 1, 7, 'test_one'),
+            ('bugzilla', 2, 9, 'test_one'),
+            ('bugzilla', 3, 11, 'test_one'),
+            ('redmine', 4, 15, 'FooTestCase.test_two'),
+            ('redmine', 5, 18, 'FooTestCase.test_two'),
+        ])
+
+
+class BugIndexTestCase(TestCase):
+    """Tests for :class:`robottelo.bug_index.BugIndex`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.root = os.path.join(self.tmpdir, 'tests')
+        os.makedirs(os.path.join(self.root, 'cli'))
+        self.module = os.path.join(self.root, 'cli', 'test_foo.py')
+        with open(self.module, 'w') as module:
+            module.write(MODULE)
+        self.index_path = os.path.join(self.tmpdir, 'index.json')
+
+    def test_update(self):
+        """The references of the modules under the root are indexed"""
+        index = BugIndex(self.index_path)
+        self.assertEqual(index.update(self.root), 1)
+        self.assertEqual(index.bug_ids('bugzilla'), set([1, 2, 3]))
+        self.assertEqual(index.bug_ids('redmine'), set([4, 5]))
+        self.assertEqual(
+            index.references('redmine')[0],
+            BugReference('redmine', 4, self.module, 15, 'FooTestCase.test_two')
+        )
+        self.assertEqual(
+            index.bug_ids('bugzilla', [os.path.join(self.root, 'other.py')]),
+            set()
+        )
+
+    def test_incremental(self):
+        """Only the modules which changed are parsed again"""
+        index = BugIndex(self.index_path)
+        index.update(self.root)
+        index.save()
+        index = BugIndex(self.index_path)
+        with mock.patch('robottelo.bug_index.find_references') as find:
+            self.assertEqual(index.update(self.root), 0)
+            # Touched but not modified
+            os.utime(self.module, (0, 0))
+            self.assertEqual(index.update(self.root), 0)
+            self.assertFalse(find.called)
+        self.assertEqual(index.bug_ids('redmine'), set([4, 5]))
+        with open(self.module, 'a') as module:
+            module.write('bz_bug_is_open(6)\n')
+        self.assertEqual(index.update(self.root), 1)
+        self.assertIn(6, index.bug_ids('bugzilla'))
+        os.remove(self.module)
+        index.update(self.root)
+        self.assertEqual(index.references(), [])
+
+    def test_save_without_path(self):
+        """Indexes without a path are kept in memory only"""
+        index = BugIndex()
+        index.update(self.root)
+        index.save()
+        self.assertEqual(index.bug_ids('redmine'), set([4, 5]))
+        self.assertEqual(os.listdir(self.tmpdir), ['tests'])
+
+
+class IndexedBugsTestCase(TestCase):
+    """Tests for the bug index of the Foreman tests runs."""
+    @mock.patch('tests.foreman.conftest.BugIndex')
+    @mock.patch('tests.foreman.conftest.settings')
+    def test_unconfigured_index(self, settings, bug_index):
+        """No bugs are indexed when the index is not configured"""
+        settings.cache.bug_index = None
+        self.assertEqual(
+            conftest._indexed_bugs(mock.Mock()),  # pylint:disable=W0212
+            (set(), set())
+        )
+        self.assertFalse(bug_index.called)
@@ -0,0 +1,177 @@
+"""Tests for module ``robottelo.cache``."""
+import os
+import shutil
+import six
+import tempfile
+import unittest2
+
+from robottelo import cache
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class MakeKeyTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cache.make_key`."""
+    def test_without_options(self):
+        """The name is the key of objects created without options"""
+        self.assertEqual(cache.make_key('org'), 'org')
+        self.assertEqual(cache.make_key('org', {}), 'org')
+
+    def test_with_options(self):
+        """Keys do not depend on the options order"""
+        key = cache.make_key('product', {'organization-id': 1, 'name': 'a'})
+        self.assertTrue(key.startswith('product:'))
+        self.assertEqual(
+            key,
+            cache.make_key('product', {'name': 'a', 'organization-id': 1})
+        )
+        self.assertNotEqual(
+            key, cache.make_key('product', {'organization-id': 1}))
+
+    def test_canonical_options(self):
+        """Options hammer receives the same way give the same key"""
+        self.assertEqual(
+            cache.make_key('product', {'organization-id': 1, 'ids': [1, 2]}),
+            cache.make_key(
+                'product', {u'organization-id': u'1', 'ids': '1,2'}),
+        )
+        self.assertNotEqual(
+            cache.make_key('product', {'enabled': True}),
+            cache.make_key('product', {'enabled': u'True'}),
+        )
+        self.assertNotEqual(
+            cache.make_key('product', {'label': None}),
+            cache.make_key('product', {'label': u'None'}),
+        )
+
+
+class MemoryCacheTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cache.MemoryCache`."""
+    @mock.patch('robottelo.cache.time')
+    def test_ttl(self, time):
+        """Objects expire after the TTL"""
+        store = {}
+        backend = cache.MemoryCache(store, ttl=10)
+        time.time.return_value = 100
+        backend.set('org', {'id': 1})
+        self.assertEqual(store, {'org': {'id': 1}})
+        time.time.return_value = 105
+        self.assertEqual(backend.get('org'), {'id': 1})
+        time.time.return_value = 111
+        self.assertIsNone(backend.get('org'))
+        self.assertEqual(store, {})
+
+    def test_lru(self):
+        """The least recently used objects are evicted"""
+        store = {}
+        backend = cache.MemoryCache(store, max_size=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        self.assertEqual(store, {'a': 1, 'c': 3})
+
+
+class SQLiteCacheTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cache.SQLiteCache`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+        self.backend = cache.SQLiteCache(self.path, ttl=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shared(self):
+        """Objects are seen by other instances using the same file"""
+        self.backend.set('org', {'id': 1})
+        other = cache.SQLiteCache(self.path)
+        self.assertEqual(other.get('org'), {'id': 1})
+        other.delete('org')
+        self.assertIsNone(self.backend.get('org'))
+
+    @mock.patch('robottelo.cache.time')
+    def test_ttl(self, time):
+        """Objects expire after the TTL"""
+        time.time.return_value = 100
+        self.backend.set('org', {'id': 1})
+        time.time.return_value = 111
+        self.assertIsNone(self.backend.get('org'))
+        self.assertEqual(self.backend.keys(), [])
+
+    @mock.patch('robottelo.cache.time')
+    def test_lru(self, time):
+        """The least recently used objects are evicted"""
+        self.backend.max_size = 2
+        for now, key in enumerate(('a', 'b')):
+            time.time.return_value = now
+            self.backend.set(key, now)
+        time.time.return_value = 2
+        self.backend.get('a')
+        time.time.return_value = 3
+        self.backend.set('c', 3)
+        self.assertEqual(sorted(self.backend.keys()), ['a', 'c'])
+
+    def test_lock(self):
+        """Locking a key allows to use the cache"""
+        with self.backend.lock('org'):
+            self.backend.set('org', {'id': 1})
+        self.assertEqual(self.backend.keys(), ['org'])
+
+
+class GetOrCreateTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cache.get_or_create` and
+    :func:`robottelo.cache.invalidate`.
+    """
+    def setUp(self):
+        self.store = {}
+        cache.set_backend(cache.MemoryCache(self.store))
+        self.addCleanup(cache.set_backend, None)
+        patcher = mock.patch('robottelo.cache.settings')
+        self.settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.settings.cache.validate_objects = True
+        patcher = mock.patch.dict('robottelo.cache._validators', clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_once(self):
+        """Objects are created once"""
+        create = mock.Mock(return_value={'id': 1})
+        for _ in range(2):
+            self.assertEqual(
+                cache.get_or_create('org', None, create), {'id': 1})
+        create.assert_called_once_with()
+
+    def test_stats(self):
+        """Hits and misses are counted"""
+        with mock.patch('robottelo.cache.STATS', cache.CacheStats()):
+            for _ in range(3):
+                cache.get_or_create('org', None, dict)
+            stats = cache.STATS.as_dict()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3.0)
+
+    def test_invalid_object(self):
+        """Objects which are not valid anymore are recreated"""
+        cache.register_validator('org', lambda obj: obj['id'] != 1)
+        self.store['org'] = {'id': 1}
+        self.assertEqual(
+            cache.get_or_create('org', None, lambda: {'id': 2}), {'id': 2})
+        self.assertEqual(self.store, {'org': {'id': 2}})
+
+    def test_invalidate(self):
+        """Objects are removed by name and options"""
+        for options in (None, {'id': 1}, {'id': 2}):
+            cache.get_or_create('org', options, dict)
+        cache.get_or_create('product', None, dict)
+        cache.invalidate('make_org', {'id': 1})
+        self.assertEqual(len(self.store), 3)
+        cache.invalidate('org')
+        self.assertEqual(list(self.store), ['product'])
+        cache.invalidate()
+        self.assertEqual(self.store, {})
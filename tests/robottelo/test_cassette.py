@@ -0,0 +1,177 @@
+"""Tests for module ``robottelo.cassette``."""
+import json
+import os
+import shutil
+import tempfile
+
+import six
+
+from robottelo import ssh
+from robottelo.cassette import (
+    Cassette,
+    CassetteError,
+    command_pattern,
+    get_cassette,
+    use_cassette,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+CMD = (u'LANG=en_US.UTF-8 hammer -v -u admin -p changeme --output=csv '
+       u'organization info --name="org_{0}"')
+
+
+class CommandPatternTestCase(TestCase):
+    """Tests for :func:`robottelo.cassette.command_pattern`."""
+    def test_command_pattern(self):
+        """Credentials and option values are masked"""
+        self.assertEqual(
+            command_pattern(CMD.format(1).encode('utf-8')),
+            u'LANG=en_US.UTF-8 hammer -v -u * -p * --output=* '
+            u'organization info --name=*'
+        )
+        self.assertEqual(
+            command_pattern(u"mkdir -p /tmp/a --mode='700' --force"),
+            u'mkdir -p /tmp/a --mode=* --force'
+        )
+
+
+class CassetteTestCase(TestCase):
+    """Tests for :class:`robottelo.cassette.Cassette`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'cassettes', 'test.json')
+
+    def record(self):
+        """Record a cassette with a few commands and a download."""
+        cassette = Cassette(self.path, 'record')
+        outputs = iter([
+            (b'ID,Name\n1,org_1\n', b'', 0),
+            (b'ID,Name\n2,org_2\n', b'', 0),
+            (b'\xff\xfe', b'Error: not found\n', 65),
+        ])
+        with mock.patch('robottelo.cassette.time.time') as time:
+            time.side_effect = [10, 10.5, 20, 20.25, 30, 31]
+            for number in (1, 2, 3):
+                cassette.execute(
+                    'sat', CMD.format(number), lambda: next(outputs))
+        remote = os.path.join(self.tmpdir, 'remote')
+        with open(remote, 'wb') as handler:
+            handler.write(b'\x00manifest')
+        local = os.path.join(self.tmpdir, 'local')
+        cassette.download(
+            'sat', '/tmp/manifest.zip', local,
+            lambda: shutil.copy(remote, local)
+        )
+        cassette.close()
+
+    def test_record(self):
+        """Recorded outputs are saved when the cassette is closed"""
+        self.record()
+        with open(self.path) as handler:
+            data = json.load(handler)
+        self.assertEqual(data['version'], 1)
+        self.assertEqual(len(data['interactions']), 3)
+        self.assertEqual(data['interactions'][0], {
+            'host': 'sat',
+            'command': CMD.format(1).replace(u'admin', u'*').replace(
+                u'changeme', u'*'),
+            'stdout': 'ID,Name\n1,org_1\n',
+            'stderr': '',
+            'rc': 0,
+            'latency': 0.5,
+        })
+        self.assertIn('stdout_base64', data['interactions'][2])
+        self.assertEqual(data['files'][0]['remote_file'], '/tmp/manifest.zip')
+
+    def test_replay(self):
+        """Recorded outputs are replayed, exact matches first then by
+        pattern in the recorded order
+        """
+        self.record()
+        cassette = Cassette(self.path, 'once')
+        self.assertFalse(cassette.recording)
+        run = mock.Mock()
+        self.assertEqual(
+            cassette.execute('sat', CMD.format(2), run),
+            (b'ID,Name\n2,org_2\n', b'', 0)
+        )
+        self.assertEqual(
+            cassette.execute('sat', CMD.format(42).encode('utf-8'), run),
+            (b'ID,Name\n1,org_1\n', b'', 0)
+        )
+        self.assertEqual(
+            cassette.replay('sat', CMD.format(42))[0], b'ID,Name\n2,org_2\n')
+        for _ in range(2):
+            self.assertEqual(
+                cassette.replay('sat', CMD.format(42)),
+                (b'\xff\xfe', b'Error: not found\n', 65)
+            )
+        self.assertFalse(run.called)
+        self.assertEqual(
+            cassette.replay('sat', CMD.format(1).replace(
+                u'changeme', u'secret'))[0],
+            b'ID,Name\n1,org_1\n'
+        )
+        with self.assertRaises(CassetteError):
+            cassette.replay('other', CMD.format(1))
+        with self.assertRaises(CassetteError):
+            cassette.replay('sat', 'hammer ping')
+
+    def test_replay_latency(self):
+        """The recorded latency is waited for multiplied by the factor"""
+        self.record()
+        with mock.patch('robottelo.cassette.time.sleep') as sleep:
+            Cassette(self.path).replay('sat', CMD.format(1))
+            self.assertFalse(sleep.called)
+            Cassette(self.path, latency_factor=2).replay('sat', CMD.format(1))
+            sleep.assert_called_once_with(1.0)
+
+    def test_replay_download(self):
+        """Recorded files are written on replay"""
+        self.record()
+        cassette = Cassette(self.path)
+        local = os.path.join(self.tmpdir, 'replayed')
+        run = mock.Mock()
+        cassette.download('sat', '/tmp/manifest.zip', local, run)
+        self.assertFalse(run.called)
+        with open(local, 'rb') as handler:
+            self.assertEqual(handler.read(), b'\x00manifest')
+        with self.assertRaises(CassetteError):
+            cassette.download('sat', '/tmp/other.zip', local, run)
+
+    def test_invalid(self):
+        """Invalid modes and missing cassettes are reported"""
+        with self.assertRaises(CassetteError):
+            Cassette(self.path, 'rewind')
+        with self.assertRaises(CassetteError):
+            Cassette(self.path)
+
+
+class SSHCassetteTestCase(TestCase):
+    """Tests for the cassette support of :mod:`robottelo.ssh`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'ssh.json')
+
+    @mock.patch('robottelo.ssh._exec_command')
+    def test_command(self, exec_command):
+        """Commands are recorded then replayed without connecting"""
+        exec_command.return_value = (b'ID,Name\n1,org_1\n', b'', 0)
+        with use_cassette(self.path, 'once') as cassette:
+            self.assertIs(get_cassette(), cassette)
+            ssh.command(CMD.format(1), 'sat', output_format='csv')
+        self.assertIsNone(get_cassette())
+        exec_command.reset_mock()
+        with use_cassette(self.path, 'once'):
+            result = ssh.command(CMD.format(2), 'sat', output_format='csv')
+            ssh.upload_file('/etc/hosts', '/tmp/hosts', 'sat')
+        self.assertFalse(exec_command.called)
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, [{u'id': u'1', u'name': u'org_1'}])
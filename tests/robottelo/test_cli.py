@@ -1,7 +1,24 @@
+import os
 import six
+import threading
+import time
 import unittest2
 
-from robottelo.cli.base import Base
+from robottelo.cli import rest, shell
+from robottelo.cli.base import Base, CLIReturnCodeError
+from robottelo.cli.contentview import ContentView
+from robottelo.cli.factory import (
+    CLIFactoryBulkError,
+    CLIFactoryError,
+    make_many,
+    make_org_bulk,
+    make_product,
+    setup_org_for_a_custom_repo,
+    setup_org_for_a_rh_repo,
+)
+from robottelo.cli.org import Org
+from robottelo.cli.product import Product
+from robottelo.cli.repository import Repository
 
 if six.PY2:
     import mock
@@ -67,3 +84,536 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertEqual(new_class.foreman_admin_username, 'auser')
         self.assertEqual(new_class.foreman_admin_password, 'apass')
         self.assertIn(Base, new_class.__bases__)
+
+    @mock.patch('robottelo.cli.base.ssh')
+    @mock.patch('robottelo.cli.base.shell')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_shell_backend(self, settings, hammer_shell, ssh):
+        """Commands go to the hammer shell when it is the backend"""
+        settings.cli.backend = 'shell'
+        hammer_shell.execute.return_value.return_code = 0
+        hammer_shell.execute.return_value.stderr = u''
+        CLIClass.execute('organization list', output_format='csv')
+        hammer_shell.execute.assert_called_once_with(
+            'organization list',
+            CLIClass.foreman_admin_username,
+            CLIClass.foreman_admin_password,
+            output_format='csv',
+            timeout=None,
+        )
+        self.assertFalse(ssh.command.called)
+
+    @mock.patch.object(Base, 'info')
+    @mock.patch.object(Base, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_skip_info(self, settings, execute, info):
+        """The create output is returned when it has the declared fields"""
+        settings.cli.skip_create_info = True
+        execute.return_value = {
+            u'Message': u'Architecture created', u'Id': 5, u'Name': u'arch'}
+        with mock.patch.object(CLIClass, 'create_fields', ('id', 'name')):
+            result = CLIClass.create({u'name': u'arch', u'location-ids': None})
+        self.assertEqual(result, {
+            u'message': u'Architecture created', u'id': u'5', u'name': u'arch'
+        })
+        self.assertEqual(execute.call_args[1]['output_format'], 'json')
+        self.assertFalse(info.called)
+
+    @mock.patch.object(Base, 'info')
+    @mock.patch.object(Base, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_skip_info_other_fields(self, settings, execute, info):
+        """Info is fetched when other fields than the declared ones are set"""
+        settings.cli.skip_create_info = True
+        execute.return_value = [{u'id': u'5', u'name': u'model'}]
+        info.return_value = {
+            u'id': u'5', u'name': u'model', u'vendor-class': u'vendor'}
+        with mock.patch.object(CLIClass, 'create_fields', ('id', 'name')):
+            result = CLIClass.create(
+                {u'name': u'model', u'vendor-class': u'vendor'})
+        info.assert_called_once_with({u'id': u'5'})
+        self.assertEqual(result, info.return_value)
+        self.assertEqual(execute.call_args[1]['output_format'], 'csv')
+
+    @mock.patch.object(Base, 'info')
+    @mock.patch.object(Base, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_skip_info_fallback(self, settings, execute, info):
+        """Info is fetched when the create output lacks declared fields"""
+        settings.cli.skip_create_info = True
+        execute.return_value = {u'Message': u'Created', u'Id': 5}
+        info.return_value = {u'id': u'5', u'name': u'arch'}
+        with mock.patch.object(CLIClass, 'create_fields', ('id', 'name')):
+            result = CLIClass.create({u'name': u'arch'})
+        info.assert_called_once_with({u'id': u'5'})
+        self.assertEqual(result, info.return_value)
+
+    @mock.patch.object(Base, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_json_output(self, settings, execute):
+        """List and info outputs are normalized when JSON output is set"""
+        settings.cli.output_format = 'json'
+        execute.return_value = [{u'Id': 1, u'Name': u'org', u'Label': None}]
+        self.assertEqual(
+            CLIClass.list(),
+            [{u'id': u'1', u'name': u'org', u'label': u''}]
+        )
+        self.assertEqual(execute.call_args[1]['output_format'], 'json')
+        execute.return_value = {
+            u'Id': 1, u'Locations': [{u'Name': u'loc'}]}
+        self.assertEqual(
+            CLIClass.info({u'id': 1}),
+            {u'id': u'1', u'locations': [{u'name': u'loc'}]}
+        )
+        execute.return_value = None
+        self.assertEqual(CLIClass.list(), [])
+
+    @mock.patch.object(Base, 'info')
+    @mock.patch.object(Base, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_json_output(self, settings, execute, info):
+        """The new object ID is read from the JSON create output"""
+        settings.cli.output_format = 'json'
+        settings.cli.skip_create_info = False
+        execute.return_value = {u'Message': u'Created', u'Id': 5}
+        info.return_value = {u'id': u'5', u'name': u'arch'}
+        self.assertEqual(
+            CLIClass.create({u'name': u'arch'}), info.return_value)
+        self.assertEqual(execute.call_args[1]['output_format'], 'json')
+        info.assert_called_once_with({u'id': u'5'})
+
+    @mock.patch.object(Base, 'list')
+    def test_iter_list(self, list_):
+        """Pages are requested until a page is empty, the server may return
+        less entities than the page size"""
+        list_.side_effect = [[{u'id': 1}], [{u'id': 2}], []]
+        self.assertEqual(
+            [row[u'id'] for row in CLIClass.iter_list(
+                {u'organization-id': 1}, page_size=2)],
+            [1, 2]
+        )
+        self.assertEqual(list_.call_args_list, [
+            mock.call({u'organization-id': 1, u'per-page': 2, 'page': 1}),
+            mock.call({u'organization-id': 1, u'per-page': 2, 'page': 2}),
+            mock.call({u'organization-id': 1, u'per-page': 2, 'page': 3}),
+        ])
+
+    @mock.patch.object(Base, 'list')
+    def test_iter_list_stop(self, list_):
+        """Pages are not requested once the iteration stops"""
+        list_.return_value = [{u'id': 1}, {u'id': 2}]
+        rows = CLIClass.iter_list(page_size=2)
+        self.assertEqual(next(rows), {u'id': 1})
+        rows.close()
+        self.assertEqual(list_.call_count, 1)
+
+    @mock.patch.object(Base, 'list')
+    def test_iter_list_prefetch(self, list_):
+        """The next page is requested before the current one is consumed"""
+        list_.side_effect = [
+            [{u'id': 1}, {u'id': 2}], [{u'id': 3}, {u'id': 4}], []]
+        rows = CLIClass.iter_list(page_size=2, prefetch=True)
+        self.assertEqual(next(rows), {u'id': 1})
+        self.assertEqual(list(rows), [{u'id': 2}, {u'id': 3}, {u'id': 4}])
+        self.assertEqual(list_.call_count, 3)
+
+    @mock.patch.object(Base, 'list')
+    def test_iter_list_prefetch_stop(self, list_):
+        """The page being prefetched is waited for when the iteration
+        stops"""
+        fetched = []
+
+        def slow_list(options):
+            """Return a full page, slowly."""
+            time.sleep(0.05)
+            fetched.append(options['page'])
+            return [{u'id': 1}, {u'id': 2}]
+        list_.side_effect = slow_list
+        rows = CLIClass.iter_list(page_size=2, prefetch=True)
+        next(rows)
+        rows.close()
+        self.assertEqual(fetched, [1, 2])
+
+
+class MockShellChannel(object):
+    """A mock ``paramiko.Channel`` running hammer shell.
+
+    The shell starts with a banner and its prompt. Each command sent is
+    echoed back after the prompt like readline does and answered with the
+    output registered in ``outputs``, unknown commands get an error, followed
+    by the prompt. Lines sent before the previous answer was read are
+    counted in ``typed_ahead``.
+    """
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.closed = False
+        self.sent = []
+        self.typed_ahead = 0
+        self.buffer = [b'Welcome to the hammer interactive shell\r\nhammer> ']
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b'x')
+
+    def fileno(self):
+        """Return a readable file descriptor."""
+        return self._read_fd
+
+    def sendall(self, data):
+        """Queue the shell answer for each line of ``data``."""
+        for line in data.decode('utf-8').split(u'\n')[:-1]:
+            if self.buffer:
+                self.typed_ahead += 1
+            self.sent.append(line)
+            answer = u'{0}\r\n'.format(line)
+            if line in self.outputs:
+                answer += self.outputs[line]
+            elif line:
+                answer += u"Error: unknown command '{0}'\r\n".format(line)
+            self.buffer.append((answer + u'hammer> ').encode('utf-8'))
+
+    def recv_ready(self):
+        """Return whether there is data to read."""
+        return len(self.buffer) > 0
+
+    def recv(self, nbytes):  # pylint:disable=W0613
+        """Return the next answer."""
+        return self.buffer.pop(0)
+
+    def exit_status_ready(self):
+        """The shell never exits."""
+        return False
+
+    def close(self):
+        """Close the file descriptors."""
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+        self.closed = True
+
+
+class HammerShellTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.shell.HammerShell`."""
+    def setUp(self):
+        self.channel = MockShellChannel({
+            u'--output=csv organization list': (
+                u'Id,Name\r\n\x1b[1m1\x1b[0m,Default Organization\r\n'),
+            u'organization info --id="2"': (
+                u'Could not find organization\r\n'),
+        })
+        self.hammer_shell = shell.HammerShell('admin', 'changeme', 'host')
+        self.hammer_shell._channel = self.channel
+        # Discard the banner, as start does
+        self.hammer_shell._read(time.time() + 1, 1)
+
+    def tearDown(self):
+        self.hammer_shell.close()
+
+    def test_execute(self):
+        """The command output ends at the sentinel"""
+        result = self.hammer_shell.execute(
+            'organization list', output_format='csv')
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(
+            result.stdout, [{u'id': u'1', u'name': u'Default Organization'}])
+        self.assertEqual(len(self.channel.sent), 2)
+        self.assertIn(u'__robottelo_', self.channel.sent[1])
+        self.assertEqual(self.channel.typed_ahead, 0)
+
+    def test_execute_error(self):
+        """Error messages make the command fail"""
+        result = self.hammer_shell.execute('organization info --id="2"')
+        self.assertEqual(result.return_code, shell.ERROR_RETURN_CODE)
+        self.assertEqual(result.stderr, u'Could not find organization')
+
+    def test_consecutive_commands(self):
+        """Each command gets its own output"""
+        self.hammer_shell.execute('organization info --id="2"')
+        result = self.hammer_shell.execute(
+            'organization list', output_format='csv')
+        self.assertEqual(len(result.stdout), 1)
+
+    def test_sentinel_in_output(self):
+        """Only the error for the sentinel ends the output"""
+        self.hammer_shell._sentinel = u'__sentinel'
+        self.channel.outputs[u'--output=csv organization list'] = (
+            u'Id,Name\r\n1,__sentinel_1\r\n2,Other\r\n')
+        result = self.hammer_shell.execute(
+            'organization list', output_format='csv')
+        self.assertEqual(
+            [row[u'name'] for row in result.stdout],
+            [u'__sentinel_1', u'Other']
+        )
+
+
+class RESTBackendTestCase(unittest2.TestCase):
+    """Tests for :mod:`robottelo.cli.rest`."""
+    def setUp(self):
+        patcher = mock.patch('robottelo.cli.rest._request')
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(Base, 'execute')
+        self.execute = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled(self):
+        """Hammer is used when the API backend is not enabled"""
+        Org.list()
+        self.assertTrue(self.execute.called)
+        self.assertFalse(self.request.called)
+
+    def test_supports(self):
+        """Unknown entities and name lookups are left to hammer"""
+        self.assertTrue(rest.supports('organization', 'create', {
+            u'name': u'org', u'organization-label': None}))
+        self.assertFalse(rest.supports('organization', 'create', {
+            u'name': u'org', u'organization-label': u'label'}))
+        self.assertFalse(rest.supports('repository', 'create', {
+            u'gpg-key': u'key'}))
+        self.assertFalse(rest.supports('organization', 'add-user'))
+        self.assertFalse(rest.supports('task', 'list'))
+
+    def test_create(self):
+        """Create returns the info dictionary without calling hammer"""
+        self.request.return_value = {
+            u'id': 5, u'name': u'org', u'label': u'org', u'title': u'org',
+            u'description': None,
+        }
+        with rest.enabled():
+            result = Org.create({u'name': u'org', u'description': None})
+        self.assertEqual(result, {
+            u'id': u'5', u'name': u'org', u'label': u'org', u'title': u'org',
+            u'description': u'',
+        })
+        self.assertFalse(self.execute.called)
+        self.assertEqual(self.request.call_args[0][:2], (
+            'POST', '/katello/api/v2/organizations'))
+        self.assertEqual(
+            self.request.call_args[1]['json'], {u'name': u'org'})
+
+    def test_info_nested(self):
+        """Lists of sub dictionaries are built like hammer info does"""
+        self.request.return_value = {
+            u'id': 3, u'name': u'cv', u'composite': False,
+            u'versions': [{u'id': 7, u'version': u'1.0'}],
+        }
+        with rest.enabled():
+            result = ContentView.info({u'id': 3})
+        self.assertEqual(self.request.call_args[0][:2], (
+            'GET', '/katello/api/v2/content_views/3'))
+        self.assertEqual(result['composite'], u'false')
+        self.assertEqual(result['versions'], [
+            {u'id': u'7', u'version': u'1.0', u'published': u''}])
+
+    def test_resolve_references(self):
+        """Options referencing entities by name are replaced by IDs"""
+        self.request.side_effect = [
+            {u'results': [{u'id': 9}]},
+            {u'id': 1, u'name': u'product'},
+        ]
+        with rest.enabled():
+            Product.create({u'name': u'product', u'organization': u'org'})
+        search, create = self.request.call_args_list
+        self.assertEqual(search[0][:2], (
+            'GET', '/katello/api/v2/organizations'))
+        self.assertEqual(search[1]['params']['search'], u'name="org"')
+        self.assertEqual(create[1]['json'], {
+            u'name': u'product', u'organization_id': 9})
+
+    def test_error(self):
+        """API errors are raised as hammer errors"""
+        self.request.side_effect = rest.APIError(422, u'Name is taken')
+        with rest.enabled():
+            with self.assertRaises(CLIReturnCodeError) as context:
+                Org.create({u'name': u'org'})
+        self.assertEqual(context.exception.return_code, 70)
+        self.assertEqual(context.exception.stderr, u'Name is taken')
+
+    @mock.patch('robottelo.cli.factory.settings')
+    def test_factory_backend(self, settings):
+        """Factories use the API when it is their backend"""
+        settings.cli.factory_backend = 'api'
+        self.request.return_value = {u'id': 1, u'name': u'product'}
+        make_product({u'organization-id': 1})
+        self.assertFalse(self.execute.called)
+        self.assertFalse(rest.is_enabled())
+
+
+class MakeManyTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cli.factory.make_many`."""
+    @mock.patch.object(CLIClass, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_concurrent_commands(self, settings, execute):
+        """Commands of the same class run concurrently keep their own
+        subcommand"""
+        settings.cli.output_format = None
+        settings.cli.skip_create_info = False
+        subcommands = []
+
+        def run(command, output_format=None):  # pylint:disable=W0613
+            """Record the subcommand seen after the other threads ran"""
+            time.sleep(0.01)
+            subcommands.append((command.split()[1], CLIClass.command_sub))
+            if CLIClass.command_sub == 'create':
+                return [{u'id': u'1'}]
+            return [u'Id: 1']
+        execute.side_effect = run
+
+        def make_fn(options):
+            """Create an entity with the real Base methods"""
+            return CLIClass.create(options)
+        make_fn.__name__ = 'make_fn'
+
+        results = make_many(
+            make_fn, 8, lambda index: {u'name': str(index)}, concurrency=8)
+        self.assertEqual(list(results), [{u'id': u'1'}] * 8)
+        self.assertEqual(len(subcommands), 16)
+        for built, current in subcommands:
+            self.assertEqual(built, current)
+
+    def test_thread_command_state(self):
+        """Subcommands assigned by a thread are not seen by the others"""
+        CLIClass.command_sub = 'info'
+        assigned = threading.Event()
+        done = threading.Event()
+
+        def create():
+            """Assign the subcommand and wait for the main thread"""
+            CLIClass.command_sub = 'create'
+            assigned.set()
+            done.wait(5)
+        thread = threading.Thread(target=create)
+        thread.start()
+        assigned.wait(5)
+        self.assertEqual(CLIClass.command_sub, 'info')
+        done.set()
+        thread.join()
+
+    def test_ordered_results(self):
+        """Entities are returned in the order of their indexes"""
+        def make_fn(options):
+            """Return the entity built from ``options``"""
+            return {u'name': options[u'name']}
+        results = make_many(
+            make_fn, 10, lambda index: {u'name': str(index)}, concurrency=4)
+        self.assertEqual(
+            [entity[u'name'] for entity in results],
+            [str(index) for index in range(10)],
+        )
+        self.assertGreater(results.throughput, 0)
+
+    def test_partial_failure(self):
+        """Failures are reported together with the created entities"""
+        def make_fn(options):
+            """Fail for odd indexes"""
+            if options % 2:
+                raise CLIFactoryError(u'failed {0}'.format(options))
+            return options
+        with self.assertRaises(CLIFactoryBulkError) as context:
+            make_many(make_fn, 4, lambda index: index)
+        self.assertEqual(context.exception.results, [0, None, 2, None])
+        self.assertEqual(sorted(context.exception.errors), [1, 3])
+        self.assertIn(u'2 of 4', str(context.exception))
+
+    @mock.patch('robottelo.cli.factory.make_org')
+    def test_bulk_helper(self, make_org):
+        """Each entity gets its own copy of the options"""
+        make_org.__name__ = 'make_org'
+        make_org.side_effect = lambda options: options.pop(u'label')
+        results = make_org_bulk(3, {u'label': u'org'})
+        self.assertEqual(results, [u'org', u'org', u'org'])
+
+
+class SetupOrgTestCase(unittest2.TestCase):
+    """Tests for the organization setup factories."""
+    @mock.patch('robottelo.cli.factory.activationkey_add_subscription_to_repo')
+    @mock.patch('robottelo.cli.factory.make_activation_key')
+    @mock.patch('robottelo.cli.factory.ContentView')
+    @mock.patch('robottelo.cli.factory.make_content_view')
+    @mock.patch('robottelo.cli.factory.Repository')
+    @mock.patch('robottelo.cli.factory.make_repository')
+    @mock.patch('robottelo.cli.factory.make_product')
+    @mock.patch('robottelo.cli.factory.make_lifecycle_environment')
+    @mock.patch('robottelo.cli.factory.make_org')
+    def test_setup_org_for_a_custom_repo(
+            self, make_org, make_lifecycle_environment, make_product,
+            make_repository, repository, make_content_view, content_view,
+            make_activation_key, add_subscription):
+        """The entities are created and the given ones reused"""
+        make_lifecycle_environment.return_value = {'id': 2}
+        make_product.return_value = {'id': 3, 'name': 'product'}
+        make_repository.return_value = {'id': 4}
+        content_view.info.return_value = {'versions': [{'id': 6}]}
+        make_activation_key.return_value = {'id': 7}
+        result = setup_org_for_a_custom_repo({
+            u'url': u'http://example.com/repo',
+            u'organization-id': 1,
+            u'content-view-id': 5,
+        })
+        self.assertEqual(result, {
+            u'activationkey-id': 7,
+            u'content-view-id': 5,
+            u'lifecycle-environment-id': 2,
+            u'organization-id': 1,
+            u'product-id': 3,
+            u'repository-id': 4,
+        })
+        self.assertFalse(make_org.called)
+        self.assertFalse(make_content_view.called)
+        repository.synchronize.assert_called_once_with({'id': 4})
+        content_view.version_promote.assert_called_once_with({
+            u'id': 6,
+            u'organization-id': 1,
+            u'to-lifecycle-environment-id': 2,
+        })
+        add_subscription.assert_called_once_with({
+            u'activationkey-id': 7,
+            u'organization-id': 1,
+            u'subscription': 'product',
+        })
+
+    @mock.patch('robottelo.cli.factory.activationkey_add_subscription_to_repo')
+    @mock.patch('robottelo.cli.factory.make_activation_key')
+    @mock.patch('robottelo.cli.factory.ContentView')
+    @mock.patch('robottelo.cli.factory.RepositorySet')
+    @mock.patch('robottelo.cli.factory.Subscription')
+    @mock.patch('robottelo.cli.factory.upload_file')
+    @mock.patch('robottelo.cli.factory.manifests')
+    @mock.patch.object(Repository, 'execute')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_setup_org_for_a_rh_repo_concurrent_repository_commands(
+            self, settings, execute, *_):
+        """The repository info and synchronization run at the same time with
+        the real Repository methods"""
+        settings.cli.output_format = None
+        running = []
+        both_running = threading.Event()
+        commands = []
+
+        def run(command, **_):
+            """Record the command state once both commands are running"""
+            running.append(command)
+            if len(running) == 2:
+                both_running.set()
+            both_running.wait(5)
+            commands.append((
+                command.split()[1],
+                Repository.command_sub,
+                Repository.command_requires_org,
+            ))
+            if command.startswith('repository info'):
+                return [u'Id: 4']
+            return []
+        execute.side_effect = run
+
+        result = setup_org_for_a_rh_repo({
+            u'content-view-id': 5,
+            u'lifecycle-environment-id': 2,
+            u'organization-id': 1,
+            u'product': u'product',
+            u'repository': u'repository',
+            u'repository-set': u'repository set',
+        })
+        self.assertTrue(both_running.is_set())
+        self.assertEqual(result[u'repository-id'], u'4')
+        self.assertEqual(sorted(commands), [
+            ('info', 'info', False),
+            ('synchronize', 'synchronize', True),
+        ])
@@ -0,0 +1,116 @@
+"""Tests for module ``robottelo.performance.consumer``."""
+import os
+
+import six
+
+from robottelo.config import settings
+from robottelo.performance.consumer import ConsumerEngine, ConsumerError
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+
+def response(status_code=200, data=None):
+    """Return a mocked ``requests`` response."""
+    return mock.Mock(
+        status_code=status_code, text=u'error', json=lambda: data)
+
+
+class ConsumerEngineTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.consumer.ConsumerEngine`."""
+    def setUp(self):
+        patcher = mock.patch.object(
+            settings.server, 'get_url', return_value='https://sat')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.uuids = iter(range(1, 100))
+        self.admin_session = mock.Mock()
+        self.admin_session.request.side_effect = self.register
+        patcher = mock.patch(
+            'robottelo.performance.consumer.requests.Session')
+        self.session_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.consumer_session = self.session_class.return_value
+        self.consumer_session.request.return_value = response()
+        # Child mocks are created on first access, which is not thread safe
+        self.consumer_session.close.return_value = None
+        self.engine = ConsumerEngine('org', activation_key='ak', concurrency=2)
+        self.engine._session = lambda: self.admin_session
+        self.addCleanup(self.engine.close)
+
+    def register(self, method, url, **kwargs):
+        """Answer a registration with a new consumer."""
+        return response(data={
+            'uuid': u'uuid-{0}'.format(next(self.uuids)),
+            'idCert': {'cert': u'CERT', 'key': u'KEY'},
+        })
+
+    def test_run(self):
+        """Every consumer registers, attaches, checks in and unregisters"""
+        result = self.engine.run(3, clients=2, pool_id='pool', checkins=2)
+        self.assertEqual(
+            [len(result[step]['thread-0']) for step in (
+                'register', 'attach', 'checkin', 'unregister')],
+            [2, 2, 4, 2]
+        )
+        self.assertEqual(len(result['register']['thread-1']), 1)
+        _, kwargs = self.admin_session.request.call_args
+        self.assertEqual(
+            kwargs['params'], {'owner': 'org', 'activation_keys': 'ak'})
+        self.assertIsNone(kwargs['auth'])
+        self.assertEqual(
+            kwargs['json']['facts']['network.hostname'],
+            kwargs['json']['name']
+        )
+        calls = [
+            (call[0][0], call[0][1], call[1].get('params'))
+            for call in self.consumer_session.request.call_args_list
+        ]
+        self.assertIn(
+            ('POST', 'https://sat/rhsm/consumers/uuid-1/entitlements',
+             {'pool': 'pool'}),
+            calls
+        )
+        self.assertIn(
+            ('DELETE', 'https://sat/rhsm/consumers/uuid-3', None), calls)
+        self.assertEqual(self.consumer_session.close.call_count, 3)
+        self.assertEqual(self.engine.consumers, [])
+
+    def test_keep_consumers(self):
+        """Consumers can be kept registered with their certificates"""
+        self.engine.run(2, pool_id=False, checkins=0, unregister=False)
+        self.assertEqual(
+            sorted(consumer.uuid for consumer in self.engine.consumers),
+            [u'uuid-1', u'uuid-2']
+        )
+        cert_file, key_file = self.engine.consumers[0].cert
+        with open(key_file) as handler:
+            self.assertEqual(handler.read(), u'KEY')
+        self.assertEqual(self.consumer_session.request.call_count, 0)
+        self.engine.close()
+        self.assertFalse(os.path.exists(cert_file))
+
+    def test_failure(self):
+        """The steps after a failed request are skipped"""
+        self.consumer_session.request.return_value = response(410)
+        result = self.engine.run(1)
+        self.assertEqual(len(result['register']['thread-0']), 1)
+        self.assertEqual(result['attach']['thread-0'], [])
+        self.assertEqual(result['checkin']['thread-0'], [])
+        with self.assertRaises(ConsumerError):
+            self.engine.checkin(mock.Mock(session=self.consumer_session))
+
+    def test_unregister_failed(self):
+        """Consumers which failed after their registration are
+        unregistered"""
+        self.consumer_session.request.side_effect = [
+            response(500), response()]
+        result = self.engine.run(1, pool_id='pool')
+        self.assertEqual(result['unregister']['thread-0'], [])
+        method, url = self.consumer_session.request.call_args[0]
+        self.assertEqual(
+            (method, url), ('DELETE', 'https://sat/rhsm/consumers/uuid-1'))
+        self.assertEqual(self.consumer_session.close.call_count, 1)
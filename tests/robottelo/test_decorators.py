@@ -1,5 +1,9 @@
 """Unit tests for :mod:`robottelo.decorators`."""
+import os
+import shutil
 import six
+import socket
+import tempfile
 
 from fauxfactory import gen_integer
 from robottelo import decorators
@@ -182,6 +186,15 @@ class CacheableTestCase(TestCase):
         self.assertNotIn('foo', decorators.OBJECT_CACHE)
         self.assertEqual(decorators.OBJECT_CACHE, {})
 
+    def test_cache_by_options(self):
+        """Objects created with different options are cached apart."""
+        make_bar = decorators.cacheable(lambda options: dict(options))
+        obj1 = make_bar({'organization-id': 1}, cached=True)
+        obj2 = make_bar({'organization-id': 2}, cached=True)
+        self.assertEqual(obj1, {'organization-id': 1})
+        self.assertEqual(obj2, {'organization-id': 2})
+        self.assertIs(make_bar({'organization-id': 1}, cached=True), obj1)
+
 
 class RmBugIsOpenTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.rm_bug_is_open`."""
@@ -270,6 +283,18 @@ class GetBugzillaBugStatusIdTestCase(TestCase):
             with self.assertRaises(decorators.BugFetchError):
                 decorators._get_bugzilla_bug('4242')
 
+    def test_raise_bug_fetch_error_connect_network_error(self):
+        """Raise BugFetchError when Bugzilla can't be reached."""
+        for error in (decorators.RequestException(), socket.error()):
+            connection = mock.MagicMock()
+            connection.connect.side_effect = [error]
+            self.bugzilla.RHBugzilla.side_effect = [connection]
+
+            with mock.patch.dict(
+                    'robottelo.decorators._redmine', {}):
+                with self.assertRaises(decorators.BugFetchError):
+                    decorators._get_bugzilla_bug('4242')
+
     def test_raise_bug_fetch_error_getbugsimple_fault(self):
         """Raise BugFetchError due to Fault exception on getbugsimple."""
         connection = mock.MagicMock()
@@ -347,6 +372,105 @@ class GetRedmineBugStatusIdTestCase(TestCase):
             '{0}/issues/{1}.json'.format(decorators.REDMINE_URL, bug_id))
 
 
+class BugDiskCacheTestCase(TestCase):
+    """Tests for the bug cache on disk and :func:`prefetch_bugs`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        patcher = mock.patch('robottelo.decorators.settings')
+        self.settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.settings.cache.bug_path = os.path.join(
+            self.tmpdir, 'bugs.sqlite')
+        self.settings.cache.bug_ttl = 10
+        self.settings.cache.bugs_offline = False
+        patcher = mock.patch('robottelo.decorators.bugzilla')
+        self.bugzilla = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.connection = self.bugzilla.RHBugzilla.return_value
+        for patcher in (
+                mock.patch.dict('robottelo.decorators._bugzilla', clear=True),
+                mock.patch.dict(
+                    'robottelo.decorators._redmine', issues={}),
+                mock.patch.dict('robottelo.decorators._bug_disk_cache', {
+                    'backend': None, 'path': None})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_shared_bug(self):
+        """Bugs fetched are read from the disk by other processes"""
+        self.connection.getbugsimple.return_value = mock.Mock(
+            status='NEW', whiteboard='')
+        decorators._get_bugzilla_bug('4242')
+        decorators._bugzilla.clear()
+        bug = decorators._get_bugzilla_bug('4242')
+        self.assertIsInstance(bug, decorators.CachedBug)
+        self.assertEqual(bug.status, 'NEW')
+        self.assertEqual(self.connection.getbugsimple.call_count, 1)
+
+    @mock.patch('robottelo.decorators.time')
+    def test_outdated_bug(self, time):
+        """Outdated bugs are used when Bugzilla can't be reached"""
+        time.time.return_value = 100
+        decorators._write_cached_bug(
+            u'bugzilla:4242', {'status': 'NEW', 'whiteboard': None})
+        time.time.return_value = 200
+        self.connection.connect.side_effect = ValueError
+        self.assertEqual(decorators._get_bugzilla_bug('4242').status, 'NEW')
+
+    def test_offline(self):
+        """Bugs are not fetched when offline"""
+        self.settings.cache.bugs_offline = True
+        with self.assertRaises(decorators.BugFetchError):
+            decorators._get_bugzilla_bug('4242')
+        self.assertFalse(self.bugzilla.RHBugzilla.called)
+
+    @mock.patch('robottelo.decorators.requests.get')
+    def test_offline_redmine(self, get):
+        """Redmine is not contacted when offline"""
+        self.settings.cache.bugs_offline = True
+        get.side_effect = AssertionError('Redmine contacted')
+        with mock.patch.dict(
+                'robottelo.decorators._redmine', closed_statuses=None):
+            with self.assertRaises(decorators.BugFetchError):
+                decorators._redmine_closed_issue_statuses()
+            decorators._write_cached_bug(u'redmine:4242', 5)
+            self.assertFalse(decorators.rm_bug_is_open(4242))
+            decorators._write_cached_bug(u'redmine:closed_statuses', [5])
+            self.assertEqual(decorators._redmine_closed_issue_statuses(), [5])
+        self.assertFalse(get.called)
+
+    @mock.patch('robottelo.decorators.requests')
+    def test_prefetch(self, requests):
+        """Missing bugs are fetched in one call per tracker"""
+        decorators._bugzilla['1'] = mock.Mock()
+        self.connection.getbugs.return_value = [
+            mock.Mock(status='NEW', whiteboard=''), None]
+        requests.get.return_value.json.return_value = {
+            'issues': [{'id': 5, 'status': {'id': 3}}]}
+        decorators.prefetch_bugs(['1', '2', '3'], [5, 6])
+        self.connection.getbugs.assert_called_once_with(
+            [2, 3], include_fields=['id', 'status', 'whiteboard'])
+        self.assertEqual(decorators._bugzilla['2'].status, 'NEW')
+        self.assertNotIn('3', decorators._bugzilla)
+        self.assertEqual(requests.get.call_count, 1)
+        self.assertEqual(
+            requests.get.call_args[1]['params']['issue_id'], '5,6')
+        self.assertEqual(decorators._redmine['issues'], {5: 3})
+
+    @mock.patch('robottelo.decorators.requests')
+    def test_prefetch_unreachable(self, requests):
+        """Prefetching does not fail when the trackers can't be reached"""
+        requests.get.side_effect = decorators.RequestException
+        for error in (decorators.RequestException, socket.error):
+            self.connection.connect.side_effect = error
+            decorators.prefetch_bugs(['1'], [5])
+            self.connection.connect.side_effect = None
+            self.connection.getbugs.side_effect = error
+            decorators.prefetch_bugs(['1'], [5])
+        self.assertEqual(decorators._bugzilla, {})
+
+
 class RedmineClosedIssueStatusesTestCase(TestCase):
     """Tests for ``robottelo.decorators._redmine_closed_issue_statuses``."""
     @mock.patch('robottelo.decorators.requests')
@@ -502,6 +626,21 @@ class SkipIfBugOpen(TestCase):
         self.assertEqual(foo(), 42)
 
 
+class SkipIfBugOpenReferencesTestCase(TestCase):
+    """Tests for the bugs referenced by ``skip_if_bug_open``."""
+    def test_references(self):
+        """Decorated tests are marked and their bug can be prefetched"""
+        with mock.patch.dict(
+                'robottelo.decorators._referenced_bugs',
+                bugzilla=set(), redmine=set()):
+            func = decorators.skip_if_bug_open('bugzilla', 4242)(
+                lambda: None)
+            self.assertEqual(
+                decorators._referenced_bugs['bugzilla'], set([4242]))
+        self.assertEqual(func.bug_type, 'bugzilla')
+        self.assertEqual(func.bug_id, 4242)
+
+
 class SkipIfNotSetTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.skip_if_not_set`."""
     def setUp(self):
@@ -0,0 +1,57 @@
+"""Tests for module ``robottelo.performance.driver``."""
+import threading
+
+import six
+
+from robottelo.performance.driver import CandlepinDriver
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+
+class CandlepinDriverTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.driver.CandlepinDriver`."""
+    @mock.patch('robottelo.performance.driver.Candlepin')
+    def test_delete(self, candlepin):
+        """Deletions are split between clients and reuse the sessions of
+        the pool threads
+        """
+        sessions = {}
+
+        def single_delete(uuid, client, session):
+            """Record the session used by each thread."""
+            sessions.setdefault(
+                threading.current_thread().name, set()).add(session)
+            return float(uuid)
+        candlepin.single_delete.side_effect = single_delete
+        result = CandlepinDriver(concurrency=3).delete(
+            ['1', '2', '', '4', '5', '6', '7'], clients=3)
+        self.assertEqual(result, {
+            'thread-0': [1.0, 2.0],
+            'thread-1': [4.0],
+            'thread-2': [5.0, 6.0],
+        })
+        self.assertTrue(
+            all(len(session) == 1 for session in sessions.values()))
+        self.assertLessEqual(len(sessions), 3)
+
+    @mock.patch('robottelo.performance.driver.Candlepin')
+    def test_register(self, candlepin):
+        """Registrations are timed by VM"""
+        candlepin.single_register_activation_key.side_effect = (
+            lambda ak_name, org, vm_ip: len(vm_ip))
+        candlepin.single_register_attach.side_effect = (
+            lambda sub_id, org, env, vm_ip: (len(vm_ip), 0.5))
+        driver = CandlepinDriver()
+        self.assertEqual(
+            driver.register_activation_key('ak', 'org', ['a', 'bb'], 2),
+            {'thread-0': [1, 1], 'thread-1': [2, 2]}
+        )
+        self.assertEqual(
+            driver.register_attach('1', 'org', 'Library', ['a', 'bb'], 1),
+            ({'thread-0': [1], 'thread-1': [2]},
+             {'thread-0': [0.5], 'thread-1': [0.5]})
+        )
@@ -1,9 +1,113 @@
 # -*- encoding: utf-8 -*-
 """Tests for Robottelo's hammer helpers"""
+import io
+import os
+import random
+import re
+
 import unittest2
 
 from robottelo.cli import hammer
 
+#: Info outputs recorded from hammer
+RECORDED_INFO_PATH = os.path.join(
+    os.path.dirname(__file__), 'data', 'hammer')
+
+
+def recorded_info_outputs():
+    """Return the lines of the recorded info outputs, by file name."""
+    outputs = {}
+    for filename in sorted(os.listdir(RECORDED_INFO_PATH)):
+        if filename.endswith('_info.txt'):
+            path = os.path.join(RECORDED_INFO_PATH, filename)
+            with io.open(path, encoding='utf-8') as output:
+                outputs[filename] = output.read().split(u'\n')
+    return outputs
+
+
+def is_flat_info(output):
+    """Tell whether the info ``output`` has no sub-properties deeper than
+    the second level, that :func:`legacy_parse_info` merged in their top
+    level property, nor before the first top level property without value,
+    that it parsed under a ``None`` key.
+    """
+    group_indent = None
+    grouped = False
+    for line in output:
+        text = line.lstrip()
+        indent = len(line) - len(text)
+        if not line.startswith(' '):
+            group_indent = None
+            grouped = grouped or line.partition(':')[2].strip() == ''
+            continue
+        if not grouped:
+            return False
+        if group_indent is not None and indent > group_indent:
+            return False
+        group_indent = (
+            indent if text.endswith(':') and not text[:1].isdigit() else None)
+    return True
+
+
+def legacy_parse_info(output):
+    """The info parser :func:`robottelo.cli.hammer.parse_info` must stay
+    compatible with, as it was before being optimized, for outputs with two
+    levels of properties, see :func:`is_flat_info`.
+    """
+    contents = {}
+    sub_prop = None
+    sub_num = None
+
+    for line in output:
+        if line == '':
+            continue
+        if line.startswith(' '):
+            if line.find(':') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+
+            if key is None and value is None:
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+
+                value = match.group(1)
+
+                if isinstance(contents[sub_prop], dict):
+                    contents[sub_prop] = []
+
+                contents[sub_prop].append(value)
+            else:
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    key = re.sub(r'\d+\)', '', key)
+                    contents[sub_prop].append({})
+
+                key = key.lstrip().replace(' ', '-').lower()
+
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value.lstrip()
+                else:
+                    contents[sub_prop][key] = value.lstrip()
+        else:
+            sub_num = None
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:
+                contents[key] = value.lstrip()
+
+    return contents
+
 
 class ParseCSVTestCase(unittest2.TestCase):
     """Tests for parsing CSV hammer output"""
@@ -37,6 +141,64 @@ class ParseCSVTestCase(unittest2.TestCase):
             ]
         )
 
+    def test_parse_raw_csv(self):
+        """Raw output gives the same result as the decoded lines"""
+        output = u'Id,Name\n1,chårs\n2,"multi\nline"\n'
+        expected = [
+            {u'id': u'1', u'name': u'chårs'},
+            {u'id': u'2', u'name': u'multi\nline'},
+        ]
+        self.assertEqual(hammer.parse_csv(output.encode('utf-8')), expected)
+        self.assertEqual(
+            hammer.parse_csv(output.encode('utf-8').split(b'\n')), expected)
+        self.assertEqual(hammer.parse_csv(output.split(u'\n')), expected)
+
+    def test_parse_empty_csv(self):
+        """Output without rows gives an empty list"""
+        self.assertEqual(hammer.parse_csv([u'']), [])
+        self.assertEqual(hammer.parse_csv([u'Id,Name']), [])
+
+    def test_iter_csv(self):
+        """Rows are parsed as they are read"""
+        lines = iter([u'Id,Name', u'1,foo', u'2,bar'])
+        rows = hammer.iter_csv(lines)
+        self.assertEqual(next(rows), {u'id': u'1', u'name': u'foo'})
+        self.assertEqual(list(lines), [u'2,bar'])
+
+
+class ParseCSVColumnsTestCase(unittest2.TestCase):
+    """Tests for parsing CSV hammer output into columns"""
+    output = [
+        u'ID,Name,Content View ID,Repository Count,Repository ID',
+        u'1,foo,3,10,',
+        u'2,bar,4,0,5',
+    ]
+
+    def test_parse_csv_columns(self):
+        """Values are listed by column, in the output order"""
+        columns = hammer.parse_csv_columns(self.output)
+        self.assertEqual(list(columns), [
+            u'id', u'name', u'content-view-id', u'repository-count',
+            u'repository-id'])
+        self.assertEqual(columns[u'id'], [u'1', u'2'])
+        self.assertEqual(columns[u'repository-id'], [u'', u'5'])
+
+    def test_typed(self):
+        """ID and count columns can be converted to integers"""
+        columns = hammer.parse_csv_columns(self.output, typed=True)
+        self.assertEqual(columns[u'id'], [1, 2])
+        self.assertEqual(columns[u'name'], [u'foo', u'bar'])
+        self.assertEqual(columns[u'content-view-id'], [3, 4])
+        self.assertEqual(columns[u'repository-count'], [10, 0])
+        self.assertEqual(columns[u'repository-id'], [None, 5])
+
+    def test_types(self):
+        """Any column can be converted"""
+        columns = hammer.parse_csv_columns(
+            self.output, types={u'name': lambda value: value.upper()})
+        self.assertEqual(columns[u'name'], [u'FOO', u'BAR'])
+        self.assertEqual(columns[u'id'], [u'1', u'2'])
+
 
 class ParseHelpTestCase(unittest2.TestCase):
     """Tests for parsing hammer help output"""
@@ -289,3 +451,160 @@ class ParseInfoTestCase(unittest2.TestCase):
                 ],
             }
         )
+
+    def test_parse_nested(self):
+        """Sub-properties are parsed at any depth"""
+        output = [
+            'Name:         host.example.com',
+            'Content Information:',
+            '    Content View:',
+            '        ID:   1',
+            '        Name: Default Organization View',
+            '    Applicable Packages: 12',
+            '    Activation Keys:',
+            '     1) key1',
+            '     2) key2',
+            'Network interfaces:',
+            ' 1) Id:         3',
+            '    Identifier: eth0',
+            '    Addresses:',
+            '        IPv4: 192.168.100.23',
+            ' 2) Id:         4',
+            'Parameters:',
+            '    enable-epel => false',
+            'Comment:',
+        ]
+        self.assertEqual(
+            hammer.parse_info(output),
+            {
+                'name': 'host.example.com',
+                'content-information': {
+                    'content-view': {
+                        'id': '1',
+                        'name': 'Default Organization View',
+                    },
+                    'applicable-packages': '12',
+                    'activation-keys': ['key1', 'key2'],
+                },
+                'network-interfaces': [
+                    {
+                        'id': '3',
+                        'identifier': 'eth0',
+                        'addresses': {'ipv4': '192.168.100.23'},
+                    },
+                    {'id': '4'},
+                ],
+                'parameters': {'enable-epel': 'false'},
+                'comment': {},
+            }
+        )
+
+
+class ParseInfoEquivalenceTestCase(unittest2.TestCase):
+    """Tests comparing :func:`robottelo.cli.hammer.parse_info` with the
+    legacy implementation.
+    """
+    #: Lines info outputs are made of, properties without value are followed
+    #: by indented sub-properties
+    fuzz_lines = (
+        u'Name:   value',
+        u'Content View:',
+        u'Empty:   ',
+        u'Uptime (seconds):',
+        u' Sub Prop: sub value',
+        u'    Sub Prop: http://url:8080',
+        u'    param => value',
+        u'    key=>value',
+        u' value',
+        u'    value with spaces ',
+        u' 1) value',
+        u' 1)  spaced value',
+        u' 1) Repo Name: repo1',
+        u'    Repo ID:   10',
+        u' 2) value',
+        u' 2) Repo Name: repo2',
+        u'    10) ID: 10',
+        u'        Nested: value',
+        u'  Ünicode:   välue',
+        u'',
+        u'Bad line',
+    )
+
+    def assert_equivalent(self, output):
+        """Assert both parsers give the same result or the same error."""
+        if not is_flat_info(output):
+            return
+        try:
+            expected = legacy_parse_info(output)
+        except Exception as err:  # pylint:disable=broad-except
+            with self.assertRaises(type(err), msg=output):
+                hammer.parse_info(output)
+        else:
+            self.assertEqual(hammer.parse_info(output), expected, output)
+
+    def test_recorded_outputs(self):
+        """Recorded hammer outputs with two levels are parsed as before"""
+        outputs = recorded_info_outputs()
+        self.assertGreater(len(outputs), 0)
+        for output in outputs.values():
+            if is_flat_info(output):
+                self.assertEqual(
+                    hammer.parse_info(output), legacy_parse_info(output))
+
+    def test_recorded_nested_output(self):
+        """Deeper sub-properties are nested, the other ones are parsed as
+        before"""
+        output = recorded_info_outputs()['host_info.txt']
+        self.assertFalse(is_flat_info(output))
+        result = hammer.parse_info(output)
+        legacy = legacy_parse_info(output)
+        self.assertEqual(
+            result['content-information']['content-view'],
+            {u'id': u'4', u'name': u'cv_eFhZqB'}
+        )
+        self.assertEqual(
+            result['content-information']['kickstart-repository'],
+            {u'id': u'', u'name': u''}
+        )
+        self.assertEqual(
+            result['content-information']['applicable-packages'], u'12')
+        for key in legacy:
+            if key != 'content-information':
+                self.assertEqual(result[key], legacy[key], key)
+
+    def test_fuzz(self):
+        """Random outputs are parsed as before"""
+        fuzz = random.Random(42)
+        for _ in range(2000):
+            output = [u'Header:'] + [
+                fuzz.choice(self.fuzz_lines)
+                for _ in range(fuzz.randint(0, 12))
+            ]
+            self.assert_equivalent(output)
+
+    def test_fuzz_recorded_outputs(self):
+        """Recorded hammer outputs with lines removed are parsed as before"""
+        fuzz = random.Random(42)
+        for output in recorded_info_outputs().values():
+            for _ in range(200):
+                self.assert_equivalent([
+                    line for line in output if fuzz.random() > 0.2])
+
+
+class ParseJSONTestCase(unittest2.TestCase):
+    """Tests for normalizing JSON hammer output"""
+    def test_parse_json(self):
+        self.assertEqual(
+            hammer.parse_json({
+                u'Message': u'Architecture created',
+                u'Id': 5,
+                u'Name': None,
+                u'Operating Systems': [{u'Id': 1, u'Default': True}],
+            }),
+            {
+                u'message': u'Architecture created',
+                u'id': u'5',
+                u'name': u'',
+                u'operating-systems': [{u'id': u'1', u'default': u'true'}],
+            }
+        )
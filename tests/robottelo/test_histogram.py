@@ -0,0 +1,106 @@
+"""Tests for module ``robottelo.performance.histogram``."""
+import csv
+import os
+import random
+import shutil
+import tempfile
+import threading
+
+import numpy
+
+from robottelo.performance.histogram import HdrHistogram, Recorder
+from robottelo.performance.stat import generate_stat_for_histogram
+from unittest2 import TestCase
+
+
+class HdrHistogramTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.histogram.HdrHistogram`."""
+    def test_percentiles(self):
+        """Percentiles are within the precision of the histogram"""
+        generator = random.Random(1)
+        values = [generator.lognormvariate(0, 1) for _ in range(20000)]
+        histogram = HdrHistogram()
+        for value in values:
+            histogram.record(value)
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 20000)
+        self.assertEqual(summary['min'], min(values))
+        self.assertEqual(summary['max'], max(values))
+        self.assertAlmostEqual(summary['mean'], numpy.mean(values))
+        self.assertAlmostEqual(summary['std'], numpy.std(values))
+        for percent in (50, 90, 95, 99, 99.9):
+            expected = numpy.percentile(values, percent)
+            self.assertLess(
+                abs(summary['p{0:g}'.format(percent)] - expected),
+                0.01 * expected
+            )
+
+    def test_range(self):
+        """Durations out of range are counted in the first and last
+        buckets
+        """
+        histogram = HdrHistogram(lowest=0.001, highest=10)
+        self.assertIsNone(histogram.percentile(50))
+        size = len(histogram.counts)
+        histogram.record(0)
+        histogram.record(0.0001)
+        histogram.record(1000)
+        self.assertEqual(len(histogram.counts), size)
+        self.assertEqual(histogram.percentile(50), 0.001)
+        self.assertEqual(histogram.percentile(100), 1000)
+
+    def test_merge(self):
+        """Merged histograms count the durations of both"""
+        first, second = HdrHistogram(), HdrHistogram()
+        first.record(1)
+        second.record(2, count=3)
+        first.merge(second)
+        self.assertEqual(
+            (first.count, first.minimum, first.maximum), (4, 1, 2))
+        self.assertAlmostEqual(first.percentile(50), 2, delta=0.02)
+        with self.assertRaises(ValueError):
+            first.merge(HdrHistogram(significant_figures=3))
+
+
+class RecorderTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.histogram.Recorder`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_threads_and_windows(self):
+        """Durations of all threads are merged by window"""
+        recorder = Recorder(window=10)
+        start = recorder.start
+
+        def record(offset):
+            """Record durations in two windows."""
+            for value in range(1, 11):
+                recorder.record(value, start + offset)
+        threads = [
+            threading.Thread(target=record, args=(offset,))
+            for offset in (1, 2, 25)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        windows = recorder.windows()
+        self.assertEqual(
+            [(window_start - start, histogram.count)
+             for window_start, histogram in windows],
+            [(0, 20), (20, 10)]
+        )
+        self.assertEqual(recorder.histogram().count, 30)
+
+        stat_file_name = os.path.join(self.tmpdir, 'stat.csv')
+        stat = generate_stat_for_histogram(
+            'client-0', recorder, stat_file_name)
+        self.assertEqual(sorted(stat), [0, 1])
+        with open(stat_file_name) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows[1], ['client-0'])
+        self.assertEqual(
+            [row[:2] for row in rows[3:]],
+            [['0', '20'], ['20', '10'], ['all', '30']]
+        )
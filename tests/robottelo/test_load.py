@@ -0,0 +1,81 @@
+"""Tests for module ``robottelo.performance.load``."""
+import time
+
+from robottelo.performance.load import (
+    LoadGenerator,
+    constant_arrivals,
+    poisson_arrivals,
+    ramp_arrivals,
+    step_arrivals,
+)
+from unittest2 import TestCase
+
+
+class ArrivalsTestCase(TestCase):
+    """Tests for the arrival schedules."""
+    def test_constant(self):
+        """Operations are evenly spaced"""
+        self.assertEqual(
+            list(constant_arrivals(4, count=3)), [0, 0.25, 0.5])
+        self.assertEqual(
+            list(constant_arrivals(2, duration=2)), [0, 0.5, 1, 1.5])
+        with self.assertRaises(ValueError):
+            list(constant_arrivals(2))
+
+    def test_ramp(self):
+        """The rate grows linearly"""
+        offsets = list(ramp_arrivals(0, 10, 10))
+        # 50 operations are started while the rate goes from 0 to 10
+        self.assertEqual(len(offsets), 50)
+        intervals = [
+            second - first for first, second in zip(offsets, offsets[1:])]
+        self.assertEqual(intervals, sorted(intervals, reverse=True))
+        self.assertEqual(
+            list(ramp_arrivals(2, 2, 2)), list(constant_arrivals(2, 4)))
+
+    def test_step(self):
+        """Each step has its own rate"""
+        self.assertEqual(
+            list(step_arrivals([(1, 2), (4, 1)])),
+            [0, 1, 2, 2.25, 2.5, 2.75]
+        )
+
+    def test_poisson(self):
+        """Seeded schedules are reproducible and have the average rate"""
+        offsets = list(poisson_arrivals(10, count=2000, seed=1))
+        self.assertEqual(offsets, list(poisson_arrivals(10, 2000, seed=1)))
+        self.assertAlmostEqual(len(offsets) / offsets[-1], 10, delta=1)
+        self.assertLess(offsets[-1], max(poisson_arrivals(10, 2001, seed=1)))
+
+
+class LoadGeneratorTestCase(TestCase):
+    """Tests for :class:`robottelo.performance.load.LoadGenerator`."""
+    def test_coordinated_omission(self):
+        """Operations queued behind busy workers have a corrected latency
+        including their wait
+        """
+        def operation(worker, index):
+            """Take longer than the interval between operations."""
+            time.sleep(0.05)
+            if index == 3:
+                raise ValueError(index)
+            return index * 10
+
+        result = LoadGenerator(
+            operation, constant_arrivals(100, count=6), workers=2).run()
+        self.assertEqual(
+            [sample.index for sample in result.samples], list(range(6)))
+        self.assertIsInstance(result.samples[3].error, ValueError)
+        last = result.samples[-1]
+        self.assertGreaterEqual(last.wait, 0.04)
+        self.assertAlmostEqual(
+            last.latency, last.wait + last.service_time)
+        summary = result.summary()
+        self.assertEqual((summary['count'], summary['errors']), (6, 1))
+        self.assertAlmostEqual(summary['offered_rate'], 100, delta=1)
+        self.assertGreater(
+            summary['latency']['max'], summary['service_time']['max'])
+        time_result_dict = result.time_result_dict('value')
+        self.assertEqual(sorted(time_result_dict), ['thread-0', 'thread-1'])
+        self.assertEqual(
+            sorted(sum(time_result_dict.values(), [])), [0, 10, 20, 40, 50])
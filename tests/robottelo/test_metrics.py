@@ -0,0 +1,146 @@
+"""Tests for module ``robottelo.metrics``."""
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+import six
+
+from robottelo import metrics
+from robottelo.cli.org import Org
+from robottelo.metrics import CommandMetrics, CommandTiming
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+
+class CommandMetricsTestCase(TestCase):
+    """Tests for :class:`robottelo.metrics.CommandMetrics`."""
+    def test_summary(self):
+        """Percentiles are estimated within the histogram precision"""
+        command_metrics = CommandMetrics()
+        for value in range(1, 1001):
+            command_metrics.add(CommandTiming(
+                'organization', 'info', 0, value / 1000.0,
+                {'execute': 1.0}, None))
+        command_metrics.add(CommandTiming(
+            'organization', 'info', 0, 10 ** 6, {}, None))
+        phases = command_metrics.summary()[0]['phases']
+        self.assertEqual(sorted(phases), ['execute', 'total'])
+        summary = phases['total']
+        self.assertEqual(summary['count'], 1001)
+        self.assertEqual(summary['min'], 0.001)
+        self.assertEqual(summary['max'], 10 ** 6)
+        self.assertAlmostEqual(summary['total'], 10 ** 6 + 500.5)
+        for percent in (50, 90, 99):
+            self.assertLessEqual(
+                abs(summary['p{0}'.format(percent)] - percent / 100.0),
+                0.1 * percent / 100.0
+            )
+
+
+class CommandTestCase(TestCase):
+    """Tests for :func:`robottelo.metrics.command` and the hooks."""
+    def setUp(self):
+        self.hook = mock.Mock()
+        metrics.add_hook(self.hook)
+        self.addCleanup(metrics.remove_hook, self.hook)
+        self.addCleanup(metrics.METRICS.clear)
+
+    def test_nested(self):
+        """Only the outermost command is recorded, with all the phases"""
+        with metrics.command('organization', 'info'):
+            with metrics.command('ssh'):
+                metrics.add('execute', 0.5)
+                metrics.add('execute', 0.25)
+            with metrics.phase('parse'):
+                pass
+        timing = self.hook.call_args[0][0]
+        self.assertEqual(self.hook.call_count, 1)
+        self.assertEqual(
+            (timing.command_base, timing.command_sub),
+            ('organization', 'info')
+        )
+        self.assertEqual(sorted(timing.phases), ['execute', 'parse'])
+        self.assertEqual(timing.phases['execute'], 0.75)
+        summary = metrics.METRICS.summary()
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]['phases']['execute']['count'], 1)
+
+    def test_disabled(self):
+        """Nothing is recorded without hooks and report"""
+        metrics.remove_hook(self.hook)
+        with metrics.command('organization', 'info'):
+            metrics.add('execute', 0.5)
+        metrics.add_hook(self.hook)
+        self.assertFalse(self.hook.called)
+        self.assertEqual(metrics.METRICS.summary(), [])
+
+    def test_hook_error(self):
+        """Errors of the hooks do not fail the commands"""
+        self.hook.side_effect = ValueError
+        with metrics.command('organization', 'info'):
+            pass
+        self.assertTrue(self.hook.called)
+
+    @mock.patch('robottelo.ssh._exec_command')
+    def test_cli(self, exec_command):
+        """Commands run by the CLI classes are timed"""
+        def run(cmd, hostname, timeout):
+            """Pretend the command took time."""
+            metrics.add('connect', 0.1)
+            metrics.add('execute', 0.2)
+            return b'Id: 1\nName: org\n', b'', 0
+        exec_command.side_effect = run
+        Org.info({'id': 1})
+        timing = self.hook.call_args[0][0]
+        self.assertEqual(
+            (timing.command_base, timing.command_sub),
+            ('organization', 'info')
+        )
+        self.assertEqual(
+            sorted(timing.phases), ['connect', 'execute', 'parse'])
+        self.assertEqual(timing.command, u'organization info --id="1"')
+
+
+class WriteReportTestCase(TestCase):
+    """Tests for :meth:`robottelo.metrics.CommandMetrics.write_report`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.metrics = CommandMetrics()
+        self.metrics.add(CommandTiming(
+            'organization', 'create', 0, 2.0, {'execute': 1.5}, None))
+        self.metrics.add(
+            CommandTiming('ssh', '', 0, 3.0, {'connect': 1}, 'ls'))
+
+    def test_json(self):
+        """The JSON report has the summary of every command"""
+        path = os.path.join(self.tmpdir, 'reports', 'metrics.json')
+        self.metrics.write_report(path)
+        with open(path) as report:
+            commands = json.load(report)['commands']
+        self.assertEqual(
+            [item['command_base'] for item in commands],
+            ['ssh', 'organization']
+        )
+        self.assertEqual(
+            commands[1]['phases']['execute']['p50'], 1.5)
+
+    def test_csv(self):
+        """The CSV report has a row per command and phase"""
+        path = os.path.join(self.tmpdir, 'metrics.csv')
+        self.metrics.write_report(path, 'csv')
+        with open(path) as report:
+            rows = list(csv.reader(report))
+        self.assertEqual(rows[0][:3], ['command', 'phase', 'count'])
+        self.assertEqual(
+            [row[:2] for row in rows[1:]],
+            [['ssh', 'connect'], ['ssh', 'total'],
+             ['organization create', 'execute'],
+             ['organization create', 'total']]
+        )
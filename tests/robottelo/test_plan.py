@@ -0,0 +1,64 @@
+"""Tests for module ``robottelo.plan``."""
+import threading
+import time
+import unittest2
+
+from robottelo.plan import Plan, PlanError
+
+
+class PlanTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.plan.Plan`."""
+    def test_requirements(self):
+        """Steps receive the results of the steps they require"""
+        plan = Plan()
+        plan.step('sum', lambda inputs: inputs['a'] + inputs['b'],
+                  requires=('a', 'b'))
+        plan.step('a', lambda inputs: 1)
+        plan.step('b', lambda inputs: inputs['a'] + 1, requires=('a',))
+        self.assertEqual(plan.run(), {'a': 1, 'b': 2, 'sum': 3})
+        self.assertEqual(plan.critical_path, ['a', 'b', 'sum'])
+
+    def test_parallel_steps(self):
+        """Independent steps run at the same time"""
+        barrier = threading.Event()
+        plan = Plan()
+        plan.step('wait', lambda inputs: barrier.wait(5))
+        plan.step('set', lambda inputs: barrier.set())
+        results = plan.run()
+        self.assertTrue(results['wait'])
+
+    def test_given_value(self):
+        """Steps with a value are not run"""
+        plan = Plan()
+        plan.step('a', lambda inputs: self.fail('should not run'), value=5)
+        plan.step('b', lambda inputs: inputs['a'] * 2, requires=('a',))
+        self.assertEqual(plan.run()['b'], 10)
+        self.assertNotIn('a', plan.times)
+
+    def test_step_error(self):
+        """A failing step stops the plan and its error is raised"""
+        ran = []
+
+        def fail(inputs):
+            """Fail after a while"""
+            time.sleep(0.05)
+            raise ValueError('failed')
+
+        plan = Plan()
+        plan.step('fail', fail)
+        plan.step('next', lambda inputs: ran.append(1), requires=('fail',))
+        with self.assertRaises(ValueError):
+            plan.run()
+        self.assertEqual(ran, [])
+
+    def test_invalid_plans(self):
+        """Unknown requirements and cycles are reported"""
+        plan = Plan()
+        plan.step('a', lambda inputs: 1, requires=('b',))
+        with self.assertRaises(PlanError):
+            plan.run()
+        plan.step('b', lambda inputs: 1, requires=('a',))
+        with self.assertRaises(PlanError):
+            plan.run()
+        with self.assertRaises(PlanError):
+            plan.step('b', lambda inputs: 1)
@@ -0,0 +1,124 @@
+"""Tests for module ``robottelo.profiler``."""
+import json
+import os
+import shutil
+import tempfile
+
+import six
+
+from nailgun import client
+from robottelo import metrics
+from robottelo.metrics import CommandTiming
+from robottelo.profiler import OUTSIDE_TESTS, RemoteCallProfiler
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+
+def timing(command, duration):
+    """Return the timing of a hammer ``command``."""
+    return CommandTiming('organization', 'info', 0, duration, {}, command)
+
+
+class RemoteCallProfilerTestCase(TestCase):
+    """Tests for :class:`robottelo.profiler.RemoteCallProfiler`."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.addCleanup(metrics.METRICS.clear)
+        self.config = mock.Mock()
+        self.options = {
+            'remote_profile_top': 10,
+            'remote_profile_report': os.path.join(self.tmpdir, 'calls.json'),
+        }
+        self.config.getoption.side_effect = self.options.get
+        self.config.slaveinput = {}
+        self.profiler = RemoteCallProfiler(self.config)
+
+    def run_session(self):
+        """Run two modules of tests making remote calls."""
+        profile = self.profiler.profile
+        self.profiler.pytest_sessionstart(None)
+        try:
+            profile.add(timing(u'organization list', 1))
+            for nodeid, commands in (
+                    ('test_a.py::test_1', ((u'org info --id="1"', 2),)),
+                    ('test_a.py::test_2', ((u'org info --id="1"', 1),
+                                           (u'org info --id="2"', 1),
+                                           (u'org info --id="1"', 1))),
+                    ('test_b.py::test_3', ())):
+                self.profiler.pytest_runtest_logstart(nodeid, None)
+                for command, duration in commands:
+                    profile.add(timing(command, duration))
+                self.profiler.pytest_runtest_logfinish(nodeid, None)
+        finally:
+            self.profiler.pytest_sessionfinish(None)
+
+    def test_profile(self):
+        """Calls are attributed to the test running them"""
+        self.run_session()
+        profile = self.profiler.profile
+        self.assertEqual(
+            dict((test, (totals.count, totals.duration))
+                 for test, totals in profile.tests.items()),
+            {
+                OUTSIDE_TESTS: (1, 1),
+                'test_a.py::test_1': (1, 2),
+                'test_a.py::test_2': (3, 3),
+            }
+        )
+        self.assertEqual(profile.commands[u'org info --id="1"'].count, 3)
+        self.assertEqual(
+            profile.command_tests[u'org info --id="1"'],
+            set(['test_a.py::test_1', 'test_a.py::test_2'])
+        )
+        self.assertEqual(profile.modules()['test_a.py'].duration, 5)
+        with open(self.options['remote_profile_report']) as report:
+            data = json.load(report)
+        self.assertEqual(data['tests']['test_a.py::test_2']['count'], 3)
+        self.assertEqual(len(data['commands']), 3)
+
+    def test_terminal_summary(self):
+        """The report lists the tests, repeated commands and modules"""
+        self.run_session()
+        reporter = mock.Mock()
+        self.profiler.pytest_terminal_summary(reporter)
+        lines = [call[0][0] for call in reporter.write_line.call_args_list]
+        self.assertEqual(lines[1].split(), ['3', '3.00s', 'test_a.py::test_2'])
+        repeated = lines.index(
+            'Commands run the most often with the same arguments:')
+        self.assertEqual(
+            lines[repeated + 1].split(),
+            ['3', '4.00s', '2', 'tests', 'org', 'info', '--id="1"']
+        )
+        self.assertEqual(lines[repeated + 2], '')
+        modules = lines.index('Remote calls by module:')
+        self.assertEqual(
+            [line.split() for line in lines[modules + 1:]],
+            [['4', '5.00s', 'test_a.py'], ['1', '1.00s', OUTSIDE_TESTS]]
+        )
+
+    def test_nailgun(self):
+        """NailGun requests are timed during the session only"""
+        get = client.get
+        hook = mock.Mock()
+        metrics.add_hook(hook)
+        self.addCleanup(metrics.remove_hook, hook)
+        self.profiler.pytest_sessionstart(None)
+        try:
+            with mock.patch('nailgun.client.requests') as requests:
+                client.get('https://sat/api/v2/ping', verify=False)
+                client.request('POST', 'https://sat/api/v2/hosts')
+            self.assertEqual(requests.get.call_count, 1)
+        finally:
+            self.profiler.pytest_sessionfinish(None)
+        self.assertIs(client.get, get)
+        self.assertEqual(
+            [call[0][0].command for call in hook.call_args_list],
+            [u'GET https://sat/api/v2/ping', u'POST https://sat/api/v2/hosts']
+        )
+        self.assertEqual(
+            self.profiler.profile.tests[OUTSIDE_TESTS].count, 2)
@@ -0,0 +1,187 @@
+"""Tests for module ``robottelo.simulator``."""
+import six
+
+from robottelo import ssh
+from robottelo.cli import factory, rest
+from robottelo.cli.activationkey import ActivationKey
+from robottelo.cli.contentview import ContentView
+from robottelo.cli.org import Org
+from robottelo.config import settings
+from robottelo.simulator import (
+    DATA_RETURN_CODE,
+    HammerSimulator,
+    NOT_FOUND_RETURN_CODE,
+    SatelliteState,
+    Simulator,
+    SimulatorError,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+HAMMER = (u'LANG=en_US.UTF-8 time -p hammer -v -u admin -p changeme '
+          u'{0} {1}')
+
+
+class HammerSimulatorTestCase(TestCase):
+    """Tests for :class:`robottelo.simulator.HammerSimulator`."""
+    def setUp(self):
+        self.wait = mock.Mock()
+        self.hammer = HammerSimulator(SatelliteState(), self.wait)
+
+    def run_hammer(self, command, output_format=''):
+        """Run a hammer command and return its decoded output."""
+        if output_format:
+            output_format = u'--output={0}'.format(output_format)
+        stdout, stderr, return_code = self.hammer.run(
+            HAMMER.format(output_format, command).encode('utf-8'))
+        return stdout.decode('utf-8'), stderr.decode('utf-8'), return_code
+
+    def test_parse_command(self):
+        """Hammer command lines are split in command and options"""
+        self.assertEqual(
+            HammerSimulator.parse_command(HAMMER.format(
+                u'--output=csv',
+                u'content-view version promote --id="1" --async '
+                u'--search="name=\\"a b\\""'
+            )),
+            (u'content-view', u'version promote', {
+                u'id': u'1', u'async': True, u'search': u'name="a b"'
+            }, u'csv')
+        )
+        self.assertIsNone(HammerSimulator.parse_command(u'rm -rf /tmp/a'))
+
+    def test_create_info_list(self):
+        """Created entities can be read and listed"""
+        stdout, _, return_code = self.run_hammer(
+            u'organization create --name="org 1"', 'csv')
+        self.assertEqual(return_code, 0)
+        self.assertEqual(
+            stdout, u'Message,ID,Name\nOrganization created,1,org 1\n')
+        self.wait.assert_called_once_with(u'organization', u'create')
+        self.run_hammer(
+            u'product create --name="prod, 1" --organization="org 1"')
+        stdout = self.run_hammer(u'product info --id="1"')[0]
+        self.assertIn(u'Name: prod, 1\n', stdout)
+        self.assertIn(u'Organization: org 1\n', stdout)
+        self.assertEqual(
+            self.run_hammer(
+                u'product list --organization-id="1" --per-page="1"', 'csv'
+            )[0].splitlines()[1],
+            u'1,"prod, 1",,org 1,0,'
+        )
+        self.assertEqual(
+            self.run_hammer(
+                u'subscription list --organization-id="1"', 'json')[0],
+            u'[{"ID": "1", "Name": "prod, 1", "Quantity": "-1", '
+            u'"Consumed": "0"}]'
+        )
+        self.assertEqual(
+            self.run_hammer(u'organization delete --name="org 1"')[2], 0)
+        self.assertEqual(
+            self.run_hammer(u'organization list', 'csv')[0],
+            u'ID,Name,Label,Description\n'
+        )
+
+    def test_errors(self):
+        """Invalid commands fail like hammer does"""
+        self.run_hammer(u'organization create --name="org"')
+        _, stderr, return_code = self.run_hammer(
+            u'organization create --name="org"')
+        self.assertEqual(return_code, DATA_RETURN_CODE)
+        self.assertIn(u'Name has already been taken', stderr)
+        self.assertEqual(
+            self.run_hammer(u'organization info --id="2"')[2],
+            DATA_RETURN_CODE
+        )
+        self.assertEqual(
+            self.hammer.run(b'ls /tmp')[2], NOT_FOUND_RETURN_CODE)
+
+    def test_unknown_parameter(self):
+        """Only the ID parameters of the API are accepted"""
+        state = self.hammer.state
+        org_id = state.create('organization', {'name': u'org'})['id']
+        with self.assertRaises(SimulatorError):
+            state.create('activation-key', {
+                'name': u'ak',
+                'organization_id': org_id,
+                'lifecycle_environment_id': 1,
+            })
+        with self.assertRaises(SimulatorError):
+            state.list('content-view', {'lifecycle_environment_id': 1})
+
+
+class SimulatorTestCase(TestCase):
+    """Tests for :class:`robottelo.simulator.Simulator`, running the CLI
+    factories against it.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.simulator = Simulator(latencies={'repository synchronize': 0.01})
+        cls.simulator.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        ssh.close_pooled_connections()
+        cls.simulator.stop()
+
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings.server,
+            admin_username='admin',
+            admin_password='changeme',
+            hostname=None,
+            port=None,
+            scheme=None,
+            ssh_key=None,
+            ssh_password='simulator',
+            ssh_port=None,
+            ssh_username='root',
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.simulator.configure_server(settings.server)
+
+    def test_setup_org_for_a_custom_repo(self):
+        """The factories run over SSH against the simulator"""
+        org = factory.make_org()
+        self.assertEqual(Org.info({'id': org['id']})['name'], org['name'])
+        result = factory.setup_org_for_a_custom_repo({
+            u'url': u'http://example.com/repo',
+            u'organization-id': org['id'],
+        })
+        content_view = ContentView.info({u'id': result['content-view-id']})
+        self.assertEqual(content_view['versions'][0]['version'], u'1.0')
+
+    def test_rest(self):
+        """The API backend runs against the simulator"""
+        with rest.enabled():
+            org = factory.make_org()
+            self.assertIn(org['id'], [item['id'] for item in Org.list()])
+            Org.delete({u'id': org['id']})
+            self.assertNotIn(org['id'], [item['id'] for item in Org.list()])
+
+    def test_rest_lifecycle_environment(self):
+        """Activation keys get their lifecycle environment through the API
+        backend, given by ID or by name"""
+        with rest.enabled():
+            org = factory.make_org()
+            library = factory.make_activation_key({
+                u'organization-id': org['id'],
+                u'lifecycle-environment': u'Library',
+            })
+            self.assertEqual(library['lifecycle-environment'], u'Library')
+            env = factory.make_lifecycle_environment({
+                u'organization-id': org['id']})
+            activation_key = factory.make_activation_key({
+                u'organization-id': org['id'],
+                u'lifecycle-environment-id': env['id'],
+            })
+            self.assertEqual(
+                ActivationKey.info({u'id': activation_key['id']})[
+                    'lifecycle-environment'],
+                env['name']
+            )
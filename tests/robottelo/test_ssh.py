@@ -1,9 +1,13 @@
 """Tests for module ``robottelo.ssh``."""
 # (too-many-public-methods) pylint: disable=R0904
 import os
+import shutil
+import tempfile
+
 import six
 
 from robottelo import ssh
+from robottelo.cassette import CassetteError, use_cassette
 from unittest2 import TestCase
 
 if six.PY2:
@@ -12,6 +16,99 @@ else:
     from unittest import mock
 
 
+class MockChannel(object):
+    """A mock ``paramiko.Channel`` object.
+
+    The command output is taken from the transport ``outputs`` or is ``out:
+    <command>`` and commands starting with ``false`` exit with status 1 and
+    write to stderr.
+    """
+    def __init__(self, transport):
+        self.transport = transport
+        self.stdout = []
+        self.stderr = []
+        self.exit_status = None
+        # select.select needs a real file descriptor, make it always readable
+        self._read_fd, self._write_fd = os.pipe()
+        os.write(self._write_fd, b'x')
+
+    def fileno(self):
+        """Return a readable file descriptor."""
+        return self._read_fd
+
+    def settimeout(self, timeout):
+        """A no-op stub method."""
+
+    def exec_command(self, cmd):
+        """Produce the command output."""
+        if cmd in self.transport.outputs:
+            self.stdout.extend(self.transport.outputs[cmd])
+        else:
+            self.stdout.append('out: {0}'.format(cmd).encode('utf-8'))
+        if cmd.startswith('false'):
+            self.stderr.append(b'error')
+            self.exit_status = 1
+        else:
+            self.exit_status = 0
+
+    def recv_ready(self):
+        """Return whether there is stdout data to read."""
+        return len(self.stdout) > 0
+
+    def recv(self, nbytes):  # pylint:disable=W0613
+        """Return a chunk of stdout."""
+        return self.stdout.pop(0)
+
+    def recv_stderr_ready(self):
+        """Return whether there is stderr data to read."""
+        return len(self.stderr) > 0
+
+    def recv_stderr(self, nbytes):  # pylint:disable=W0613
+        """Return a chunk of stderr."""
+        return self.stderr.pop(0)
+
+    def exit_status_ready(self):
+        """Return whether the command has finished."""
+        return self.exit_status is not None
+
+    def recv_exit_status(self):
+        """Return the command exit status."""
+        return self.exit_status
+
+    def close(self):
+        """Close the file descriptors and update the transport counters."""
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+        self.transport.open_channels -= 1
+
+
+class MockTransport(object):
+    """A mock ``paramiko.Transport`` object."""
+    def __init__(self):
+        self.active = True
+        self.keepalive = None
+        self.open_channels = 0
+        self.max_open_channels = 0
+        self.outputs = {}
+        self.sessions = 0
+
+    def open_session(self):
+        """Return a new mock channel."""
+        self.sessions += 1
+        self.open_channels += 1
+        self.max_open_channels = max(
+            self.max_open_channels, self.open_channels)
+        return MockChannel(self)
+
+    def is_active(self):
+        """Return whether the transport is active."""
+        return self.active
+
+    def set_keepalive(self, interval):
+        """Record the keepalive interval."""
+        self.keepalive = interval
+
+
 class MockSSHClient(object):
     """A mock ``paramiko.SSHClient`` object."""
     def __init__(self):
@@ -30,6 +127,11 @@ class MockSSHClient(object):
         self.username = None
         self.key_filename = None
         self.password = None
+        self.transport = MockTransport()
+
+    def get_transport(self):
+        """Return the mock transport."""
+        return self.transport
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -58,6 +160,7 @@ class MockSSHClient(object):
     def close(self):
         """A no-op stub method."""
         self.close_ += 1
+        self.transport.active = False
 
 
 class SSHTestCase(TestCase):
@@ -118,3 +221,264 @@ class SSHTestCase(TestCase):
         self.assertEqual(connection.set_missing_host_key_policy_, 1)
         self.assertEqual(connection.connect_, 1)
         self.assertEqual(connection.close_, 1)
+
+
+@mock.patch('robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+class SSHConnectionPoolTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh.SSHConnectionPool`."""
+    def setUp(self):
+        self.pool = ssh.SSHConnectionPool(keepalive=15)
+        self.args = ('example.com', 'nobody', 'password', None)
+
+    def test_reuse_connection(self):
+        """A released connection is handed out again without a new
+        handshake.
+        """
+        client = self.pool.acquire(*self.args)
+        self.assertEqual(client.transport.keepalive, 15)
+        self.pool.release(client, 'example.com', 'nobody', None)
+        self.assertIs(self.pool.acquire(*self.args), client)
+        self.assertEqual(client.connect_, 1)
+        self.assertEqual(client.close_, 0)
+        stats = self.pool.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['handshakes'], 1)
+
+    def test_connections_per_key(self):
+        """Connections are not shared between different users."""
+        client = self.pool.acquire(*self.args)
+        self.pool.release(client, 'example.com', 'nobody', None)
+        other = self.pool.acquire('example.com', 'root', 'password', None)
+        self.assertIsNot(other, client)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+
+    def test_replace_dead_connection(self):
+        """A connection whose transport is not active is replaced."""
+        client = self.pool.acquire(*self.args)
+        self.pool.release(client, 'example.com', 'nobody', None)
+        client.transport.active = False
+        new_client = self.pool.acquire(*self.args)
+        self.assertIsNot(new_client, client)
+        self.assertEqual(client.close_, 1)
+        self.assertEqual(self.pool.stats()['evictions'], 1)
+
+    def test_evict_idle_connection(self):
+        """Idle connections older than ``max_idle_time`` are closed."""
+        self.pool.max_idle_time = -1
+        client = self.pool.acquire(*self.args)
+        self.pool.release(client, 'example.com', 'nobody', None)
+        self.assertIsNot(self.pool.acquire(*self.args), client)
+        self.assertEqual(client.close_, 1)
+
+    def test_max_size(self):
+        """Connections exceeding ``max_size`` are closed on release."""
+        self.pool.max_size = 1
+        first = self.pool.acquire(*self.args)
+        second = self.pool.acquire(*self.args)
+        self.pool.release(first, 'example.com', 'nobody', None)
+        self.pool.release(second, 'example.com', 'nobody', None)
+        self.assertEqual(first.close_, 0)
+        self.assertEqual(second.close_, 1)
+
+    def test_close_all(self):
+        """All idle connections are closed."""
+        client = self.pool.acquire(*self.args)
+        self.pool.release(client, 'example.com', 'nobody', None)
+        self.pool.close_all()
+        self.assertEqual(client.close_, 1)
+        self.assertEqual(self.pool.stats()['idle'], 0)
+
+    @mock.patch('robottelo.ssh.settings')
+    def test_pooled_connection_discard_on_error(self, settings):
+        """A connection used by a failing block is not reused."""
+        settings.server.ssh_connection_pool = True
+        with mock.patch('robottelo.ssh._connection_pool', self.pool):
+            with self.assertRaises(ValueError):
+                with ssh._get_pooled_connection(  # pylint:disable=W0212
+                        'example.com', 'nobody', 'password') as connection:
+                    raise ValueError
+            self.assertEqual(connection.close_, 1)
+            with ssh._get_pooled_connection(  # pylint:disable=W0212
+                    'example.com', 'nobody', 'password') as new_connection:
+                self.assertIsNot(new_connection, connection)
+            self.assertEqual(new_connection.close_, 0)
+
+
+class BuildResultTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh._build_result`."""
+    output = (
+        u'[ INFO 2016-05-03] Rails output\n'
+        u'Id,Name,Description\n'
+        u'1,\x1b[1mch\xe5rs\x1b[0m,""\n'
+    ).encode('utf-8')
+
+    def test_csv(self):
+        """CSV output is cleaned up and parsed from the raw bytes"""
+        result = ssh._build_result(self.output, b'', 0, 'csv')
+        self.assertEqual(result.stdout, [
+            {u'id': u'1', u'name': u'ch\xe5rs', u'description': u''}])
+
+    def test_csv_error(self):
+        """The output lines of failed commands are decoded"""
+        result = ssh._build_result(self.output, b'Error', 1, 'csv')
+        self.assertEqual(result.stdout, [
+            u'Id,Name,Description', u'1,ch\xe5rs,', u''])
+        self.assertEqual(result.stderr, u'Error')
+
+
+@mock.patch('robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+class CommandManyTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh.command_many`."""
+    def setUp(self):
+        self.pool = ssh.SSHConnectionPool()
+        self.pool_patcher = mock.patch('robottelo.ssh._connection_pool',
+                                       self.pool)
+        self.pool_patcher.start()
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_connection_pool = True
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'password'
+        settings.server.ssh_username = 'nobody'
+
+    def tearDown(self):
+        self.pool_patcher.stop()
+        self.settings_patcher.stop()
+
+    def test_ordered_results(self):
+        """Results are returned in the same order as the commands, all of
+        them sharing one connection.
+        """
+        results = ssh.command_many(['ls', 'false', 'pwd'], max_channels=2)
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[u'out: ls'], [u'out: false'], [u'out: pwd']],
+        )
+        self.assertEqual(
+            [result.return_code for result in results], [0, 1, 0])
+        self.assertEqual(results[1].stderr, u'error')
+        self.assertEqual(self.pool.stats()['handshakes'], 1)
+
+    def test_max_channels(self):
+        """No more than ``max_channels`` channels are open at once."""
+        ssh.command_many(['ls'] * 5, max_channels=2)
+        client = self.pool.acquire('example.com', 'nobody', 'password', None)
+        self.assertEqual(client.transport.sessions, 5)
+        self.assertEqual(client.transport.max_open_channels, 2)
+        self.assertEqual(client.transport.open_channels, 0)
+
+    def test_cassette(self):
+        """Commands are recorded then replayed without connecting."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'cassette.json')
+        with use_cassette(path, 'record'):
+            ssh.command_many(['ls', 'false'])
+        with use_cassette(path, 'replay'):
+            results = ssh.command_many(['false', 'ls'])
+        self.assertEqual(
+            [(result.stdout, result.return_code) for result in results],
+            [([u'out: false'], 1), ([u'out: ls'], 0)],
+        )
+        self.assertEqual(self.pool.stats()['handshakes'], 1)
+
+    def test_async(self):
+        """The async variant returns the same results."""
+        async_result = ssh.command_many_async(['ls', 'pwd'])
+        results = async_result.result(timeout=10)
+        self.assertTrue(async_result.done())
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[u'out: ls'], [u'out: pwd']],
+        )
+
+
+@mock.patch('robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+class CommandStreamTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh.command_stream`."""
+    def setUp(self):
+        self.pool = ssh.SSHConnectionPool()
+        self.pool_patcher = mock.patch('robottelo.ssh._connection_pool',
+                                       self.pool)
+        self.pool_patcher.start()
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_connection_pool = True
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'password'
+        settings.server.ssh_username = 'nobody'
+        client = self.pool.acquire('example.com', 'nobody', 'password', None)
+        # Lines and multibyte characters split across chunks
+        client.transport.outputs['cat log'] = [
+            b'first\nsec',
+            b'ond \xc3',
+            b'\xa5\n\x1b[31mthird\x1b[0m\nlast',
+        ]
+        self.pool.release(client, 'example.com', 'nobody', None)
+
+    def tearDown(self):
+        self.pool_patcher.stop()
+        self.settings_patcher.stop()
+
+    def test_stream_lines(self):
+        """Lines are decoded and cleaned up across chunk boundaries."""
+        stream = ssh.command_stream('cat log')
+        self.assertEqual(
+            list(stream),
+            [u'first', u'second \xe5', u'third', u'last'],
+        )
+        self.assertEqual(stream.return_code, 0)
+        self.assertEqual(stream.stderr, u'')
+
+    def test_line_filter(self):
+        """Only lines matching the filter are yielded."""
+        self.assertEqual(
+            list(ssh.command_stream('cat log', line_filter=r'^(f|l)')),
+            [u'first', u'last'],
+        )
+        self.assertEqual(
+            list(ssh.command_stream(
+                'cat log', line_filter=lambda line: 'ir' in line)),
+            [u'first', u'third'],
+        )
+
+    def test_callback(self):
+        """The callback receives every yielded line."""
+        lines = []
+        list(ssh.command_stream('cat log', callback=lines.append))
+        self.assertEqual(len(lines), 4)
+
+    def test_stderr(self):
+        """Return code and stderr are available after the iteration."""
+        stream = ssh.command_stream('false')
+        self.assertEqual(list(stream), [u'out: false'])
+        self.assertEqual(stream.return_code, 1)
+        self.assertEqual(stream.stderr, u'error')
+
+    def test_stop_early(self):
+        """Leaving the iteration early does not leak the connection."""
+        lines = iter(ssh.command_stream('cat log'))
+        self.assertEqual(next(lines), u'first')
+        lines.close()
+        stats = self.pool.stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['idle'], 0)
+        for line in ssh.command_stream('cat log'):
+            if line == u'second \xe5':
+                break
+        self.assertEqual(self.pool.stats()['in_use'], 0)
+
+    def test_cassette(self):
+        """Streams can't be replayed from a cassette."""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'cassette.json')
+        with use_cassette(path, 'record'):
+            pass
+        with use_cassette(path, 'replay'):
+            with self.assertRaises(CassetteError):
+                list(ssh.command_stream('cat log'))
+        self.assertEqual(self.pool.stats()['handshakes'], 1)
@@ -0,0 +1,136 @@
+"""Tests for module ``robottelo.performance.stat``."""
+import csv
+import os
+import random
+import shutil
+import tempfile
+
+import numpy
+
+from robottelo.performance.stat import (
+    compute_stats,
+    generate_stat_per_client,
+    generate_stat_per_client_bucketized,
+    generate_stat_per_test,
+    generate_stat_per_test_bucketized,
+)
+from unittest2 import TestCase
+
+
+def legacy_generate_stat(thread_name, time_list, stat_file_name,
+                         bucket_size):
+    """The stat utility the vectorized ones must stay compatible with, as it
+    was before being optimized.
+    """
+    if bucket_size == 0:
+        return
+    num_buckets = len(time_list) // bucket_size
+    return_stat = {}
+    buckets = ['{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
+               for i in range(num_buckets)]
+    with open(stat_file_name, 'a') as handler:
+        writer = csv.writer(handler)
+        writer.writerow([])
+        writer.writerow(['{0}'.format(thread_name)])
+        writer.writerow(['bucket', 'min', 'median', 'mean', 'max', 'std',
+                         '90%', '95%', '99%'])
+        for i, bucket in enumerate(buckets):
+            time_list_slice = time_list[bucket_size * i:bucket_size * (i + 1)]
+            gmin = numpy.amin(time_list_slice)
+            gmean = numpy.mean(time_list_slice)
+            gmedian = numpy.median(time_list_slice)
+            gmax = numpy.amax(time_list_slice)
+            gstd = numpy.std(time_list_slice)
+            writer.writerow([
+                bucket, gmin, gmedian, gmean, gmax, gstd,
+                numpy.percentile(time_list_slice, 90),
+                numpy.percentile(time_list_slice, 95),
+                numpy.percentile(time_list_slice, 99)
+            ])
+            return_stat.update({i: (gmin, gmedian, gmax, gstd)})
+        return return_stat
+
+
+def legacy_write_stats(stat_file_name, time_lists, bucket_size, num_buckets):
+    """Write the four stat blocks of ``ConcurrentTestCase`` as they were
+    written before being optimized, and return their stat dictionaries.
+    """
+    results = []
+    results.append([
+        legacy_generate_stat(
+            'client-{0}'.format(i), time_list, stat_file_name, bucket_size)
+        for i, time_list in enumerate(time_lists)
+    ])
+    stat_dict = {}
+    for i in range(num_buckets):
+        chunk = []
+        for time_list in time_lists:
+            chunk += time_list[i * bucket_size: (i + 1) * bucket_size]
+        stat_dict[i] = legacy_generate_stat(
+            'bucket-{0}'.format(i), chunk, stat_file_name, len(chunk))[0]
+    results.append(stat_dict)
+    stat_dict = {}
+    for i, time_list in enumerate(time_lists):
+        stat_dict[i] = legacy_generate_stat(
+            'client-{0}'.format(i), time_list, stat_file_name,
+            len(time_list))[0]
+    results.append(stat_dict)
+    results.append(legacy_generate_stat(
+        'test-{0}'.format(len(time_lists)), sum(time_lists, []),
+        stat_file_name, len(sum(time_lists, []))))
+    return results
+
+
+def write_stats(stat_file_name, time_lists, bucket_size, num_buckets):
+    """Write the four stat blocks with the vectorized utilities."""
+    return [
+        generate_stat_per_client_bucketized(
+            time_lists, stat_file_name, bucket_size),
+        generate_stat_per_test_bucketized(
+            time_lists, stat_file_name, bucket_size, num_buckets),
+        generate_stat_per_client(time_lists, stat_file_name),
+        generate_stat_per_test(time_lists, stat_file_name),
+    ]
+
+
+class StatTestCase(TestCase):
+    """Tests for the vectorized stat utilities."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.generator = random.Random(1)
+
+    def time_lists(self, lengths):
+        """Return random timing lists of the given lengths."""
+        return [
+            [self.generator.uniform(0.5, 3) for _ in range(length)]
+            for length in lengths
+        ]
+
+    def assert_legacy_output(self, time_lists, bucket_size, num_buckets):
+        """Assert the output is the legacy one."""
+        legacy_file = os.path.join(self.tmpdir, 'legacy.csv')
+        stat_file = os.path.join(self.tmpdir, 'stat.csv')
+        legacy = legacy_write_stats(
+            legacy_file, time_lists, bucket_size, num_buckets)
+        result = write_stats(stat_file, time_lists, bucket_size, num_buckets)
+        with open(legacy_file) as legacy_csv, open(stat_file) as stat_csv:
+            self.assertEqual(stat_csv.read(), legacy_csv.read())
+        self.assertEqual(result, legacy)
+
+    def test_same_lengths(self):
+        """Clients with as many timings are computed at once"""
+        self.assert_legacy_output(self.time_lists([40, 40, 40]), 4, 10)
+
+    def test_different_lengths(self):
+        """Clients with different numbers of timings are supported"""
+        self.assert_legacy_output(self.time_lists([41, 38, 45]), 4, 9)
+
+    def test_compute_stats(self):
+        """Statistics are computed along the last axis"""
+        stats = compute_stats(numpy.arange(24).reshape(2, 3, 4))
+        self.assertEqual(stats.shape, (2, 3, 8))
+        self.assertEqual(
+            list(stats[1, 2][:5]),
+            [20, 21.5, 21.5, 23, numpy.std([0, 1, 2, 3])]
+        )
@@ -0,0 +1,44 @@
+"""Tests for module ``robottelo.performance.thread``."""
+import six
+
+from robottelo.performance.histogram import Recorder
+from robottelo.performance.thread import DeleteThread, SubscribeAttachThread
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+from unittest2 import TestCase
+
+
+class PerformanceThreadTestCase(TestCase):
+    """Tests for the threads of ``robottelo.performance.thread``."""
+    @mock.patch('robottelo.performance.thread.time.sleep')
+    @mock.patch('robottelo.performance.thread.Candlepin.single_delete')
+    def test_recorder_only(self, single_delete, sleep):
+        """Timings are only recorded in the recorder without a dict"""
+        single_delete.side_effect = [1.0, 2.0]
+        recorder = Recorder()
+        thread = DeleteThread(0, 'thread-0', ['uuid-1', '', 'uuid-2'], None,
+                              recorder)
+        thread.start()
+        thread.join()
+        histogram = recorder.histogram()
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(histogram.total, 3.0)
+
+    @mock.patch(
+        'robottelo.performance.thread.Candlepin.single_register_attach')
+    def test_register_attach(self, single_register_attach):
+        """Register and attach timings are kept by step"""
+        single_register_attach.return_value = (1.0, 2.0)
+        register, attach = Recorder(), Recorder()
+        time_result_dict_register = {'thread-0': []}
+        thread = SubscribeAttachThread(
+            0, 'thread-0', None, time_result_dict_register, None, 2,
+            'sub', 'org', 'env', 'vm', register, attach)
+        thread.start()
+        thread.join()
+        self.assertEqual(time_result_dict_register['thread-0'], [1.0, 1.0])
+        self.assertEqual(register.histogram().total, 2.0)
+        self.assertEqual(attach.histogram().total, 4.0)
@@ -5,9 +5,9 @@ from robottelo import ssh
 from robottelo.vm import VirtualMachine, VirtualMachineError
 
 if six.PY2:
-    from mock import call, patch
+    from mock import patch
 else:
-    from unittest.mock import call, patch
+    from unittest.mock import patch
 
 
 class VirtualMachineTestCase(unittest2.TestCase):
@@ -87,8 +87,9 @@ class VirtualMachineTestCase(unittest2.TestCase):
         with self.assertRaises(VirtualMachineError):
             vm.run('ls')
 
+    @patch('robottelo.ssh.command_many')
     @patch('robottelo.ssh.command')
-    def test_destroy(self, ssh_command):
+    def test_destroy(self, ssh_command, ssh_command_many):
         """Check if destroy runs the required ssh commands"""
         self.configure_provisoning_server()
         image_dir = '/opt/robottelo/images'
@@ -101,15 +102,14 @@ class VirtualMachineTestCase(unittest2.TestCase):
         ):
             vm.destroy()
 
-        self.assertEqual(ssh_command.call_count, 3)
-
-        ssh_command_args_list = [
-            call('virsh destroy {0}'.format(vm.hostname),
-                 hostname=self.provisioning_server),
-            call('virsh undefine {0}'.format(vm.hostname),
-                 hostname=self.provisioning_server),
-            call('rm {0}/{1}.img'.format(image_dir, vm.hostname),
-                 hostname=self.provisioning_server),
-        ]
-
-        self.assertListEqual(ssh_command.call_args_list, ssh_command_args_list)
+        ssh_command.assert_called_once_with(
+            'virsh destroy {0}'.format(vm.hostname),
+            hostname=self.provisioning_server
+        )
+        ssh_command_many.assert_called_once_with(
+            [
+                'virsh undefine {0}'.format(vm.hostname),
+                'rm {0}/{1}.img'.format(image_dir, vm.hostname),
+            ],
+            hostname=self.provisioning_server
+        )